@@ -0,0 +1,3 @@
+"""
+Benchmarks for the AWS File System Watcher
+"""
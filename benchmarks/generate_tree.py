@@ -0,0 +1,126 @@
+"""
+Synthetic Tree Generator for the benchmarks
+"""
+
+import os
+import random
+import time
+import zlib
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+KB = 1024
+MB = 1024**2
+
+# Size distributions as (weight, minimum size, maximum size) ranges in bytes
+SIZE_DISTRIBUTIONS: Dict[str, List[Tuple[float, int, int]]] = {
+    "tiny": [(1.0, 0, 4 * KB)],
+    "small": [(1.0, 1 * KB, 64 * KB)],
+    "mixed": [(0.8, 1 * KB, 64 * KB), (0.18, 64 * KB, 8 * MB), (0.02, 8 * MB, 64 * MB)],
+    "large": [(1.0, 16 * MB, 128 * MB)],
+}
+
+# Random block the file contents are sliced from, generating random bytes per file is slow
+BLOCK_SIZE = 4 * MB
+
+
+def plan_tree(
+    files: int,
+    distribution: str = "small",
+    depth: int = 3,
+    fanout: int = 10,
+    seed: int = 0,
+) -> List[Tuple[str, int]]:
+    """
+    Function to return the relative paths and sizes of the files of a tree, the same
+    parameters always return the same tree
+    """
+
+    ranges = SIZE_DISTRIBUTIONS[distribution]
+    weights = [weight for weight, _, _ in ranges]
+    rng = random.Random(seed)
+
+    plan = []
+    for index in range(files):
+        # Place the file at a random depth below random directories
+        directories = [
+            f"dir_{rng.randrange(fanout):03d}" for _ in range(rng.randint(0, depth))
+        ]
+        _, min_size, max_size = rng.choices(ranges, weights)[0]
+        size = rng.randint(min_size, max_size)
+        plan.append((os.path.join(*directories, f"file_{index:08d}.bin"), size))
+
+    return plan
+
+
+def write_file(root: str, relative_path: str, size: int, block: bytes) -> float:
+    """
+    Function to write a file of the tree and return the time it was complete at
+    """
+
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Start at a different offset of the block so files don't share their content
+    offset = zlib.crc32(relative_path.encode()) % len(block)
+    with open(path, "wb") as file:
+        remaining = size
+        while remaining > 0:
+            chunk = block[offset : offset + remaining]
+            file.write(chunk)
+            remaining -= len(chunk)
+            offset = 0
+
+    return time.time()
+
+
+def write_tree(
+    root: str, plan: List[Tuple[str, int]], rate: float = 0
+) -> Dict[str, float]:
+    """
+    Function to write the files of a plan, at most rate files per second if set, and
+    return the time every file was complete at keyed by its relative path
+    """
+
+    block = os.urandom(BLOCK_SIZE)
+    written = {}
+    start = time.time()
+
+    for index, (relative_path, size) in enumerate(plan):
+        if rate > 0:
+            delay = start + index / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        written[relative_path] = write_file(root, relative_path, size, block)
+
+    return written
+
+
+def main() -> None:
+    """
+    Main Function, writes a synthetic tree to a directory
+    """
+
+    parser = ArgumentParser(description="Generate a synthetic tree of files")
+    parser.add_argument("directory", help="Directory to write the tree to")
+    parser.add_argument("-n", "--files", type=int, default=1000)
+    parser.add_argument(
+        "--distribution", choices=sorted(SIZE_DISTRIBUTIONS), default="small"
+    )
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    plan = plan_tree(args.files, args.distribution, args.depth, args.fanout, args.seed)
+    start = time.time()
+    write_tree(args.directory, plan)
+
+    print(
+        f"Wrote {len(plan)} files ({round(sum(size for _, size in plan) / MB, 2)} MB) to {args.directory} in {round(time.time() - start, 2)} seconds"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Benchmark Runner for the AWS File System Watcher
+
+Runs every scenario in its own process against the local S3 stand-in and saves
+the results as JSON, e.g.
+
+    python -m benchmarks.run_benchmarks -n 5000 --latency 0.02 -o results.json
+    python -m benchmarks.run_benchmarks -n 5000 --compare results.json
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import SUPPRESS, ArgumentParser
+from typing import Dict, List
+
+from benchmarks.generate_tree import MB, SIZE_DISTRIBUTIONS, plan_tree, write_tree
+from benchmarks.s3_server import LocalS3Server
+
+SCENARIOS = ("inotify", "fallback", "backtrack")
+
+# Bucket of the stand-in the files are uploaded to
+BENCHMARK_BUCKET = "fswatcher-benchmark"
+
+# Results where a lower value is better, used to mark the regressions of a comparison
+LOWER_IS_BETTER = (
+    "elapsed_seconds",
+    "scan_seconds_per_million_files",
+    "peak_rss_mb",
+    "latency_p50",
+    "latency_p90",
+    "latency_p99",
+    "latency_max",
+    "missing_files",
+)
+
+
+def get_percentile(values: List[float], percentile: float) -> float:
+    """
+    Function to return a percentile of a list of values, 0 if it is empty
+    """
+
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percentile / 100 * len(values)) - 1))
+    return values[index]
+
+
+def parse_option(option: str):
+    """
+    Function to parse a handler option given as key=value into its key and value
+    """
+
+    key, _, value = option.partition("=")
+    for parse in (json.loads, str):
+        try:
+            return key, parse(value)
+        except ValueError:
+            continue
+
+
+def run_scenario(parameters: Dict) -> Dict:
+    """
+    Function to run a scenario in the current process and return its results
+    """
+
+    scenario = parameters["scenario"]
+    directory = tempfile.mkdtemp(prefix=f"fswatcher-benchmark-{scenario}-")
+    root = os.path.join(directory, "watch")
+    os.makedirs(root)
+
+    server = LocalS3Server(
+        latency=parameters["latency"],
+        jitter=parameters["jitter"],
+        bandwidth=parameters["bandwidth"],
+        error_rate=parameters["error_rate"],
+        throttle_rate=parameters["throttle_rate"],
+        seed=parameters["seed"],
+    )
+    endpoint_url = server.start()
+
+    # The stand-in doesn't check signatures, but boto3 needs credentials to sign
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    # The fswatcher package parses the command line when it is imported
+    sys.argv = ["fswatcher", "-d", root, "-b", BENCHMARK_BUCKET]
+    import logging
+    from watchdog.observers import Observer
+    from fswatcher.FileSystemHandler import FileSystemHandler
+    from fswatcher.FileSystemHandlerConfig import FileSystemHandlerConfig
+
+    logging.getLogger().setLevel(parameters["log_level"])
+
+    config = FileSystemHandlerConfig(
+        path=root,
+        bucket_name=BENCHMARK_BUCKET,
+        endpoint_url=endpoint_url,
+        concurrency_limit=parameters["concurrency_limit"],
+        upload_workers=parameters["upload_workers"],
+        ledger_path=os.path.join(directory, "ledger.db"),
+        dead_letter_queue_path=os.path.join(directory, "dlq.db"),
+        **dict(parse_option(option) for option in parameters["options"]),
+    )
+
+    plan = plan_tree(
+        parameters["files"],
+        parameters["distribution"],
+        parameters["depth"],
+        parameters["fanout"],
+        parameters["seed"],
+    )
+    total_bytes = sum(size for _, size in plan)
+
+    # Files of the backtrack scenario exist before the watcher starts
+    written = {}
+    if scenario == "backtrack":
+        written = write_tree(root, plan)
+
+    handler = FileSystemHandler(config=config)
+    observer = None
+    start = time.time()
+
+    if scenario == "inotify":
+        observer = Observer()
+        observer.schedule(handler, root, recursive=True)
+        observer.start()
+        start = time.time()
+        written = write_tree(root, plan, rate=parameters["rate"])
+
+    elif scenario == "fallback":
+        threading.Thread(target=handler.fallback_directory_watcher, daemon=True).start()
+
+        # Let the initial scan of the empty tree finish, new files are found by the loop
+        time.sleep(1)
+        start = time.time()
+        written = write_tree(root, plan, rate=parameters["rate"])
+
+    elif scenario == "backtrack":
+        handler.backtrack(root)
+        handler.metrics.scan_duration.observe(time.time() - start)
+        handler.metrics.files_scanned.inc(len(plan))
+
+    # Files of the backtrack scenario are only detected once the walk starts
+    if scenario == "backtrack":
+        written = dict.fromkeys(written, start)
+
+    # Wait for every file to be uploaded
+    deadline = time.time() + parameters["timeout"]
+    while time.time() < deadline:
+        with server.lock:
+            uploaded = sum(
+                f"{BENCHMARK_BUCKET}/{path}" in server.objects for path in written
+            )
+        if uploaded >= len(written):
+            break
+        time.sleep(0.1)
+
+    # The fallback loop scans every 5 seconds, wait for a scan of the full tree
+    if scenario == "fallback":
+        scans = handler.metrics.scan_duration.counts
+        while not any(scans) and time.time() < deadline:
+            time.sleep(0.1)
+
+    if observer is not None:
+        observer.stop()
+        observer.join()
+    handler.stop()
+    server.stop()
+
+    # End-to-end latency from a file being written to its object being complete
+    with server.lock:
+        objects = dict(server.objects)
+    latencies = [
+        objects[f"{BENCHMARK_BUCKET}/{path}"].created - written_at
+        for path, written_at in written.items()
+        if f"{BENCHMARK_BUCKET}/{path}" in objects
+    ]
+    end = max((objects[key].created for key in objects), default=time.time())
+    elapsed = max(end - start, 1e-9)
+
+    scan_duration = handler.metrics.scan_duration
+    files_scanned = sum(handler.metrics.files_scanned.values.values())
+
+    return {
+        "files": len(plan),
+        "bytes": total_bytes,
+        "uploaded_files": len(latencies),
+        "missing_files": len(plan) - len(latencies),
+        "elapsed_seconds": round(elapsed, 3),
+        "events_per_second": round(len(latencies) / elapsed, 2),
+        "upload_mb_per_second": round(
+            sum(objects[key].size for key in objects) / MB / elapsed, 2
+        ),
+        "scan_seconds_per_million_files": (
+            round(scan_duration.sum / files_scanned * 1e6, 3) if files_scanned else None
+        ),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "latency_p50": round(get_percentile(latencies, 50), 4),
+        "latency_p90": round(get_percentile(latencies, 90), 4),
+        "latency_p99": round(get_percentile(latencies, 99), 4),
+        "latency_max": round(max(latencies, default=0.0), 4),
+        "s3": dict(server.stats),
+    }
+
+
+def compare_results(previous: Dict, current: Dict) -> None:
+    """
+    Function to print the change of every result against a previous run
+    """
+
+    for scenario, results in current["results"].items():
+        previous_results = previous.get("results", {}).get(scenario)
+        if not previous_results:
+            continue
+
+        print(f"\n{scenario} (vs. {previous.get('created', 'previous run')})")
+        for key, value in results.items():
+            before = previous_results.get(key)
+            if not isinstance(value, (int, float)) or not before:
+                continue
+
+            change = (value - before) / before * 100
+            better = change < 0 if key in LOWER_IS_BETTER else change > 0
+            marker = "" if abs(change) < 5 else (" better" if better else " WORSE")
+            print(f"  {key:32} {before:>12} -> {value:>12} ({change:+.1f}%){marker}")
+
+
+def main() -> None:
+    """
+    Main Function, runs the scenarios and saves their results
+    """
+
+    parser = ArgumentParser(description="Benchmark the watcher against a local S3")
+    parser.add_argument(
+        "-s",
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("-n", "--files", type=int, default=1000)
+    parser.add_argument(
+        "--distribution", choices=sorted(SIZE_DISTRIBUTIONS), default="small"
+    )
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rate", type=float, default=0, help="Files written per second, 0 is unlimited"
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--bandwidth", type=float, default=0.0, help="MB/s per request, 0 is unlimited"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("-c", "--concurrency-limit", type=int, default=20)
+    parser.add_argument("-uw", "--upload-workers", type=int, default=10)
+    parser.add_argument(
+        "--option",
+        dest="options",
+        action="append",
+        default=[],
+        help="Handler option as key=value, e.g. --option quiet_period=0.5",
+    )
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("-o", "--output", help="File to save the results to as JSON")
+    parser.add_argument("--compare", help="Results of a previous run to compare with")
+    parser.add_argument("--run-scenario", help=SUPPRESS)
+    args = parser.parse_args()
+
+    # Child process running a single scenario
+    if args.run_scenario:
+        parameters = json.loads(args.run_scenario)
+        print(json.dumps(run_scenario(parameters)))
+        return
+
+    parameters = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("scenarios", "output", "compare", "run_scenario")
+    }
+
+    results = {}
+    for scenario in args.scenarios:
+        print(f"Running {scenario} with {args.files} files...", file=sys.stderr)
+
+        # A process per scenario keeps the peak RSS and the imports apart
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run_benchmarks",
+                "--run-scenario",
+                json.dumps({**parameters, "scenario": scenario}),
+            ],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE,
+        )
+        if process.returncode != 0:
+            print(f"Scenario {scenario} failed", file=sys.stderr)
+            continue
+
+        results[scenario] = json.loads(process.stdout.decode().strip().splitlines()[-1])
+        print(json.dumps(results[scenario], indent=2))
+
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(run, output, indent=2)
+        print(f"Saved results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as previous:
+            compare_results(json.load(previous), run)
+
+
+def get_commit() -> str:
+    """
+    Function to return the git commit of the benchmarked code, empty outside a checkout
+    """
+
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            .stdout.decode()
+            .strip()
+        )
+    except OSError:
+        return ""
+
+
+if __name__ == "__main__":
+    main()
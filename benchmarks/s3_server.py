@@ -0,0 +1,403 @@
+"""
+Local S3 Stand-in for the benchmarks
+"""
+
+import hashlib
+import random
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+# Bytes read from a request body at a time
+READ_SIZE = 1024**2
+
+
+class LocalS3Object:
+    """
+    Class holding an object stored by the stand-in
+    """
+
+    def __init__(
+        self,
+        size: int,
+        etag: str,
+        data: Optional[bytes] = None,
+        checksum: Optional[str] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        self.size = size
+        self.etag = etag
+        self.data = data
+        self.checksum = checksum
+
+        # Time the object was complete at, used for the end-to-end latency
+        self.created = time.time()
+
+
+class LocalS3Server:
+    """
+    Class running an in-process S3 compatible endpoint with the operations used by
+    the watcher: put, head, get, delete, list and multipart uploads. Every request
+    can be delayed and failed at random to measure the uploader against a slow or
+    throttling S3 without AWS costs or network noise.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        bandwidth: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        keep_data: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Seconds added to every request, plus a random jitter of up to jitter seconds
+        self.latency = latency
+        self.jitter = jitter
+
+        # MB/s a request body is received at, 0 doesn't limit it
+        self.bandwidth = bandwidth
+
+        # Share of the requests failing with a 500 InternalError and a 503 SlowDown
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+
+        # Keep the object bodies, only the sizes are kept by default
+        self.keep_data = keep_data
+
+        self.random = random.Random(seed)
+        self.objects: Dict[str, LocalS3Object] = {}
+        self.uploads: Dict[str, Dict[int, LocalS3Object]] = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        """
+        URL of the running stand-in
+        """
+
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Function to start serving in a background thread and return the endpoint url
+        """
+
+        stand_in = self
+
+        class LocalS3RequestHandler(BaseHTTPRequestHandler):
+            # Keep the connections of the boto3 pool alive
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self) -> None:
+                stand_in._handle(self, "HEAD")
+
+            def do_GET(self) -> None:
+                stand_in._handle(self, "GET")
+
+            def do_PUT(self) -> None:
+                stand_in._handle(self, "PUT")
+
+            def do_POST(self) -> None:
+                stand_in._handle(self, "POST")
+
+            def do_DELETE(self) -> None:
+                stand_in._handle(self, "DELETE")
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), LocalS3RequestHandler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, name="local-s3", daemon=True
+        ).start()
+
+        return self.endpoint_url
+
+    def stop(self) -> None:
+        """
+        Function to stop serving
+        """
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def _handle(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        """
+        Function to route a request after the injected latency and errors
+        """
+
+        url = urlparse(request.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+
+        # Read the body first so a failed request leaves the connection usable
+        started = time.monotonic()
+        body, size, md5 = self._read_body(request)
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if self.bandwidth > 0:
+            delay += size / (self.bandwidth * 1024**2) - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self.lock:
+            self.stats["requests"] += 1
+            failure = self.random.random()
+            if failure < self.throttle_rate:
+                self.stats["throttled"] += 1
+            elif failure < self.throttle_rate + self.error_rate:
+                self.stats["errors"] += 1
+
+        if failure < self.throttle_rate:
+            return self._send_error(
+                request, 503, "SlowDown", "Reduce your request rate"
+            )
+        if failure < self.throttle_rate + self.error_rate:
+            return self._send_error(request, 500, "InternalError", "Injected error")
+
+        if method == "PUT" and "uploadId" in query:
+            upload = self.uploads.get(query["uploadId"][0])
+            if upload is None:
+                return self._send_error(request, 404, "NoSuchUpload", key)
+            part = LocalS3Object(size, f'"{md5}"', body, self._get_checksum(request))
+            upload[int(query["partNumber"][0])] = part
+            return self._send(request, 200, headers=self._get_headers(part))
+
+        if method == "PUT":
+            item = LocalS3Object(size, f'"{md5}"', body, self._get_checksum(request))
+            with self.lock:
+                self.objects[f"{bucket}/{key}"] = item
+            return self._send(request, 200, headers=self._get_headers(item))
+
+        if method == "POST" and "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {}
+            return self._send_xml(
+                request,
+                "InitiateMultipartUploadResult",
+                f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+                f"<UploadId>{upload_id}</UploadId>",
+            )
+
+        if method == "POST" and "uploadId" in query:
+            parts = self.uploads.pop(query["uploadId"][0], None)
+            if parts is None:
+                return self._send_error(request, 404, "NoSuchUpload", key)
+            ordered = [parts[number] for number in sorted(parts)]
+            etag = f'"{uuid.uuid4().hex}-{len(ordered)}"'
+            data = b"".join(part.data for part in ordered) if self.keep_data else None
+            with self.lock:
+                self.objects[f"{bucket}/{key}"] = LocalS3Object(
+                    sum(part.size for part in ordered), etag, data
+                )
+            return self._send_xml(
+                request,
+                "CompleteMultipartUploadResult",
+                f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+                f"<ETag>{escape(etag)}</ETag>",
+            )
+
+        if method == "DELETE":
+            if "uploadId" in query:
+                self.uploads.pop(query["uploadId"][0], None)
+            else:
+                with self.lock:
+                    self.objects.pop(f"{bucket}/{key}", None)
+            return self._send(request, 204)
+
+        if method == "GET" and not key:
+            return self._list_objects(request, bucket, query)
+
+        # Buckets always exist
+        if not key:
+            return self._send(request, 200)
+
+        item = self.objects.get(f"{bucket}/{key}")
+        if item is None:
+            return self._send_error(request, 404, "NoSuchKey", key)
+
+        headers = self._get_headers(item)
+        headers["Last-Modified"] = formatdate(item.created, usegmt=True)
+        if method == "HEAD":
+            headers["Content-Length"] = str(item.size)
+            return self._send(request, 200, headers=headers, length=False)
+
+        return self._send(request, 200, item.data or b"\0" * item.size, headers)
+
+    def _read_body(self, request: BaseHTTPRequestHandler):
+        """
+        Function to read the body of a request and return it, its size and its MD5
+        """
+
+        remaining = int(request.headers.get("Content-Length") or 0)
+        size = remaining
+        md5 = hashlib.md5()
+        chunks = []
+
+        while remaining > 0:
+            chunk = request.rfile.read(min(READ_SIZE, remaining))
+            if not chunk:
+                break
+            md5.update(chunk)
+            if self.keep_data:
+                chunks.append(chunk)
+            remaining -= len(chunk)
+
+        return b"".join(chunks) if self.keep_data else None, size, md5.hexdigest()
+
+    def _list_objects(
+        self, request: BaseHTTPRequestHandler, bucket: str, query: Dict
+    ) -> None:
+        """
+        Function to answer a ListObjectsV2 request
+        """
+
+        prefix = query.get("prefix", [""])[0]
+        delimiter = query.get("delimiter", [""])[0]
+        max_keys = int(query.get("max-keys", ["1000"])[0])
+        start_after = query.get("continuation-token", [""])[0]
+
+        with self.lock:
+            items = sorted(
+                (name.partition("/")[2], item)
+                for name, item in self.objects.items()
+                if name.startswith(f"{bucket}/{prefix}")
+            )
+
+        contents, prefixes = [], []
+        last, truncated = "", False
+        for key, item in items:
+            # Resume after the last key or common prefix of the previous page
+            if key <= start_after or (
+                delimiter
+                and start_after.endswith(delimiter)
+                and key.startswith(start_after)
+            ):
+                continue
+
+            # Roll the keys below the delimiter up into a common prefix
+            rest = key[len(prefix) :]
+            if delimiter and delimiter in rest:
+                common_prefix = prefix + rest.split(delimiter, 1)[0] + delimiter
+                if common_prefix == last:
+                    continue
+                entry = (common_prefix, None)
+            else:
+                entry = (key, item)
+
+            if len(contents) + len(prefixes) >= max_keys:
+                truncated = True
+                break
+
+            last = entry[0]
+            if entry[1] is None:
+                prefixes.append(last)
+            else:
+                contents.append(entry)
+
+        body = f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+        body += f"<KeyCount>{len(contents) + len(prefixes)}</KeyCount>"
+        body += f"<MaxKeys>{max_keys}</MaxKeys>"
+        body += f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"
+        if truncated:
+            body += f"<NextContinuationToken>{escape(last)}</NextContinuationToken>"
+        for key, item in contents:
+            modified = time.strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(item.created)
+            )
+            body += (
+                f"<Contents><Key>{escape(key)}</Key><LastModified>{modified}</LastModified>"
+                f"<ETag>{escape(item.etag)}</ETag><Size>{item.size}</Size>"
+                f"<StorageClass>STANDARD</StorageClass></Contents>"
+            )
+        for common_prefix in prefixes:
+            body += f"<CommonPrefixes><Prefix>{escape(common_prefix)}</Prefix></CommonPrefixes>"
+
+        self._send_xml(request, "ListBucketResult", body)
+
+    @staticmethod
+    def _get_checksum(request: BaseHTTPRequestHandler) -> Optional[str]:
+        """
+        Function to return the SHA256 checksum sent with a request
+        """
+
+        return request.headers.get("x-amz-checksum-sha256")
+
+    @staticmethod
+    def _get_headers(item: LocalS3Object) -> Dict[str, str]:
+        """
+        Function to return the headers describing an object or a part
+        """
+
+        headers = {"ETag": item.etag}
+        if item.checksum:
+            headers["x-amz-checksum-sha256"] = item.checksum
+        return headers
+
+    def _send_xml(
+        self, request: BaseHTTPRequestHandler, root: str, content: str
+    ) -> None:
+        """
+        Function to send an XML response
+        """
+
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<{root} xmlns="http://s3.amazonaws.com/doc/2006-03-01/">{content}</{root}>'
+        )
+        self._send(request, 200, body.encode(), {"Content-Type": "application/xml"})
+
+    def _send_error(
+        self, request: BaseHTTPRequestHandler, status: int, code: str, message: str
+    ) -> None:
+        """
+        Function to send an S3 error response
+        """
+
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code>'
+            f"<Message>{escape(message)}</Message></Error>"
+        )
+        self._send(request, status, body.encode(), {"Content-Type": "application/xml"})
+
+    @staticmethod
+    def _send(
+        request: BaseHTTPRequestHandler,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        length: bool = True,
+    ) -> None:
+        """
+        Function to send a response
+        """
+
+        request.send_response(status)
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        if length:
+            request.send_header("Content-Length", str(len(body)))
+        request.send_header("x-amz-request-id", uuid.uuid4().hex[:16])
+        request.end_headers()
+        if request.command != "HEAD":
+            request.wfile.write(body)
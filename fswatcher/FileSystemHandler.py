@@ -5,10 +5,13 @@ File System Handler Module for SDC AWS File System Watcher
 import sys
 import os
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
 from datetime import datetime
 from urllib import parse
 from pathlib import Path
-import subprocess
 import boto3
 import botocore
 from boto3.s3.transfer import TransferConfig, S3Transfer
@@ -16,14 +19,35 @@ from slack_sdk.errors import SlackApiError
 from fswatcher import (
     log,
     is_file_manifest,
-    generate_file_pipeline_message,
-    get_message_ts,
+    get_file_checksum,
+    get_file_etag,
     get_slack_client,
-    send_slack_notification,
-    timestream_log,
+    generate_timestream_record,
 )
 from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+from fswatcher.FileSystemHandlerEventIndex import FileSystemHandlerEventIndex
 from fswatcher.FileSystemHandlerConfig import FileSystemHandlerConfig
+from fswatcher.FileSystemHandlerPipeline import FileSystemHandlerPipeline
+from fswatcher.FileSystemHandlerCoalescer import FileSystemHandlerCoalescer
+from fswatcher.FileSystemHandlerLedger import FileSystemHandlerLedger
+from fswatcher.FileSystemHandlerScanner import FileSystemHandlerScanner
+from fswatcher.FileSystemHandlerWalker import FileSystemHandlerWalker
+from fswatcher.FileSystemHandlerDeadLetterQueue import FileSystemHandlerDeadLetterQueue
+from fswatcher.FileSystemHandlerCircuitBreaker import FileSystemHandlerCircuitBreaker
+from fswatcher.FileSystemHandlerTimestream import FileSystemHandlerTimestream
+from fswatcher.FileSystemHandlerSlack import FileSystemHandlerSlack
+from fswatcher.FileSystemHandlerConcurrency import FileSystemHandlerConcurrency
+from fswatcher.FileSystemHandlerBundler import FileSystemHandlerBundler
+from fswatcher.FileSystemHandlerMultipart import FileSystemHandlerMultipart
+from fswatcher.FileSystemHandlerMetrics import FileSystemHandlerMetrics
+from fswatcher.FileSystemHandlerCloseWrite import FileSystemHandlerCloseWrite
+from fswatcher.FileSystemHandlerLanes import FileSystemHandlerLanes
+from fswatcher.FileSystemHandlerFilter import FileSystemHandlerFilter
+from fswatcher.FileSystemHandlerJournal import FileSystemHandlerJournal
+from fswatcher.FileSystemHandlerRouter import (
+    FileSystemHandlerRoute,
+    FileSystemHandlerRouter,
+)
 from watchdog.events import (
     FileSystemEvent,
     FileOpenedEvent,
@@ -31,8 +55,32 @@ from watchdog.events import (
     FileSystemEventHandler,
     FileMovedEvent,
     FileDeletedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+)
+from typing import Optional, Dict, Any, Tuple
+
+# Megabyte in bytes, the multipart settings are configured in MB
+MB = 1024**2
+
+# Transfer profiles picked by file size with automatic transfer tuning,
+# (files smaller than, multipart threshold, part size, threads multiplier)
+TRANSFER_PROFILES = {
+    # Housekeeping files are uploaded in a single request each
+    "small": (64 * MB, 64 * MB, 8 * MB, 1),
+    "medium": (1024 * MB, 64 * MB, 16 * MB, 1),
+    # Raw files use large parts and more threads to saturate the uplink
+    "large": (float("inf"), 64 * MB, 64 * MB, 2),
+}
+
+# Error codes returned by S3 when requests are throttled
+S3_THROTTLING_ERRORS = (
+    "SlowDown",
+    "ServiceUnavailable",
+    "RequestLimitExceeded",
+    "Throttling",
+    "503",
 )
-from typing import List, Optional, Union, Dict, Any, Tuple
 
 
 class FileSystemHandler(FileSystemEventHandler):
@@ -40,9 +88,6 @@ class FileSystemHandler(FileSystemEventHandler):
     Subclass to handle file system events
     """
 
-    events: List[FileSystemHandlerEvent] = []
-    dead_letter_queue: List[dict] = []
-
     def __init__(
         self,
         config: FileSystemHandlerConfig,
@@ -63,6 +108,47 @@ class FileSystemHandler(FileSystemEventHandler):
         # Time since last refresh
         self.last_refresh_time = time.time()
 
+        # Initialize the index of events waiting for an upload worker
+        self.events = FileSystemHandlerEventIndex()
+
+        # Initialize the metrics, served on the metrics port if set
+        self.metrics = FileSystemHandlerMetrics(port=config.metrics_port)
+
+        # Initialize the circuit breaker pausing uploads while S3 is failing
+        self.circuit_breaker = FileSystemHandlerCircuitBreaker()
+
+        # Initialize the controllers adapting the number of concurrent uploads, one per
+        # lane limited by its workers so a throttled bulk lane never holds back the express
+        # lane. Uploads outside of the lanes use the controller of the normal lane
+        lane_workers = {"normal": config.max_concurrency or config.upload_workers}
+        if config.priority_lanes:
+            lane_workers["express"] = config.express_workers
+            lane_workers["bulk"] = config.bulk_workers
+        self.concurrency = (
+            {
+                lane: FileSystemHandlerConcurrency(
+                    min_limit=min(config.min_concurrency, workers),
+                    max_limit=workers,
+                )
+                for lane, workers in lane_workers.items()
+            }
+            if config.adaptive_concurrency
+            else {}
+        )
+
+        # Initialize the dead letter queue of failed uploads
+        self.dead_letter_queue = FileSystemHandlerDeadLetterQueue(
+            dead_letter_queue_path=config.dead_letter_queue_path
+        )
+
+        # Guards refreshes of the boto3 session. Every refresh starts a new generation
+        # of the S3 client and transfer managers, the managers of an older generation
+        # are shut down once the last upload using them is done
+        self.session_lock = threading.Lock()
+        self.session_generation = 0
+        self.session_users: Dict[int, int] = {}
+        self.retired_transfers: Dict[int, Dict[str, S3Transfer]] = {}
+
         # Check if bucket name is and accessible using boto
         try:
             # Initialize Boto3 Session
@@ -74,16 +160,8 @@ class FileSystemHandler(FileSystemEventHandler):
                 else boto3.session.Session(region_name=config.aws_region)
             )
 
-            # Initialize S3 Transfer Manager with concurrency limit
-            botocore_config = botocore.config.Config(
-                max_pool_connections=self.concurrency_limit
-            )
-            self.s3_client = self.boto3_session.client("s3", config=botocore_config)
-            transfer_config = TransferConfig(
-                use_threads=True,
-                max_concurrency=self.concurrency_limit,
-            )
-            self.s3t = S3Transfer(self.s3_client, transfer_config)
+            # Initialize S3 Transfer Managers with concurrency limit
+            self._create_s3_transfers()
 
         except botocore.exceptions.ClientError as e:
             # If a client error is thrown, then check that it was a 404 error.
@@ -99,6 +177,16 @@ class FileSystemHandler(FileSystemEventHandler):
 
                 sys.exit(1)
 
+        # Initialize the multipart uploader of large files, its part threads are shared
+        # by every upload so they stay within the connection pool of the S3 client
+        self.multipart = (
+            FileSystemHandlerMultipart(
+                workers=config.transfer_threads or self.concurrency_limit
+            )
+            if config.zero_copy
+            else None
+        )
+
         # Initialize the bucket name
         self.bucket_name = config.bucket_name
 
@@ -108,6 +196,18 @@ class FileSystemHandler(FileSystemEventHandler):
         # Initialize the timestream table
         self.timestream_table = config.timestream_table
 
+        # Initialize the buffered Timestream writer
+        self.timestream = (
+            FileSystemHandlerTimestream(
+                boto3_session=self.boto3_session,
+                timestream_db=self.timestream_db,
+                timestream_table=self.timestream_table,
+                spill_path=config.timestream_spill_path,
+            )
+            if self.timestream_db and self.timestream_table
+            else None
+        )
+
         # Check s3
         if config.check_s3 == True:
             self.check_with_s3 = True
@@ -135,21 +235,160 @@ class FileSystemHandler(FileSystemEventHandler):
         else:
             self.slack_client = None
 
-        # Validate the path
-        if not os.path.exists(config.path):
-            log.error(
-                {"status": "ERROR", "message": f"Path ({config.path}) does not exist"}
+        # Initialize the Slack notifier sending the notifications in the background
+        self.slack = (
+            FileSystemHandlerSlack(
+                slack_client=self.slack_client,
+                slack_channel=config.slack_channel,
+                digest_interval=config.slack_digest_interval,
+                digest_size=config.slack_digest_size,
+            )
+            if self.slack_client is not None
+            else None
+        )
+
+        # Initialize the include and exclude patterns, compiled once and checked
+        # before an event is built or a directory is scanned
+        self.path_filter = FileSystemHandlerFilter(
+            include=[p for p in config.include_patterns.split(",") if p],
+            exclude=[p for p in config.exclude_patterns.split(",") if p],
+        )
+
+        # Initialize the router picking the watch rule of every file, the path and
+        # bucket name are the only rule unless rules are loaded from a file. The
+        # patterns match the paths relative to the root of their rule
+        self.router = (
+            FileSystemHandlerRouter.from_rules_file(
+                config.rules_file,
+                allow_delete=config.allow_delete,
+                path_filter=self.path_filter,
             )
+            if config.rules_file
+            else FileSystemHandlerRouter(
+                [
+                    FileSystemHandlerRoute(
+                        root=config.path,
+                        bucket_name=config.bucket_name,
+                        allow_delete=config.allow_delete,
+                    )
+                ],
+                path_filter=self.path_filter,
+            )
+        )
+
+        # Validate the paths
+        for root in self.router.get_roots():
+            if not os.path.exists(root):
+                log.error(
+                    {"status": "ERROR", "message": f"Path ({root}) does not exist"}
+                )
 
-            sys.exit(1)
+                sys.exit(1)
+
+        # Path to watch and bucket name of the first watch rule, used by the IAM policy test
+        self.path = self.router.routes[0].root
+        self.bucket_name = self.router.routes[0].bucket_name
+
+        # Initialize the content hash flag, the checksums are kept in the ledger
+        self.content_hash = config.content_hash
 
-        # Path to watch
-        self.path = config.path
+        # Initialize the upload ledger
+        self.ledger = (
+            FileSystemHandlerLedger(ledger_path=config.ledger_path)
+            if config.use_ledger or self.content_hash
+            else None
+        )
 
         if config.test_iam_policy == True:
             log.info("Performing Push/Remove Test Run")
             self._test_iam_policy()
 
+        # Initialize the journal of the events in flight, replayed after a crash
+        self.journal = (
+            FileSystemHandlerJournal(
+                journal_path=config.journal_path,
+                commit_interval=config.journal_commit_interval / 1000,
+            )
+            if config.use_journal
+            else None
+        )
+        complete = self.journal.complete if self.journal is not None else None
+
+        # Initialize the upload pipeline, keeps uploads off the observer thread.
+        # With priority lanes, small files and manifests don't wait behind large files
+        self.pipeline = (
+            FileSystemHandlerLanes(
+                handle_event=self._handle_event,
+                workers={
+                    "express": config.express_workers,
+                    "normal": config.upload_workers,
+                    "bulk": config.bulk_workers,
+                },
+                queue_size=config.queue_size,
+                express_max_size=config.express_max_size * 1024,
+                bulk_min_size=config.bulk_min_size * MB,
+                express_patterns=[p for p in config.express_patterns.split(",") if p],
+                bulk_patterns=[p for p in config.bulk_patterns.split(",") if p],
+            )
+            if config.priority_lanes
+            else FileSystemHandlerPipeline(
+                handle_event=self._handle_event,
+                workers=config.upload_workers,
+                queue_size=config.queue_size,
+            )
+        )
+        self.pipeline.start()
+
+        # Initialize the bundler packing small files into one object per directory
+        self.bundler = (
+            FileSystemHandlerBundler(
+                upload=self._upload_to_s3_bucket,
+                uploaded=self._record_upload,
+                size_threshold=config.bundle_size_threshold * 1024,
+                window=config.bundle_window,
+                max_files=config.bundle_max_files,
+                handled=complete,
+            )
+            if config.bundle_small_files
+            else None
+        )
+
+        # Initialize the coalescer, merges the events of a path until it is quiet.
+        # Files are complete once closed in close mode, so they are not debounced
+        self.coalescer = FileSystemHandlerCoalescer(
+            submit=self._submit_event,
+            quiet_period=0 if config.trigger_mode == "close" else config.quiet_period,
+            max_pending=config.queue_size,
+            discard=complete,
+        )
+        self.coalescer.start()
+
+        # Initialize the tracker holding the files being written until they are closed
+        self.close_write = (
+            FileSystemHandlerCloseWrite(
+                submit=self.coalescer.add,
+                timeout=config.close_timeout,
+                max_pending=config.queue_size,
+                discard=complete,
+            )
+            if config.trigger_mode == "close"
+            else None
+        )
+        if self.close_write is not None:
+            self.close_write.start()
+
+        # Initialize the background retrier of the dead letter queue, started when watching
+        self.retrier_stopped = threading.Event()
+        self.retrier = None
+
+        # Start the metrics endpoint, values read when scraped cost nothing in between
+        self._register_metrics()
+        self.metrics.start()
+
+        # Replay the events the last run accepted but never finished
+        if self.journal is not None:
+            self._replay_journal()
+
     def on_any_event(self, event: FileSystemEvent) -> None:
         """
         Overloaded Function to deal with any event
@@ -160,22 +399,109 @@ class FileSystemHandler(FileSystemEventHandler):
         if filtered_event is None:
             return
 
-        # Append the event to the list of events
-        self.events.append(filtered_event)
+        self.metrics.events.inc(label=filtered_event.action_type)
+
+        # Journal the event before it is held anywhere in memory
+        if self.journal is not None:
+            self.journal.accept(filtered_event)
+
+        # Hold the files being written until they are closed
+        if self.close_write is not None:
+            self.close_write.add(filtered_event)
+            return
+
+        # Merge the event with the pending events of the same path
+        self.coalescer.add(filtered_event)
+
+    def _submit_event(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to queue a settled event for the upload workers
+        """
+        # Add the event to the index of events in flight
+        self.events.add(event)
+
+        # Queue the event for the upload workers
+        self.pipeline.submit(event)
 
-        # Handle the event
-        self._handle_event(filtered_event)
+    def stop(self) -> None:
+        """
+        Function to flush pending events, wait for queued events and stop the upload workers
+        """
+        if self.close_write is not None:
+            self.close_write.stop()
+        self.coalescer.stop()
+        self.pipeline.stop()
+        if self.bundler is not None:
+            self.bundler.stop()
+        if self.multipart is not None:
+            self.multipart.close()
+        self.retrier_stopped.set()
+        if self.retrier is not None:
+            self.retrier.join()
+        if self.timestream is not None:
+            self.timestream.stop()
+        if self.slack is not None:
+            self.slack.stop()
+        self.dead_letter_queue.close()
+        if self.ledger is not None:
+            self.ledger.close()
+        if self.journal is not None:
+            self.journal.close()
+        self.metrics.stop()
+
+    def _register_metrics(self) -> None:
+        """
+        Function to register the metrics read from the components when scraped
+        """
+        self.metrics.callback(
+            "fswatcher_queue_depth",
+            "Events waiting for an upload worker",
+            self.pipeline.qsize,
+        )
+        self.metrics.callback(
+            "fswatcher_pending_events",
+            "Events waiting for their path to be quiet",
+            lambda: len(self.coalescer.pending)
+            + (len(self.close_write.pending) if self.close_write is not None else 0),
+        )
+        self.metrics.callback(
+            "fswatcher_dead_letter_queue_size",
+            "Failed uploads waiting for a retry",
+            lambda: len(self.dead_letter_queue),
+        )
+        if self.journal is not None:
+            self.metrics.callback(
+                "fswatcher_journal_pending_events",
+                "Journaled events not yet uploaded",
+                lambda: len(self.journal),
+            )
+        if self.concurrency:
+            self.metrics.callback(
+                "fswatcher_concurrency_limit",
+                "Concurrent uploads allowed by the adaptive controllers of every lane",
+                lambda: sum(c.limit for c in self.concurrency.values()),
+            )
+        if self.slack is not None:
+            self.metrics.callback(
+                "fswatcher_slack_failures_total",
+                "Slack notifications that could not be sent",
+                lambda: self.slack.failures,
+                metric_type="counter",
+            )
+        if self.timestream is not None:
+            self.metrics.callback(
+                "fswatcher_timestream_failures_total",
+                "Timestream batches that could not be written",
+                lambda: self.timestream.failures,
+                metric_type="counter",
+            )
 
     def _filter_event(self, event: FileSystemEvent) -> FileSystemHandlerEvent or None:
         """
         Function to filter events
         """
-        # Skip if file is hermes.log file
-        if "hermes.log" in event.src_path:
-            return None
-
-        # Skip closed events
-        if isinstance(event, FileClosedEvent):
+        # Skip closed events, unless uploads are triggered when files are closed
+        if isinstance(event, FileClosedEvent) and self.close_write is None:
             return None
 
         # Skip closed events
@@ -186,14 +512,21 @@ class FileSystemHandler(FileSystemEventHandler):
         if event.is_directory:
             return None
 
+        # Skip files no watch rule matches, the excluded files and the files below
+        # excluded directories
+        path = getattr(event, "dest_path", "") or event.src_path
+        route = self.router.get_route(path)
+        if route is None:
+            return None
+
         # Initialize the file system event
         file_system_event = FileSystemHandlerEvent(
             event=event,
-            watch_path=self.path,
-            bucket_name=self.bucket_name,
+            watch_path=route.root,
+            bucket_name=route.bucket_name,
         )
 
-        # Skip if duplicate event
+        # Skip if the latest queued event of the path is the same, it uploads this change too
         if file_system_event in self.events:
             return None
 
@@ -203,6 +536,13 @@ class FileSystemHandler(FileSystemEventHandler):
         """
         Function to handle file events and upload to S3
         """
+        # Remove the event from the index, changes made from here on queue a new event
+        self.events.discard(event)
+
+        # Bundled files are complete once their bundle is uploaded
+        bundled = False
+        failed = False
+
         try:
             # Get the log message
             log_message = event.get_log_message()
@@ -211,87 +551,45 @@ class FileSystemHandler(FileSystemEventHandler):
             log.info(log_message)
 
             if event.action_type != "DELETE":
-                # Send Slack Notification about the event
-                if self.slack_client is not None:
-                    try:
-                        slack_message = generate_file_pipeline_message(event.get_path())
-                        send_slack_notification(
-                            slack_client=self.slack_client,
-                            slack_channel=self.slack_channel,
-                            slack_message=slack_message,
-                        )
-                    except Exception as e:
-                        log.error(e)
+                # Send Slack Notification about the event, retries were notified already
+                if self.slack is not None and not event.dead_letter:
+                    self.slack.file_detected(event.get_path())
 
-                # Generate Object Tags String
-                tags = self._generate_object_tags(
-                    event=event,
-                )
-
-                # Upload to S3 Bucket
-                self._upload_to_s3_bucket(
-                    src_path=event.get_path(),
-                    bucket_name=event.bucket_name,
-                    file_key=event.get_parsed_path(),
-                    tags=tags,
-                )
+                # Small files are uploaded later with the bundle of their directory,
+                # retries are uploaded as the object that failed
+                bundled = not event.dead_letter and self._add_to_bundle(event)
+                if not bundled:
+                    self._upload_event(event)
 
-                # Send Slack Notification about the event
-                if self.slack_client is not None:
-                    try:
-                        if not is_file_manifest(event.get_path()):
-                            slack_message = generate_file_pipeline_message(
-                                event.get_path()
-                            )
-                            # Get ts of the slack message
-                            ts = get_message_ts(
-                                slack_client=self.slack_client,
-                                slack_channel=self.slack_channel,
-                                text=slack_message,  # Pass the message_ts instead of slack_message
-                            )
-
-                            action_type = "upload"
-                            slack_message = generate_file_pipeline_message(
-                                event.get_path(), alert_type=action_type
-                            )
-
-                            # Send Slack Notification about the event within thread
-                            send_slack_notification(
-                                slack_client=self.slack_client,
-                                slack_channel=self.slack_channel,
-                                slack_message=slack_message,
-                                alert_type=action_type,
-                                thread_ts=ts,
-                            )
-                    except Exception as e:
-                        log.error(e)
-
-            elif event.action_type == "DELETE" and self.allow_delete:
+            elif event.action_type == "DELETE" and self._is_delete_allowed(event):
                 # Delete from S3 Bucket if allowed
                 self._delete_from_s3_bucket(
                     bucket_name=event.bucket_name,
                     file_key=event.get_parsed_path(),
                 )
 
-            # Log to Timestream
-            if self.timestream_db and self.timestream_table:
-                timestream_log(
-                    boto3_session=self.boto3_session,
-                    action_type=event.action_type,
-                    file_key=event.get_path(),
-                    new_file_key=event.get_parsed_path(),
-                    source_bucket="External Server",
-                    destination_bucket=None
-                    if event.action_type == "DELETE"
-                    else event.bucket_name,
-                    timestream_db=self.timestream_db,
-                    timestream_table=self.timestream_table,
+            # Remove deleted files from the ledger and the failed uploads
+            if event.action_type == "DELETE":
+                if self.ledger is not None:
+                    self.ledger.remove(event.get_path())
+                self.dead_letter_queue.remove_path(event.get_path())
+
+            # Log to Timestream, retries were logged already
+            if self.timestream is not None and not event.dead_letter:
+                self.timestream.log(
+                    generate_timestream_record(
+                        action_type=event.action_type,
+                        file_key=event.get_path(),
+                        new_file_key=event.get_parsed_path(),
+                        source_bucket="External Server",
+                        destination_bucket=None
+                        if event.action_type == "DELETE"
+                        else event.bucket_name,
+                    )
                 )
 
-            # Remove the event from the list
-            self.events.remove(event)
-
         except Exception as e:
+            failed = True
             log.error(e)
             log.error(
                 {
@@ -300,6 +598,150 @@ class FileSystemHandler(FileSystemEventHandler):
                 }
             )
 
+        # Failed uploads are kept by the dead letter queue, the event is done. Events
+        # that raised stay in the journal and are replayed on the next start
+        if self.journal is not None and not bundled and not failed:
+            self.journal.complete(event.get_path(), event.sequence)
+
+    def _upload_event(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to upload the file of an event and record the upload
+        """
+
+        # Generate Object Tags String
+        tags = self._generate_object_tags(
+            event=event,
+        )
+
+        # Get the file stats before uploading, changes during the upload are uploaded again
+        stats = os.stat(event.get_path()) if self.ledger is not None else None
+
+        # Skip the upload if the same content was already uploaded
+        checksum = None
+        if self.content_hash:
+            checksum = get_file_checksum(event.get_path())
+            if self._is_content_uploaded(event, stats, checksum):
+                log.info(
+                    f"Object ({event.get_parsed_path()}) - Content unchanged, skipping upload"
+                )
+                self.ledger.record(
+                    path=event.get_path(),
+                    size=stats.st_size,
+                    mtime_ns=stats.st_mtime_ns,
+                    key=self._get_object_key(
+                        event.bucket_name, event.get_parsed_path()
+                    ),
+                    checksum=checksum,
+                    bucket=self._get_bucket(event.bucket_name),
+                )
+                self.dead_letter_queue.remove_path(event.get_path())
+                return
+
+        # Upload to S3 Bucket
+        uploaded = self._upload_to_s3_bucket(
+            src_path=event.get_path(),
+            bucket_name=event.bucket_name,
+            file_key=event.get_parsed_path(),
+            tags=tags,
+            checksum=checksum,
+        )
+
+        if uploaded:
+            self.metrics.detection_latency.observe(time.time() - event.detected)
+            self._record_upload(
+                event.get_path(),
+                event.bucket_name,
+                event.get_parsed_path(),
+                stats,
+                checksum,
+            )
+
+    def _is_content_uploaded(
+        self, event: FileSystemHandlerEvent, stats: os.stat_result, checksum: str
+    ) -> bool:
+        """
+        Function to check if the content of a file matches the last upload or the S3 checksum
+        """
+
+        entry = self.ledger.lookup(event.get_path())
+        if entry is not None:
+            return (
+                entry[0] == stats.st_size
+                and entry[4] == checksum
+                and self.ledger.is_target(
+                    entry,
+                    self._get_bucket(event.bucket_name),
+                    self._get_object_key(event.bucket_name, event.get_parsed_path()),
+                )
+            )
+
+        # Only ask S3 when checking against S3, new files would cost an extra request
+        if not self.check_with_s3:
+            return False
+
+        bucket_name = self._get_bucket(event.bucket_name)
+        try:
+            response = self.s3_client.head_object(
+                Bucket=bucket_name,
+                Key=self._get_object_key(event.bucket_name, event.get_parsed_path()),
+                ChecksumMode="ENABLED",
+            )
+        except botocore.exceptions.ClientError:
+            return False
+
+        # Multipart objects have a checksum of the part checksums that can't be compared
+        return response.get("ChecksumSHA256") == checksum
+
+    def _record_upload(
+        self,
+        src_path: str,
+        bucket_name: str,
+        file_key: str,
+        stats: Optional[os.stat_result],
+        checksum: Optional[str] = None,
+    ) -> None:
+        """
+        Function to record a successful upload in the ledger and notify Slack
+        """
+
+        # Record the upload in the ledger
+        if self.ledger is not None:
+            self.ledger.record(
+                path=src_path,
+                size=stats.st_size,
+                mtime_ns=stats.st_mtime_ns,
+                key=self._get_object_key(bucket_name, file_key),
+                checksum=checksum,
+                bucket=self._get_bucket(bucket_name),
+            )
+
+        # A successful upload resolves the failed uploads of the path
+        self.dead_letter_queue.remove_path(src_path)
+
+        # Send Slack Notification about the upload within the thread of the file
+        if self.slack is not None:
+            route = self.router.get_route(src_path)
+            self.slack.file_uploaded(
+                src_path,
+                os.path.relpath(src_path, route.root) if route is not None else None,
+            )
+
+    def _add_to_bundle(self, event: FileSystemHandlerEvent) -> bool:
+        """
+        Function to add a small file to the bundle of its directory, returns False if it isn't bundled
+        """
+
+        # Manifests are kept as objects of their own for the pipeline
+        if self.bundler is None or is_file_manifest(event.get_path()):
+            return False
+
+        return self.bundler.add(
+            src_path=event.get_path(),
+            bucket_name=event.bucket_name,
+            file_key=event.get_parsed_path(),
+            sequence=event.sequence,
+        )
+
     @staticmethod
     def _generate_object_tags(event: FileSystemHandlerEvent) -> str:
         """
@@ -340,12 +782,66 @@ class FileSystemHandler(FileSystemEventHandler):
                 {"status": "ERROR", "message": f"Error generating object tags: {e}"}
             )
 
-    def _upload_to_s3_bucket(self, src_path, bucket_name, file_key, tags):
+    @staticmethod
+    def _get_bucket(bucket_name: str) -> str:
+        """
+        Function to return the bucket of a bucket name that may include directories
+        """
+        return bucket_name.split("/", 1)[0]
+
+    @staticmethod
+    def _get_object_key(bucket_name: str, file_key: str) -> str:
         """
-        Function to Upload a file to an S3 Bucket
+        Function to return the object key of a file including the directories of the bucket name
+        """
+        if "/" in bucket_name:
+            folder = bucket_name.split("/", 1)[1]
+            if folder != "" and folder[-1] != "/":
+                folder = f"{folder}/"
+            return f"{folder}{file_key}"
+
+        return file_key
+
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        """
+        Function to check if an upload failed because S3 throttled it
+        """
+
+        if isinstance(error, botocore.exceptions.ClientError):
+            return (
+                error.response["Error"].get("Code") in S3_THROTTLING_ERRORS
+                or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+                == 503
+            )
+
+        # S3UploadFailedError only keeps the message of the underlying error
+        return any(code in str(error) for code in S3_THROTTLING_ERRORS)
+
+    def _get_concurrency(self) -> Optional[FileSystemHandlerConcurrency]:
+        """
+        Function to return the concurrency controller of the lane of the calling thread
+        """
+
+        lane = None
+        if isinstance(self.pipeline, FileSystemHandlerLanes):
+            lane = self.pipeline.get_current_lane()
+
+        return self.concurrency.get(lane or "normal")
+
+    def _upload_to_s3_bucket(
+        self, src_path, bucket_name, file_key, tags, dead_letter=True, checksum=None
+    ) -> bool:
+        """
+        Function to Upload a file to an S3 Bucket, returns True if the upload succeeded.
+        Failed uploads are added to the dead letter queue unless dead_letter is False.
+        The base64 SHA256 checksum of the file is sent for S3 to verify if given.
         """
         log.debug(f"Object ({file_key}) - Uploading file to S3 Bucket ({bucket_name})")
 
+        # Keep the bucket name as passed in for the dead letter queue
+        dead_letter_bucket_name = bucket_name
+
         # If bucket name includes directories remove them from bucket_name and append to the file_key
         if "/" in bucket_name:
             bucket_name, folder = bucket_name.split("/", 1)
@@ -356,56 +852,239 @@ class FileSystemHandler(FileSystemEventHandler):
             upload_file_key = file_key
             folder = ""
 
+        # Wait while the circuit breaker is open
+        self.circuit_breaker.wait()
+
+        # If time since self.last_refresh is greater than 15 minutes refresh the boto session,
+        # before taking an upload slot so a failed refresh can't leak the slot
+        if time.time() - self.last_refresh_time >= 900:  # 900 seconds = 15 minutes
+            self._refresh_boto_session(self.session_generation)
+
+        # Wait for an upload slot, S3 throttles requests per prefix. Nothing that can
+        # raise runs between taking the slot and the try that releases it
+        prefix = f"{bucket_name}/{os.path.dirname(upload_file_key)}"
+        concurrency = self._get_concurrency()
+        if concurrency is not None:
+            concurrency.acquire(prefix)
+
+        # Keep using the client and transfer managers of this generation, a refresh
+        # by another worker doesn't swap them out from under the upload
+        generation, s3_client, s3_transfers = self._acquire_s3_transfers()
+        uploaded_size = 0
+        throttled = False
+        result = "failure"
+        start = time.monotonic()
+        self.metrics.uploads_in_flight.inc()
+
         try:
             # Upload to S3 Bucket
-            # If time since self.last_refresh is greater than 15 minutes refresh the boto session
-            if time.time() - self.last_refresh_time >= 900:  # 900 seconds = 15 minutes
-                self._refresh_boto_session()
-            self.s3t.upload_file(
-                src_path,
-                bucket_name,
-                upload_file_key,
-                extra_args={"Tagging": tags},
-            )
+            size = os.path.getsize(src_path)
+            profile = self._get_transfer_profile(size)
+            transfer_config = self.transfer_configs[profile]
+            multipart = size >= transfer_config.multipart_threshold
+            extra_args = {"Tagging": tags} if tags else {}
+
+            if checksum and not multipart:
+                # Single requests carry the checksum, S3 verifies it without another read
+                with open(src_path, "rb") as body:
+                    s3_client.put_object(
+                        Bucket=bucket_name,
+                        Key=upload_file_key,
+                        Body=body,
+                        ChecksumAlgorithm="SHA256",
+                        ChecksumSHA256=checksum,
+                        **extra_args,
+                    )
+            else:
+                # Parts are checksummed as they are sent
+                if checksum:
+                    extra_args["ChecksumAlgorithm"] = "SHA256"
+
+                if multipart and self.multipart is not None:
+                    # Parts are streamed from the file as they are sent
+                    self.multipart.upload(
+                        s3_client,
+                        src_path,
+                        bucket_name,
+                        upload_file_key,
+                        part_size=transfer_config.multipart_chunksize,
+                        extra_args=extra_args,
+                    )
+                else:
+                    s3_transfers[profile].upload_file(
+                        src_path,
+                        bucket_name,
+                        upload_file_key,
+                        extra_args=extra_args,
+                    )
 
             if folder != "" and folder[0] != "/":
                 folder = f"/{folder}"
             log.info(
                 f"Object ({file_key}) - Successfully Uploaded to S3 Bucket ({bucket_name}{folder})"
             )
+            self.circuit_breaker.record_success()
+            uploaded_size = size
+            result = "success"
+
+            return True
 
-        except boto3.exceptions.RetriesExceededError:
+        except (
+            boto3.exceptions.RetriesExceededError,
+            botocore.exceptions.BotoCoreError,
+        ) as e:
+            error = e
             log.error(
                 {
                     "status": "ERROR",
-                    "message": f"Error uploading to S3 Bucket ({bucket_name}): Retries Exceeded",
+                    "message": f"Error uploading to S3 Bucket ({bucket_name}): {e}",
                 }
             )
-            time.sleep(5)
-            self.dead_letter_queue.append(
+
+        except (
+            boto3.exceptions.S3UploadFailedError,
+            botocore.exceptions.ClientError,
+        ) as e:
+            error = e
+            throttled = self._is_throttled(e)
+
+            # Throttling is not a session problem, the concurrency controller backs off instead
+            if throttled:
+                result = "throttled"
+                log.warning(f"Object ({file_key}) - S3 throttled the upload: {e}")
+            else:
+                self._refresh_boto_session(generation)
+                log.error(
+                    {"status": "ERROR", "message": f"Error uploading to S3 Bucket: {e}"}
+                )
+                if self.slack is not None:
+                    self.slack.upload_failed(
+                        f"FSWatcher: Error uploading file to {bucket_name} - ({file_key}) :file_folder:"
+                    )
+
+        except OSError as e:
+            # The file went away or was truncated while it was read, S3 is not at fault
+            error = e
+            log.error(
                 {
-                    "src_path": src_path,
-                    "bucket_name": bucket_name,
-                    "file_key": file_key,
-                    "tags": tags,
+                    "status": "ERROR",
+                    "message": f"Error reading file ({src_path}) to upload: {e}",
                 }
             )
-            log.info(self.dead_letter_queue)
 
-        except botocore.exceptions.ClientError as e:
-            self._refresh_boto_session()
-            log.error(
-                {"status": "ERROR", "message": f"Error uploading to S3 Bucket: {e}"}
+        finally:
+            self._release_s3_transfers(generation)
+
+            if concurrency is not None:
+                concurrency.release(prefix, uploaded_size, throttled)
+
+            self.metrics.uploads_in_flight.dec()
+            self.metrics.upload_duration.observe(time.monotonic() - start)
+            self.metrics.uploads.inc(label=result)
+            self.metrics.uploaded_bytes.inc(uploaded_size)
+
+        if not isinstance(error, OSError):
+            self.circuit_breaker.record_failure()
+
+        # Persist the failed upload so the retrier picks it up
+        if dead_letter:
+            self.dead_letter_queue.add(
+                src_path=src_path,
+                bucket_name=dead_letter_bucket_name,
+                file_key=file_key,
+                tags=tags,
+                error=str(error),
             )
+            log.info(
+                f"Object ({file_key}) - Added to the dead letter queue ({len(self.dead_letter_queue)} failed uploads)"
+            )
+
+        return False
+
+    def _retry_dead_letter(self, entry) -> None:
+        """
+        Function to resubmit a failed upload to the upload workers, so the retry keeps
+        its order with the other events of the path. The entry is removed once the path
+        is uploaded, a failed retry updates it.
+        """
+        src_path = entry["src_path"]
+
+        # Nothing to upload anymore if the file was removed in the meantime
+        if not os.path.exists(src_path):
+            log.info(f"Object ({entry['file_key']}) - File no longer exists, dropping")
+            self.dead_letter_queue.remove(entry)
+            return
+
+        route = self.router.get_route(src_path)
+        if route is None:
+            log.info(
+                f"Object ({entry['file_key']}) - No watch rule uploads the file anymore, dropping"
+            )
+            self.dead_letter_queue.remove(entry)
+            return
+
+        # A queued event of the path uploads its current content anyway
+        if self.events.is_queued(src_path):
+            return
+
+        # Back off before the next retry, the retry is not picked again while queued
+        self.dead_letter_queue.reschedule(entry)
+
+        event = FileSystemHandlerEvent(
+            event=FileModifiedEvent(src_path),
+            watch_path=route.root,
+            bucket_name=route.bucket_name,
+        )
+        event.dead_letter = True
+        self._submit_event(event)
+
+    def start_dead_letter_retrier(self) -> None:
+        """
+        Function to start the background retrier of the failed uploads that are due
+        """
+        self.retrier = threading.Thread(
+            target=self._dead_letter_retrier,
+            name="fswatcher-dead-letter-retrier",
+            daemon=True,
+        )
+        self.retrier.start()
+
+    def _dead_letter_retrier(self) -> None:
+        """
+        Background loop retrying the failed uploads that are due
+        """
+        while not self.retrier_stopped.wait(1):
             try:
-                send_slack_notification(
-                    slack_client=self.slack_client,
-                    slack_channel=self.slack_channel,
-                    slack_message=f"FSWatcher: Error uploading file to {bucket_name} - ({file_key}) :file_folder:",
-                    alert_type="error",
-                )
+                for entry in self.dead_letter_queue.get_entries(
+                    due_only=True, limit=100
+                ):
+                    if self.retrier_stopped.is_set():
+                        break
+                    self._retry_dead_letter(entry)
             except Exception as e:
-                log.error(e)
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Error retrying the dead letter queue: {e}",
+                    }
+                )
+
+    def replay_dead_letter_queue(self) -> None:
+        """
+        Function to retry every failed upload in the dead letter queue now
+        """
+        entries = self.dead_letter_queue.get_entries()
+        log.info(f"Replaying {len(entries)} failed uploads")
+
+        for entry in entries:
+            self._retry_dead_letter(entry)
+
+        # Wait for the upload workers to handle the retries
+        self.pipeline.join()
+
+        log.info(
+            f"Replayed {len(entries)} failed uploads, {len(self.dead_letter_queue)} still failing"
+        )
 
     def _delete_from_s3_bucket(self, bucket_name, file_key):
         """
@@ -421,67 +1100,199 @@ class FileSystemHandler(FileSystemEventHandler):
         log.debug(f"Object ({file_key}) - Deleting file from S3 Bucket ({bucket_name})")
 
         try:
-            if self.allow_delete:
-                if (
-                    time.time() - self.last_refresh_time >= 900
-                ):  # 900 seconds = 15 minutes
-                    self._refresh_boto_session()
-                self.s3_client.delete_object(Bucket=bucket_name, Key=file_key)
+            if time.time() - self.last_refresh_time >= 900:  # 900 seconds = 15 minutes
+                self._refresh_boto_session(self.session_generation)
+            self.s3_client.delete_object(Bucket=bucket_name, Key=file_key)
 
-                log.info(
-                    f"Object ({file_key}) - Successfully deleted from S3 Bucket ({bucket_name})"
-                )
+            log.info(
+                f"Object ({file_key}) - Successfully deleted from S3 Bucket ({bucket_name})"
+            )
         except botocore.exceptions.ClientError as e:
             log.error(
                 {"status": "ERROR", "message": f"Error deleting from S3 Bucket: {e}"}
             )
 
-    # Recursively get all file in the specified directory as a list with optional date filter (datetime) also print out how long it took to get the files and the number of files
+    # Recursively yield all files and their stats in the specified directory with an optional date filter (datetime), skipping the files the ledger already has an upload for
     def _get_files(self, path, date_filter=None):
-        files = []
-        start_time = time.time()
-        for root, _, file in os.walk(path):
-            for f in file:
-                file_path = os.path.join(root, f)
-                if date_filter:
-                    if self._check_date(file_path, date_filter):
-                        files.append(file_path)
-                else:
-                    files.append(file_path)
-
-        end_time = time.time()
-        log.info(
-            f"Found {len(files)} files in {round(end_time - start_time, 2)} seconds"
+        walker = FileSystemHandlerWalker(
+            workers=self.config.walk_workers,
+            min_mtime=datetime.timestamp(date_filter) if date_filter else None,
+            queue_size=self.config.backtrack_window,
+            router=self.router,
         )
 
-        # If Check with S3 is enabled, call the function to get all keys and compare with the files
-        if self.check_with_s3:
-            log.info("Checking files with S3 (This may take a while) ...")
+        for file_path, stats in walker.walk(path):
+            if self.ledger is not None and self._is_in_ledger(file_path, stats):
+                continue
 
-            keys = self._get_s3_keys(bucket_name=self.bucket_name)
+            yield file_path, stats
 
-            log.info("Now comparing files with S3 keys ...")
+    # Split an iterable of files into lists of at most window_size files
+    @staticmethod
+    def _get_windows(files, window_size):
+        window = []
+        for file in files:
+            window.append(file)
+            if len(window) >= window_size:
+                yield window
+                window = []
+
+        if window:
+            yield window
+
+    # Get the bucket name and the S3 object key of a local file, None if no watch rule matches it
+    def _get_file_key(self, file_path):
+        route = self.router.get_route(file_path)
+        if route is None:
+            return None, None
+
+        # Strip the watch path the same way FileSystemHandlerEvent.get_parsed_path does
+        parsed_path = "".join(file_path.split(route.root, 1))
+        if parsed_path.startswith("/"):
+            parsed_path = parsed_path[1:]
+        return route.bucket_name, self._get_object_key(route.bucket_name, parsed_path)
+
+    # Get the bucket and the S3 object key a local file is uploaded to, None if no watch rule matches it
+    def _get_upload_target(self, file_path):
+        bucket_name, file_key = self._get_file_key(file_path)
+        if bucket_name is None:
+            return None, None
+        return self._get_bucket(bucket_name), file_key
+
+    # Check if the ledger has an upload of the current version of a file to its current bucket and key
+    def _is_in_ledger(self, file_path, stats=None):
+        bucket, key = self._get_upload_target(file_path)
+        return self.ledger.is_uploaded(file_path, stats, bucket=bucket, key=key)
+
+    # Check if the watch rule of a deleted file allows deleting its object
+    def _is_delete_allowed(self, event):
+        route = self.router.get_route(event.get_path())
+        return route.allow_delete if route is not None else self.allow_delete
+
+    # Compare a local file with its S3 object and return "missing", "stale" or "identical"
+    def _compare_with_s3(self, size, mtime, s3_entry, file_path=None):
+        if s3_entry is None:
+            return "missing"
+
+        s3_size, s3_last_modified, etag = s3_entry
+        if size != s3_size:
+            return "stale"
+
+        # With content hashing the content decides, so a file rewritten with an older mtime is stale too
+        if self.content_hash and file_path is not None:
+            matches = self._matches_etag(file_path, size, etag)
+            if matches is not None:
+                return "identical" if matches else "stale"
+
+        # The object is stale if the file changed after it was uploaded,
+        # LastModified only has a resolution of seconds
+        if int(mtime) > s3_last_modified:
+            return "stale"
+
+        return "identical"
+
+    # Check if a file matches the ETag of its object, None if the ETag can't be reproduced
+    def _matches_etag(self, file_path, size, etag):
+        try:
+            if "-" not in etag:
+                return get_file_etag(file_path) == etag
+
+            # Multipart ETags depend on the part size, try the ones this watcher uploads with
+            parts = int(etag.split("-", 1)[1])
+            part_sizes = {self.config.multipart_chunksize * MB} | {
+                profile[2] for profile in TRANSFER_PROFILES.values()
+            }
+            candidates = [
+                part_size
+                for part_size in sorted(part_sizes)
+                if max(1, -(-size // part_size)) == parts
+            ]
+            if not candidates:
+                return None
+
+            return any(
+                get_file_etag(file_path, part_size) == etag for part_size in candidates
+            )
+        except (OSError, ValueError):
+            return None
 
-            # Remove files that are already in S3
-            files = list(set(files) - set(keys))
-            # Log the first 10 files
-            log.info(f"First 10 files: {files[:10]}")
+    # Record a file that is identical to its S3 object in the ledger
+    def _record_identical(
+        self, file_path, size, mtime_ns, bucket_name, file_key, s3_entry
+    ):
+        if self.ledger is not None:
+            self.ledger.record(
+                path=file_path,
+                size=size,
+                mtime_ns=mtime_ns,
+                key=file_key,
+                etag=s3_entry[2],
+                bucket=self._get_bucket(bucket_name),
+            )
+
+    # Return the files of a window that are missing or stale in S3, listing only the directories the window touches
+    def _filter_s3_window(self, files, directory_indexes):
+        # Group the files of the window by directory, the parallel walk interleaves
+        # the files of many directories so each directory is listed once per window
+        directories = {}
+        for file_path, stats in files:
+            bucket_name, file_key = self._get_file_key(file_path)
+            if file_key is None:
+                continue
+            prefix = file_key.rsplit("/", 1)[0] + "/" if "/" in file_key else ""
+            directory = (self._get_bucket(bucket_name), prefix)
+            directories.setdefault(directory, []).append((file_path, stats, file_key))
+
+        changed_files = set()
+        for directory, directory_files in directories.items():
+            index = directory_indexes.pop(directory, None)
+            if index is None:
+                index = self._get_s3_directory_index(*directory)
+
+            # Keep the most recently used directories, a directory spans the windows
+            # until the walk is done with it
+            directory_indexes[directory] = index
+            while len(directory_indexes) > 64:
+                directory_indexes.popitem(last=False)
+
+            for file_path, stats, file_key in directory_files:
+                s3_entry = index.get(file_key)
+                if (
+                    self._compare_with_s3(
+                        stats.st_size, stats.st_mtime, s3_entry, file_path
+                    )
+                    == "identical"
+                ):
+                    self._record_identical(
+                        file_path,
+                        stats.st_size,
+                        stats.st_mtime_ns,
+                        directory[0],
+                        file_key,
+                        s3_entry,
+                    )
+                else:
+                    changed_files.add(file_path)
 
-            # Log the first 10 keys
-            log.info(f"First 10 keys: {keys[:10]}")
-            # Log the number of files that are not in S3
-            log.info(f"Found {len(files)} files that are not in S3")
+        # Dispatch in the order of the walk
+        return [file_path for file_path, _ in files if file_path in changed_files]
 
-        return files
+    # Convert a listed S3 object into a compact (size, last modified timestamp, etag) entry
+    @staticmethod
+    def _get_s3_entry(obj):
+        return (obj["Size"], obj["LastModified"].timestamp(), obj["ETag"].strip('"'))
 
-    # Check if the file is newer than the date filter
-    def _check_date(self, file, date_filter):
-        # Change date_filter from datetime to match modified time
-        date_filter = datetime.timestamp(date_filter)
+    # Get the index of the objects directly below a prefix of a bucket
+    def _get_s3_directory_index(self, bucket_name, prefix):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        index = {}
+        for page in paginator.paginate(
+            Bucket=bucket_name, Prefix=prefix, Delimiter="/"
+        ):
+            for obj in page.get("Contents", []):
+                index[obj["Key"]] = self._get_s3_entry(obj)
 
-        if os.path.getmtime(file) > date_filter:
-            return True
-        return False
+        return index
 
     # Go through the list of files and check if they are in the S3 bucket
     def _check_files(self, files, bucket_name):
@@ -495,13 +1306,15 @@ class FileSystemHandler(FileSystemEventHandler):
                     tags=self.tags,
                 )
                 self._refresh_boto_session()
-                timestream_log(
-                    boto3_session=self.boto3_session,
-                    action_type="PUT",
-                    file_key=file_key,
-                    source_bucket=self.base_path,
-                    destination_bucket=bucket_name,
-                )
+                if self.timestream is not None:
+                    self.timestream.log(
+                        generate_timestream_record(
+                            action_type="PUT",
+                            file_key=file_key,
+                            source_bucket=self.base_path,
+                            destination_bucket=bucket_name,
+                        )
+                    )
 
     # Go through the list of files and create a FileMovedEvent then dispatch it
     def _dispatch_events(self, files, deleted_files=None):
@@ -514,18 +1327,88 @@ class FileSystemHandler(FileSystemEventHandler):
                 event = FileDeletedEvent(file)
                 self.dispatch(event)
 
-    # Backtrack the directory tree
+    # Dispatch the events of the journal the last run never finished, then mark the old entries done
+    def _replay_journal(self):
+        recovered = self.journal.recovered
+        if not recovered:
+            return
+
+        log.info(f"Replaying {len(recovered)} incomplete events from the journal")
+        for record in recovered:
+            path = record["dest_path"] or record["src_path"]
+
+            if record["action_type"] == "DELETE":
+                event = FileDeletedEvent(record["src_path"])
+            elif not os.path.exists(path):
+                # Removed while the watcher was down, there is nothing left to upload
+                event = None
+            elif record["action_type"] == "PUT":
+                event = FileMovedEvent(record["src_path"], record["dest_path"])
+            elif record["action_type"] == "CREATE":
+                event = FileCreatedEvent(path)
+            elif record["closed"] and self.close_write is not None:
+                event = FileClosedEvent(path)
+            else:
+                # Closed events are dropped unless uploads are triggered on close
+                event = FileModifiedEvent(path)
+
+            # The replayed event is journaled again before the old entry is done
+            if event is not None:
+                self.dispatch(event)
+            self.journal.complete(path, record["sequence"])
+
+        self.journal.recovered = []
+
+    # Backtrack the directory tree, files are dispatched window by window while the walk is still running
     def backtrack(self, path, date_filter=None):
-        self._dispatch_events(self._get_files(path, date_filter))
+        start_time = time.time()
+        found = 0
+        dispatched = 0
+        directory_indexes = OrderedDict()
+
+        if self.check_with_s3:
+            log.info("Checking files with S3 while backtracking ...")
 
-    # Get all of the keys in an S3 bucket and return them as a list also support pagination if required, use s3 client instead of s3t because s3t does not support pagination
-    def _get_s3_keys(self, bucket_name):
-        keys = []
+        for window in self._get_windows(
+            self._get_files(path, date_filter), self.config.backtrack_window
+        ):
+            found += len(window)
+
+            # Only keep the files that are missing or stale in S3
+            if self.check_with_s3:
+                window = self._filter_s3_window(window, directory_indexes)
+            else:
+                window = [file_path for file_path, _ in window]
+
+            self._dispatch_events(window)
+            dispatched += len(window)
+
+            elapsed = time.time() - start_time
+            log.info(
+                f"Backtrack progress: {found} files found, {dispatched} dispatched in {round(elapsed, 2)} seconds ({round(found / max(elapsed, 0.001))} files/s)"
+            )
+
+        log.info(
+            f"Found {found} files, dispatched {dispatched} in {round(time.time() - start_time, 2)} seconds"
+        )
+
+    # Get all of the objects in an S3 bucket as an index of key -> (size, last modified timestamp, etag)
+    def _get_s3_index(self, bucket_name):
         start_time = time.time()
+        index = dict(self._list_s3_objects(bucket_name))
+        end_time = time.time()
+        log.info(
+            f"Found {len(index)} keys in {round(end_time - start_time, 2)} seconds"
+        )
+        return index
+
+    # Stream all of the objects in an S3 bucket as (key, (size, last modified timestamp, etag)), the listing is sharded by prefix and paginated concurrently
+    def _list_s3_objects(self, bucket_name):
         self._refresh_boto_session()
-        s3 = self.boto3_session.client("s3")
-        paginator = s3.get_paginator("list_objects_v2")
-        # If bucket name includes directories remove them from bucket_name and append to the file_key
+        s3_client = self.s3_client
+        workers = max(1, self.concurrency_limit)
+
+        # If bucket name includes directories only list the objects below them
         if "/" in bucket_name:
             bucket_name, folder = bucket_name.split("/", 1)
             if folder != "" and folder[-1] != "/":
@@ -533,16 +1416,80 @@ class FileSystemHandler(FileSystemEventHandler):
         else:
             folder = ""
 
-        operation_parameters = {"Bucket": bucket_name, "Prefix": folder}
-        page_iterator = paginator.paginate(**operation_parameters)
+        # Discover prefixes level by level until there are enough to keep the workers busy,
+        # the objects directly below each discovered level are yielded on the way
+        prefixes = [folder]
+        for _ in range(2):
+            if len(prefixes) >= workers:
+                break
+
+            sub_prefixes = []
+            for prefix in prefixes:
+                paginator = s3_client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(
+                    Bucket=bucket_name, Prefix=prefix, Delimiter="/"
+                ):
+                    for obj in page.get("Contents", []):
+                        yield obj["Key"], self._get_s3_entry(obj)
+                    sub_prefixes.extend(
+                        common_prefix["Prefix"]
+                        for common_prefix in page.get("CommonPrefixes", [])
+                    )
+            prefixes = sub_prefixes
 
-        for page in page_iterator:
-            if "Contents" in page:
-                for obj in page["Contents"]:
-                    keys.append(f'/watch/{obj["Key"].replace(folder, "")}')
-        end_time = time.time()
-        log.info(f"Found {len(keys)} keys in {round(end_time - start_time, 2)} seconds")
-        return keys
+        if not prefixes:
+            return
+
+        log.debug(f"Listing {len(prefixes)} prefixes with {workers} workers")
+
+        # Pages are handed to the consumer through a bounded queue
+        pages = Queue(maxsize=workers * 4)
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def list_prefix(prefix):
+            try:
+                paginator = s3_client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+                    if stopped.is_set():
+                        return
+                    put(
+                        [
+                            (obj["Key"], self._get_s3_entry(obj))
+                            for obj in page.get("Contents", [])
+                        ]
+                    )
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="fswatcher-list"
+        )
+        for prefix in prefixes:
+            executor.submit(list_prefix, prefix)
+
+        try:
+            remaining = len(prefixes)
+            while remaining:
+                page = pages.get()
+                if page is None:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False)
 
     def parse_datetime(self, date_string):
         if date_string is None or date_string == "":
@@ -597,7 +1544,9 @@ class FileSystemHandler(FileSystemEventHandler):
 
         # Check if the file exists in S3 using s3 client
         self._refresh_boto_session()
-        s3 = self.boto3_session.client("s3")
+        s3 = self.boto3_session.client(
+            "s3", endpoint_url=self.config.endpoint_url or None
+        )
 
         try:
             s3.get_object(
@@ -652,78 +1601,88 @@ class FileSystemHandler(FileSystemEventHandler):
                 "Since allow_delete is set to False, the test file will not be deleted from S3, please delete it manually"
             )
 
-    def process_files(self, new_files, old_files):
-        deleted_files = old_files - new_files
-
-        new_files = new_files - old_files
-
-        return new_files, deleted_files
-
     def check_path_exists(self, path):
         if not Path(path).exists():
             log.info(f"Path {path} does not exist")
             return False
         return True
 
-    def walk_directory_find(
-        self, path, excluded_files=None, excluded_exts=None, within_timestamp=None
-    ):
-        all_files = []
-        find_command = ["find", path, "-type", "f", "-not", "-path", "'*/\.*'"]
-        if within_timestamp:
-            find_command += [
-                "-newermt",
-                within_timestamp,
-            ]
-        result = subprocess.run(find_command, stdout=subprocess.PIPE)
-        output_lines = result.stdout.decode().splitlines()
-
-        for file_path in output_lines:
-            if (excluded_files and file_path in excluded_files) or (
-                excluded_exts and os.path.splitext(file_path)[1] in excluded_exts
-            ):
-                continue
-
-            try:
-                all_files.append((file_path))
-            except FileNotFoundError:
-                log.info(f"File {file_path} not found")
-
-        return set(all_files)
-
     def fallback_directory_watcher(self):
-        path = "/watch"
-
-        last_run_timestamp_str = None
-
-        # Initialize excluded_files and excluded_exts as empty lists
-        excluded_files = []
-        excluded_exts = []
-        if self.check_with_s3:
-            log.info("Checking S3 bucket for existing files...")
-            s3_set = set(self._get_s3_keys(self.bucket_name))
-            log.info(
-                f"Found {len(s3_set)} files in S3 bucket. Adding to db of existing files..."
-            )
         log.info("Starting directory watcher...")
-        if not self.check_path_exists(path):
+        roots = self.router.get_roots()
+        if not all(self.check_path_exists(root) for root in roots):
             log.info("Path does not exist, exiting...")
             return
         else:
-            log.info(f"Monitoring path: {path}")
+            log.info(f"Monitoring path: {', '.join(roots)}")
 
         log.info("Get initial Files")
         start = time.time()
 
-        # Get list of all files in directory
-        all_files = self.walk_directory_find(
-            path, excluded_files=excluded_files, excluded_exts=excluded_exts
-        )
+        # Get list of all files in the directories, the first scan reports every file as created
+        scanners = [
+            FileSystemHandlerScanner(
+                root,
+                prune=self.config.prune_scan,
+                deep_scan_interval=self.config.deep_scan_interval,
+                router=self.router,
+            )
+            for root in roots
+        ]
+        # The scanners skip the files no watch rule uploads
+        all_files = set()
+        for scanner in scanners:
+            files, _, _ = scanner.scan()
+            all_files.update(files)
+
+        # Skip the files the ledger already has an upload for
+        if self.ledger is not None:
+            unresolved_files = set(
+                self.ledger.get_unresolved(all_files, self._get_upload_target)
+            )
+            log.info(
+                f"Found {len(unresolved_files)} files not resolved by the upload ledger"
+            )
+        else:
+            unresolved_files = all_files
 
-        if self.check_with_s3:
-            new_files, deleted_files = self.process_files(all_files, s3_set)
+        # Only list the S3 bucket if there are files the ledger could not resolve
+        if self.check_with_s3 and unresolved_files:
+            log.info("Checking S3 bucket for existing files...")
+            s3_indexes = {}
+            new_files = set()
+            states = {"missing": 0, "stale": 0, "identical": 0}
+            for file_path in unresolved_files:
+                scanner = next(
+                    scanner
+                    for scanner in scanners
+                    if file_path.startswith(os.path.join(scanner.path, ""))
+                )
+                size, mtime_ns, _ = scanner.get_signature(file_path)
+                bucket_name, file_key = self._get_file_key(file_path)
+
+                # List every bucket of the watch rules once
+                if bucket_name not in s3_indexes:
+                    s3_indexes[bucket_name] = self._get_s3_index(bucket_name)
+                    log.info(
+                        f"Found {len(s3_indexes[bucket_name])} files in S3 bucket ({bucket_name}). Comparing size and modified time..."
+                    )
+                s3_entry = s3_indexes[bucket_name].get(file_key)
+                state = self._compare_with_s3(size, mtime_ns / 1e9, s3_entry, file_path)
+                states[state] += 1
+
+                if state == "identical":
+                    self._record_identical(
+                        file_path, size, mtime_ns, bucket_name, file_key, s3_entry
+                    )
+                else:
+                    new_files.add(file_path)
+
+            log.info(
+                f"Missing files: {states['missing']}, stale files: {states['stale']}, identical files: {states['identical']}"
+            )
         else:
-            new_files, deleted_files = self.process_files(all_files, set())
+            new_files = unresolved_files
 
         deleted_files = []
 
@@ -740,60 +1699,158 @@ class FileSystemHandler(FileSystemEventHandler):
 
         # Loop starts
         while True:
-            if last_run_timestamp_str:
-                # Get list of all files in directory
-                modified_files = self.walk_directory_find(
-                    path,
-                    excluded_files=excluded_files,
-                    excluded_exts=excluded_exts,
-                    within_timestamp=last_run_timestamp_str,
-                )
-            else:
-                modified_files = set()
-
-            # Get list of all files in directory
-            files = self.walk_directory_find(
-                path,
-                excluded_files=excluded_files,
-                excluded_exts=excluded_exts,
+            # Diff the trees against the previous scan in a single pass
+            start = time.time()
+            new_files, deleted_files = set(), set()
+            for scanner in scanners:
+                created_files, modified_files, scanner_deleted_files = scanner.scan()
+                new_files.update(created_files, modified_files)
+                deleted_files.update(scanner_deleted_files)
+
+            files_scanned = sum(scanner.files_scanned for scanner in scanners)
+            self.metrics.scan_duration.observe(time.time() - start)
+            self.metrics.files_scanned.inc(files_scanned)
+
+            log.debug(
+                f"Scanned {files_scanned} files in {sum(scanner.directories_scanned for scanner in scanners)} directories in {round(time.time() - start, 2)} seconds"
             )
-            new_files, deleted_files = self.process_files(files, all_files)
 
-            # Add modified files to new_files set
-            new_files = new_files.union(modified_files)
-            timestamp = int(time.time())
-            last_run_timestamp_str = time.strftime(
-                "%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)
-            )
             self._dispatch_events(list(new_files), deleted_files)
-            # Remove deleted files from all_files
-            all_files = all_files - deleted_files
-            # Add new files to all_files
-            all_files = all_files.union(new_files)
 
             # Sleep for 5 seconds
             time.sleep(5)
 
-    def _refresh_boto_session(self):
+    def _create_s3_transfers(self) -> None:
+        """
+        Function to create the S3 client and the transfer managers sharing it
+        """
         config = self.config
-        try:
-            self.boto3_session = (
-                boto3.session.Session(
-                    profile_name=config.profile, region_name=self.config.aws_region
-                )
-                if config.profile != ""
-                else boto3.session.Session(region_name=self.config.aws_region)
-            )
-            botocore_config = botocore.config.Config(
-                max_pool_connections=self.concurrency_limit
-            )
-            self.s3_client = self.boto3_session.client("s3", config=botocore_config)
-            transfer_config = TransferConfig(
+
+        # Threads of a transfer manager, shared by the files it uploads
+        threads = config.transfer_threads or self.concurrency_limit
+
+        # Transfer settings configured by the user
+        transfer_configs = {
+            "default": TransferConfig(
                 use_threads=True,
-                max_concurrency=self.concurrency_limit,
+                max_concurrency=threads,
+                multipart_threshold=config.multipart_threshold * MB,
+                multipart_chunksize=config.multipart_chunksize * MB,
+                max_io_queue=config.max_io_queue,
+            )
+        }
+
+        # Transfer settings picked by file size
+        if config.auto_transfer_tuning:
+            for name, profile in TRANSFER_PROFILES.items():
+                _, threshold, chunksize, multiplier = profile
+                transfer_configs[name] = TransferConfig(
+                    use_threads=True,
+                    max_concurrency=threads * multiplier,
+                    multipart_threshold=threshold,
+                    multipart_chunksize=chunksize,
+                    max_io_queue=config.max_io_queue,
+                )
+
+        # Size the connection pool for every transfer manager sharing the client
+        botocore_config = botocore.config.Config(
+            max_pool_connections=max(
+                self.concurrency_limit,
+                sum(
+                    transfer_config.max_concurrency
+                    for transfer_config in transfer_configs.values()
+                ),
             )
-            self.s3t = S3Transfer(self.s3_client, transfer_config)
-            self.last_refresh_time = time.time()
+        )
+        self.s3_client = self.boto3_session.client(
+            "s3", endpoint_url=config.endpoint_url or None, config=botocore_config
+        )
+        self.transfer_configs = transfer_configs
+        self.s3_transfers = {
+            name: S3Transfer(self.s3_client, transfer_config)
+            for name, transfer_config in transfer_configs.items()
+        }
+        self.s3t = self.s3_transfers["default"]
+
+    def _acquire_s3_transfers(
+        self,
+    ) -> Tuple[int, Any, Dict[str, S3Transfer]]:
+        """
+        Function to return the generation, S3 client and transfer managers an upload uses
+        """
+
+        with self.session_lock:
+            generation = self.session_generation
+            self.session_users[generation] = self.session_users.get(generation, 0) + 1
+            return generation, self.s3_client, self.s3_transfers
+
+    def _release_s3_transfers(self, generation: int) -> None:
+        """
+        Function to release the transfer managers of an upload, shuts down retired ones once unused
+        """
+
+        with self.session_lock:
+            self.session_users[generation] -= 1
+            if self.session_users[generation] > 0:
+                return
+            del self.session_users[generation]
+            retired = self.retired_transfers.pop(generation, None)
+
+        if retired is not None:
+            self._shutdown_s3_transfers(retired)
+
+    @staticmethod
+    def _shutdown_s3_transfers(s3_transfers: Dict[str, S3Transfer]) -> None:
+        """
+        Function to shut down the threads of transfer managers that are no longer used
+        """
+
+        for s3_transfer in s3_transfers.values():
+            s3_transfer.__exit__(None, None, None)
+
+    def _get_transfer_profile(self, size: int) -> str:
+        """
+        Function to get the name of the transfer manager to upload a file of a size with
+        """
+
+        if not self.config.auto_transfer_tuning:
+            return "default"
+
+        for name, (max_size, _, _, _) in TRANSFER_PROFILES.items():
+            if size < max_size:
+                return name
+
+        return "default"
+
+    # Recreate the boto3 session and S3 transfers. Callers that saw an error pass the generation they used,
+    # so workers failing together refresh once instead of each replacing the session of the others
+    def _refresh_boto_session(self, generation=None):
+        config = self.config
+        try:
+            with self.session_lock:
+                if generation is not None and generation != self.session_generation:
+                    return
+
+                self.boto3_session = (
+                    boto3.session.Session(
+                        profile_name=config.profile, region_name=self.config.aws_region
+                    )
+                    if config.profile != ""
+                    else boto3.session.Session(region_name=self.config.aws_region)
+                )
+                old_generation = self.session_generation
+                old_transfers = self.s3_transfers
+                self._create_s3_transfers()
+                self.session_generation += 1
+                self.last_refresh_time = time.time()
+
+                # Keep the old transfer managers until their uploads are done
+                if self.session_users.get(old_generation, 0) > 0:
+                    self.retired_transfers[old_generation] = old_transfers
+                    old_transfers = None
+
+            if old_transfers is not None:
+                self._shutdown_s3_transfers(old_transfers)
         except botocore.exceptions.ClientError as e:
             error_code = int(e.response["Error"]["Code"])
             if error_code == 404:
@@ -0,0 +1,260 @@
+"""
+File System Handler Bundler Module
+"""
+
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerBundle:
+    """
+    Class holding the small files of a directory waiting to be bundled
+    """
+
+    def __init__(self, bucket_name: str, directory: str) -> None:
+        """
+        Class Constructor
+        """
+
+        self.bucket_name = bucket_name
+        self.directory = directory
+        self.created = time.monotonic()
+        self.size = 0
+
+        # Members keyed by source path, a file changed again replaces its member
+        self.members: Dict[str, Tuple[str, os.stat_result]] = {}
+
+        # Journal sequence number of the last event of every member
+        self.sequences: Dict[str, int] = {}
+
+    def add(
+        self, src_path: str, file_key: str, stats: os.stat_result, sequence: int = 0
+    ) -> None:
+        """
+        Function to add a file to the bundle
+        """
+
+        previous = self.members.get(src_path)
+        if previous is not None:
+            self.size -= previous[1].st_size
+
+        self.members[src_path] = (file_key, stats)
+        self.sequences[src_path] = max(self.sequences.get(src_path, 0), sequence)
+        self.size += stats.st_size
+
+
+class FileSystemHandlerBundler:
+    """
+    Class to pack small files into a tar object per directory and time window,
+    next to a JSON index with the offset of every member so consumers can read a
+    single file with a ranged GET.
+    """
+
+    def __init__(
+        self,
+        upload: Callable[..., bool],
+        uploaded: Callable[[str, str, str, os.stat_result], None],
+        size_threshold: int = 10 * 1024,
+        window: float = 60.0,
+        max_files: int = 1000,
+        max_bytes: int = 64 * 1024**2,
+        handled: Optional[Callable[[str, int], None]] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Function uploading a file, called like _upload_to_s3_bucket
+        self.upload = upload
+
+        # Function called with the source path, bucket, object key and stats of every uploaded file
+        self.uploaded = uploaded
+
+        # Function called with the source path and journal sequence number of every
+        # member once its bundle was uploaded or handed to the dead letter queue
+        self.handled = handled
+
+        # Files smaller than the threshold in bytes are bundled
+        self.size_threshold = size_threshold
+
+        # Seconds a bundle collects files before it is uploaded
+        self.window = window
+
+        # A bundle is uploaded early once it holds this many files or bytes
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+
+        self.bundles: Dict[Tuple[str, str], FileSystemHandlerBundle] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name="fswatcher-bundler", daemon=True
+        )
+        self.thread.start()
+
+    def add(
+        self, src_path: str, bucket_name: str, file_key: str, sequence: int = 0
+    ) -> bool:
+        """
+        Function to add a file to the bundle of its directory, returns False if it is too large
+        """
+
+        try:
+            stats = os.stat(src_path)
+        except FileNotFoundError:
+            return False
+
+        if stats.st_size >= self.size_threshold:
+            return False
+
+        directory = os.path.dirname(file_key)
+        with self.lock:
+            bundle = self.bundles.get((bucket_name, directory))
+            if bundle is None:
+                bundle = FileSystemHandlerBundle(bucket_name, directory)
+                self.bundles[(bucket_name, directory)] = bundle
+
+            bundle.add(src_path, file_key, stats, sequence)
+
+            full = (
+                len(bundle.members) >= self.max_files or bundle.size >= self.max_bytes
+            )
+            if full:
+                del self.bundles[(bucket_name, directory)]
+
+        # Upload a full bundle right away from the calling worker
+        if full:
+            self._upload_bundle(bundle)
+
+        return True
+
+    def stop(self) -> None:
+        """
+        Function to upload every pending bundle and stop the background thread
+        """
+
+        self.stopped.set()
+        self.thread.join()
+        self._flush(force=True)
+
+    def _run(self) -> None:
+        """
+        Background loop, uploads the bundles whose window ended
+        """
+
+        interval = min(max(self.window / 4, 0.05), 5.0)
+
+        while not self.stopped.wait(interval):
+            try:
+                self._flush()
+            except Exception as e:
+                log.error(
+                    {"status": "ERROR", "message": f"Error uploading bundles: {e}"}
+                )
+
+    def _flush(self, force: bool = False) -> None:
+        """
+        Function to upload the bundles whose window ended
+        """
+
+        now = time.monotonic()
+        with self.lock:
+            due: List[FileSystemHandlerBundle] = [
+                bundle
+                for bundle in self.bundles.values()
+                if force or now - bundle.created >= self.window
+            ]
+            for bundle in due:
+                del self.bundles[(bundle.bucket_name, bundle.directory)]
+
+        for bundle in due:
+            self._upload_bundle(bundle)
+
+    def _upload_bundle(self, bundle: FileSystemHandlerBundle) -> None:
+        """
+        Function to upload a bundle and its index, falls back to single uploads on failure
+        """
+
+        self._upload_members(bundle)
+
+        # A bundle that raised is left for a replay of the journal
+        if self.handled is not None:
+            for src_path, sequence in bundle.sequences.items():
+                self.handled(src_path, sequence)
+
+    def _upload_members(self, bundle: FileSystemHandlerBundle) -> None:
+        """
+        Function to pack the members of a bundle and upload them
+        """
+
+        name = f"bundle-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        bundle_key = os.path.join(bundle.directory, "_bundles", f"{name}.tar")
+        index_key = os.path.join(bundle.directory, "_bundles", f"{name}.json")
+
+        with tempfile.TemporaryDirectory(prefix="fswatcher-bundle-") as directory:
+            bundle_path = os.path.join(directory, f"{name}.tar")
+            index_path = os.path.join(directory, f"{name}.json")
+
+            # Write the members, files deleted in the meantime are left out
+            members = {}
+            with tarfile.open(bundle_path, "w") as bundle_file:
+                for src_path, (file_key, stats) in bundle.members.items():
+                    try:
+                        bundle_file.add(
+                            src_path,
+                            arcname=os.path.basename(file_key),
+                            recursive=False,
+                        )
+                        members[os.path.basename(file_key)] = (
+                            src_path,
+                            file_key,
+                            stats,
+                        )
+                    except OSError as e:
+                        log.warning(f"Object ({file_key}) - Skipped from bundle: {e}")
+
+            if not members:
+                return
+
+            # Read back the data offsets so consumers can do ranged GETs
+            index = {"bundle": f"{name}.tar", "created": time.time(), "members": {}}
+            with tarfile.open(bundle_path) as bundle_file:
+                for member in bundle_file.getmembers():
+                    index["members"][members[member.name][1]] = {
+                        "offset": member.offset_data,
+                        "size": member.size,
+                        "mtime": member.mtime,
+                    }
+
+            with open(index_path, "w") as index_file:
+                json.dump(index, index_file)
+
+            tags = f"bundle=true&files={len(members)}"
+            uploaded = self.upload(
+                bundle_path, bundle.bucket_name, bundle_key, tags, dead_letter=False
+            ) and self.upload(
+                index_path, bundle.bucket_name, index_key, tags, dead_letter=False
+            )
+
+        if not uploaded:
+            # Upload the files one by one, failures go to the dead letter queue
+            log.warning(
+                f"Bundle ({bundle_key}) - Upload failed, uploading {len(members)} files individually"
+            )
+            for src_path, file_key, stats in members.values():
+                if self.upload(src_path, bundle.bucket_name, file_key, None):
+                    self.uploaded(src_path, bundle.bucket_name, file_key, stats)
+            return
+
+        log.info(f"Bundle ({bundle_key}) - Uploaded {len(members)} files")
+        for src_path, _, stats in members.values():
+            self.uploaded(src_path, bundle.bucket_name, bundle_key, stats)
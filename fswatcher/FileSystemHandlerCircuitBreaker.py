@@ -0,0 +1,93 @@
+"""
+File System Handler Circuit Breaker Module
+"""
+
+import threading
+import time
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerCircuitBreaker:
+    """
+    Class to pause the upload workers while S3 is failing. The breaker opens after
+    a number of consecutive failures, and after the cooldown lets uploads through
+    again. Another failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Consecutive failures before the breaker opens
+        self.failure_threshold = failure_threshold
+
+        # Seconds the breaker stays open, doubled on every reopen up to max_cooldown
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.failures = 0
+        self.open_until = 0.0
+        self.condition = threading.Condition()
+
+    def is_open(self) -> bool:
+        """
+        Function to check if the breaker is open
+        """
+
+        with self.condition:
+            return time.monotonic() < self.open_until
+
+    def wait(self) -> None:
+        """
+        Function to block while the breaker is open
+        """
+
+        with self.condition:
+            while True:
+                remaining = self.open_until - time.monotonic()
+                if remaining <= 0:
+                    return
+                self.condition.wait(remaining)
+
+    def record_success(self) -> None:
+        """
+        Function to record a successful request and close the breaker
+        """
+
+        with self.condition:
+            if self.failures >= self.failure_threshold:
+                log.info("S3 is reachable again, resuming uploads")
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+
+    def record_failure(self) -> None:
+        """
+        Function to record a failed request, opens the breaker past the threshold
+        """
+
+        with self.condition:
+            # Requests already in flight when the breaker opened don't count
+            if time.monotonic() < self.open_until:
+                return
+
+            self.failures += 1
+            if self.failures < self.failure_threshold:
+                return
+
+            # Reopening after the cooldown doubles it
+            if self.failures > self.failure_threshold:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+
+            self.open_until = time.monotonic() + self.cooldown
+            log.warning(
+                f"{self.failures} consecutive S3 failures, pausing uploads for {round(self.cooldown)} seconds"
+            )
@@ -0,0 +1,178 @@
+"""
+File System Handler Close Write Module
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fswatcher.FileSystemHandlerCoalescer import FileSystemHandlerCoalescer
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerCloseWrite:
+    """
+    Class to hold the events of files being written until the writer closes them,
+    so a file is uploaded once instead of while it is still being appended to.
+    Files that are never closed cleanly are submitted once they had no events for
+    the timeout and their size and modified time stopped changing.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[FileSystemHandlerEvent], None],
+        timeout: float = 30.0,
+        max_pending: int = 10000,
+        discard: Optional[Callable[[str, int], None]] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Function called with every event ready to be uploaded
+        self.submit = submit
+
+        # Seconds without events before the size of a file that was not closed is checked
+        self.timeout = timeout
+
+        # Maximum number of files held before add() waits for one to be submitted
+        self.max_pending = max(1, max_pending)
+
+        # Function called with the path and sequence number of the events that are dropped
+        self.discard = discard
+
+        # Held events keyed by path with the time they were last seen and the
+        # size and modified time of the file at the last stability check
+        self.pending: Dict[
+            str, Tuple[FileSystemHandlerEvent, float, Optional[Tuple[int, int]]]
+        ] = {}
+        self.condition = threading.Condition()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """
+        Function to start the stability check thread
+        """
+
+        self.thread = threading.Thread(
+            target=self._check_loop, name="fswatcher-close-write", daemon=True
+        )
+        self.thread.start()
+
+    def add(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to hold the event of a file being written, or submit it if it is complete
+        """
+
+        path = event.get_path()
+        ready = None
+
+        with self.condition:
+            # Files moved away were renamed once written, only their destination is uploaded
+            if event.action_type == "PUT" and event.src_path != path:
+                moved = self.pending.pop(event.src_path, None)
+                if moved is not None and self.discard is not None:
+                    self.discard(event.src_path, moved[0].sequence)
+
+            while path not in self.pending and len(self.pending) >= self.max_pending:
+                self.condition.wait()
+
+            pending = self.pending.pop(path, None)
+            merged = (
+                event
+                if pending is None
+                else FileSystemHandlerCoalescer._merge(pending[0], event)
+            )
+
+            # Closed, moved into place or deleted files are complete
+            if merged is not None and (
+                event.closed or event.action_type in ("PUT", "DELETE")
+            ):
+                ready = merged
+            elif merged is not None:
+                self.pending[path] = (merged, time.monotonic(), None)
+            elif self.discard is not None:
+                # Created and deleted before it was closed, nothing to do
+                self.discard(path, event.sequence)
+
+            self.condition.notify_all()
+
+        if ready is not None:
+            self.submit(ready)
+
+    def stop(self) -> None:
+        """
+        Function to submit every held event and stop the stability check thread
+        """
+
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        with self.condition:
+            held = [event for event, _, _ in self.pending.values()]
+            self.pending.clear()
+            self.condition.notify_all()
+
+        for event in held:
+            self.submit(event)
+
+    def _check(self) -> None:
+        """
+        Function to submit the files that were not closed but stopped changing
+        """
+
+        now = time.monotonic()
+        ready: List[FileSystemHandlerEvent] = []
+
+        with self.condition:
+            for path, (event, last_seen, signature) in list(self.pending.items()):
+                if now - last_seen < self.timeout:
+                    continue
+
+                try:
+                    stats = os.stat(path)
+                except FileNotFoundError:
+                    # The file is gone, its delete event follows
+                    del self.pending[path]
+                    if self.discard is not None:
+                        self.discard(path, event.sequence)
+                    continue
+
+                current = (stats.st_size, stats.st_mtime_ns)
+                if current == signature:
+                    log.debug(
+                        f"Object ({path}) - Not closed after {self.timeout} seconds, size is stable"
+                    )
+                    ready.append(event)
+                    del self.pending[path]
+                else:
+                    self.pending[path] = (event, last_seen, current)
+
+            if ready:
+                self.condition.notify_all()
+
+        # Submit outside of the lock since the upload queue may block
+        for event in ready:
+            self.submit(event)
+
+    def _check_loop(self) -> None:
+        """
+        Stability check thread loop
+        """
+
+        interval = min(max(self.timeout / 4, 0.05), 1.0)
+
+        while not self.stopped.wait(interval):
+            try:
+                self._check()
+            except Exception as e:
+                log.error(
+                    {"status": "ERROR", "message": f"Error checking open files: {e}"}
+                )
@@ -0,0 +1,166 @@
+"""
+File System Handler Coalescer Module
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerCoalescer:
+    """
+    Class to merge the events of a path until the path has been quiet for the
+    configured period, so a file written in chunks is only uploaded once it settled.
+    A quiet period of 0 disables coalescing and events are submitted directly.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[FileSystemHandlerEvent], None],
+        quiet_period: float = 2.0,
+        max_pending: int = 10000,
+        discard: Optional[Callable[[str, int], None]] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Function called with every settled event
+        self.submit = submit
+
+        # Seconds a path has to be quiet before its event is submitted
+        self.quiet_period = quiet_period
+
+        # Maximum number of pending paths before add() waits for a flush
+        self.max_pending = max(1, max_pending)
+
+        # Function called with the path and sequence number of the events that cancel out
+        self.discard = discard
+
+        # Pending events keyed by path with the time they were last seen
+        self.pending: Dict[str, Tuple[FileSystemHandlerEvent, float]] = {}
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self) -> None:
+        """
+        Function to start the flush thread
+        """
+
+        if self.quiet_period <= 0:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._flush_loop, name="fswatcher-coalescer", daemon=True
+        )
+        self.thread.start()
+
+    def add(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to merge an event into the pending event of its path
+        """
+
+        if self.quiet_period <= 0:
+            self.submit(event)
+            return
+
+        path = event.get_path()
+
+        with self.condition:
+            while path not in self.pending and len(self.pending) >= self.max_pending:
+                self.condition.wait()
+
+            pending = self.pending.get(path)
+            merged = event if pending is None else self._merge(pending[0], event)
+
+            if merged is None:
+                # Created and deleted within the quiet period, nothing to do
+                del self.pending[path]
+                if self.discard is not None:
+                    self.discard(path, event.sequence)
+                self.condition.notify_all()
+            else:
+                self.pending[path] = (merged, time.monotonic())
+
+    def stop(self) -> None:
+        """
+        Function to submit every pending event and stop the flush thread
+        """
+
+        self.running = False
+        if self.thread is not None:
+            with self.condition:
+                self.condition.notify_all()
+            self.thread.join()
+            self.thread = None
+
+        self._flush(force=True)
+
+    @staticmethod
+    def _merge(
+        pending: FileSystemHandlerEvent, event: FileSystemHandlerEvent
+    ) -> FileSystemHandlerEvent or None:
+        """
+        Function to merge a new event into the pending one, returns None if they cancel out
+        """
+
+        if event.action_type == "DELETE":
+            # The object never made it to S3 so there is nothing to delete, unless
+            # the file was recreated after a delete of an object that is in S3
+            if pending.action_type == "CREATE" and not pending.replaced_delete:
+                return None
+            return event
+
+        # The file was recreated, the upload replaces the object anyway
+        if pending.action_type == "DELETE":
+            event.replaced_delete = True
+            return event
+
+        # CREATE/UPDATE/PUT collapse into the first event for the path, which
+        # now also stands for the journal sequence number of the new event
+        pending.sequence = max(pending.sequence, event.sequence)
+        return pending
+
+    def _flush(self, force: bool = False) -> None:
+        """
+        Function to submit the events that have been quiet for the quiet period
+        """
+
+        now = time.monotonic()
+        settled: List[FileSystemHandlerEvent] = []
+
+        with self.condition:
+            for path, (event, last_seen) in list(self.pending.items()):
+                if force or now - last_seen >= self.quiet_period:
+                    settled.append(event)
+                    del self.pending[path]
+
+            if settled:
+                self.condition.notify_all()
+
+        # Submit outside of the lock since the upload queue may block
+        for event in settled:
+            self.submit(event)
+
+    def _flush_loop(self) -> None:
+        """
+        Flush thread loop
+        """
+
+        interval = min(max(self.quiet_period / 4, 0.05), 1.0)
+
+        while self.running:
+            try:
+                self._flush()
+            except Exception as e:
+                log.error({"status": "ERROR", "message": f"Error flushing events: {e}"})
+
+            with self.condition:
+                self.condition.wait(interval)
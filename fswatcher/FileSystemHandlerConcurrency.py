@@ -0,0 +1,161 @@
+"""
+File System Handler Concurrency Module
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerConcurrency:
+    """
+    Class to adapt the number of concurrent uploads (AIMD). The limit is raised by
+    one every interval while goodput keeps up, and halved when S3 throttles. Prefixes
+    that are throttled get their own limit, so a hot prefix backs off on its own.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 10,
+        interval: float = 5.0,
+        max_prefixes: int = 1024,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Bounds of the number of concurrent uploads
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+
+        # Start halfway and let the additive increase find the right limit
+        self.limit = max(self.min_limit, self.max_limit // 2)
+
+        # Seconds between two adjustments of the limit
+        self.interval = interval
+
+        # Limits of the throttled prefixes, the least recently throttled are dropped first
+        self.prefix_limits: OrderedDict = OrderedDict()
+        self.max_prefixes = max_prefixes
+
+        self.in_flight = 0
+        self.prefix_in_flight: Dict[str, int] = {}
+
+        # Goodput of the current and the previous interval
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.window_saturated = False
+        self.window_throttled = False
+        self.goodput = 0.0
+
+        self.condition = threading.Condition()
+
+    def acquire(self, prefix: str) -> None:
+        """
+        Function to wait for an upload slot of a prefix
+        """
+
+        with self.condition:
+            while self._is_full(prefix):
+                self.condition.wait()
+
+            self.in_flight += 1
+            self.prefix_in_flight[prefix] = self.prefix_in_flight.get(prefix, 0) + 1
+
+            # The limit was reached, raising it may increase goodput
+            if self.in_flight >= self.limit:
+                self.window_saturated = True
+
+    def release(self, prefix: str, size: int = 0, throttled: bool = False) -> None:
+        """
+        Function to release the upload slot of a prefix with the result of the upload
+        """
+
+        with self.condition:
+            self.in_flight -= 1
+            self.prefix_in_flight[prefix] -= 1
+            if self.prefix_in_flight[prefix] == 0:
+                del self.prefix_in_flight[prefix]
+
+            if throttled:
+                self._decrease(prefix)
+            else:
+                self.window_bytes += size
+                self._increase_prefix(prefix)
+
+            if time.monotonic() - self.window_start >= self.interval:
+                self._adjust()
+
+            self.condition.notify_all()
+
+    def _is_full(self, prefix: str) -> bool:
+        """
+        Function to check if the limit or the limit of the prefix is reached
+        """
+
+        prefix_limit = self.prefix_limits.get(prefix, self.max_limit)
+        return (
+            self.in_flight >= self.limit
+            or self.prefix_in_flight.get(prefix, 0) >= prefix_limit
+        )
+
+    def _decrease(self, prefix: str) -> None:
+        """
+        Function to halve the limits after S3 throttled an upload
+        """
+
+        # Back off once per interval, uploads in flight are throttled together
+        if not self.window_throttled:
+            self.window_throttled = True
+            self.limit = max(self.min_limit, self.limit // 2)
+            log.warning(
+                f"S3 is throttling uploads, lowering concurrency to {self.limit}"
+            )
+
+        prefix_limit = self.prefix_limits.pop(prefix, self.limit * 2)
+        self.prefix_limits[prefix] = max(self.min_limit, prefix_limit // 2)
+        while len(self.prefix_limits) > self.max_prefixes:
+            self.prefix_limits.popitem(last=False)
+
+    def _increase_prefix(self, prefix: str) -> None:
+        """
+        Function to raise the limit of a throttled prefix after a successful upload
+        """
+
+        if prefix not in self.prefix_limits:
+            return
+
+        self.prefix_limits[prefix] += 1
+        if self.prefix_limits[prefix] >= self.max_limit:
+            del self.prefix_limits[prefix]
+
+    def _adjust(self) -> None:
+        """
+        Function to raise the limit at the end of an interval without throttling
+        """
+
+        now = time.monotonic()
+        goodput = self.window_bytes / (now - self.window_start)
+
+        # Raise the limit while it is the bottleneck and goodput doesn't drop
+        if (
+            not self.window_throttled
+            and self.window_saturated
+            and goodput >= self.goodput * 0.9
+            and self.limit < self.max_limit
+        ):
+            self.limit += 1
+            log.debug(
+                f"Raising concurrency to {self.limit} ({round(goodput / 1024**2, 2)} MB/s)"
+            )
+
+        self.goodput = goodput
+        self.window_start = now
+        self.window_bytes = 0
+        self.window_saturated = self.in_flight >= self.limit
+        self.window_throttled = False
@@ -33,6 +33,51 @@ class FileSystemHandlerConfig:
         test_iam_policy: bool = False,
         check_s3: bool = False,
         aws_region: str = "us-east-1",
+        upload_workers: int = 10,
+        queue_size: int = 10000,
+        quiet_period: float = 2.0,
+        use_ledger: bool = False,
+        ledger_path: str = "logs/fswatcher_ledger.db",
+        prune_scan: bool = False,
+        deep_scan_interval: float = 0,
+        walk_workers: int = 16,
+        backtrack_window: int = 1000,
+        dead_letter_queue_path: str = "logs/fswatcher_dlq.db",
+        dead_letter_queue_action: str = None,
+        slack_digest_interval: float = 0,
+        slack_digest_size: int = 50,
+        multipart_threshold: int = 8,
+        multipart_chunksize: int = 8,
+        transfer_threads: int = 0,
+        max_io_queue: int = 100,
+        auto_transfer_tuning: bool = False,
+        adaptive_concurrency: bool = False,
+        min_concurrency: int = 1,
+        max_concurrency: int = 0,
+        bundle_small_files: bool = False,
+        bundle_size_threshold: int = 10,
+        bundle_window: float = 60.0,
+        bundle_max_files: int = 1000,
+        content_hash: bool = False,
+        zero_copy: bool = False,
+        metrics_port: int = 0,
+        endpoint_url: str = "",
+        trigger_mode: str = "modify",
+        close_timeout: float = 30.0,
+        priority_lanes: bool = False,
+        express_workers: int = 4,
+        bulk_workers: int = 2,
+        express_max_size: int = 1024,
+        bulk_min_size: int = 256,
+        express_patterns: str = "",
+        bulk_patterns: str = "",
+        rules_file: str = "",
+        include_patterns: str = "",
+        exclude_patterns: str = "*hermes.log*",
+        use_journal: bool = False,
+        journal_path: str = "logs/fswatcher_journal.log",
+        timestream_spill_path: str = "logs/fswatcher_timestream_spill.jsonl",
+        journal_commit_interval: int = 10,
     ) -> None:
         """
         Class Constructor
@@ -55,6 +100,51 @@ class FileSystemHandlerConfig:
         self.test_iam_policy = test_iam_policy
         self.check_s3 = check_s3
         self.aws_region = aws_region
+        self.upload_workers = upload_workers
+        self.queue_size = queue_size
+        self.quiet_period = quiet_period
+        self.use_ledger = use_ledger
+        self.ledger_path = ledger_path
+        self.prune_scan = prune_scan
+        self.deep_scan_interval = deep_scan_interval
+        self.walk_workers = walk_workers
+        self.backtrack_window = backtrack_window
+        self.dead_letter_queue_path = dead_letter_queue_path
+        self.dead_letter_queue_action = dead_letter_queue_action
+        self.slack_digest_interval = slack_digest_interval
+        self.slack_digest_size = slack_digest_size
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.transfer_threads = transfer_threads
+        self.max_io_queue = max_io_queue
+        self.auto_transfer_tuning = auto_transfer_tuning
+        self.adaptive_concurrency = adaptive_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.bundle_small_files = bundle_small_files
+        self.bundle_size_threshold = bundle_size_threshold
+        self.bundle_window = bundle_window
+        self.bundle_max_files = bundle_max_files
+        self.content_hash = content_hash
+        self.zero_copy = zero_copy
+        self.metrics_port = metrics_port
+        self.endpoint_url = endpoint_url
+        self.trigger_mode = trigger_mode
+        self.close_timeout = close_timeout
+        self.priority_lanes = priority_lanes
+        self.express_workers = express_workers
+        self.bulk_workers = bulk_workers
+        self.express_max_size = express_max_size
+        self.bulk_min_size = bulk_min_size
+        self.express_patterns = express_patterns
+        self.bulk_patterns = bulk_patterns
+        self.rules_file = rules_file
+        self.include_patterns = include_patterns
+        self.exclude_patterns = exclude_patterns
+        self.use_journal = use_journal
+        self.journal_path = journal_path
+        self.timestream_spill_path = timestream_spill_path
+        self.journal_commit_interval = journal_commit_interval
 
 
 def create_argparse() -> ArgumentParser:
@@ -176,6 +266,403 @@ def create_argparse() -> ArgumentParser:
         help="AWS Region for the File System Watcher",
     )
 
+    # Add Argument to parse the number of upload workers
+    parser.add_argument(
+        "-uw",
+        "--upload_workers",
+        type=int,
+        default=10,
+        help="Number of Upload Workers draining the event queue",
+    )
+
+    # Add Argument to parse the event queue size
+    parser.add_argument(
+        "-qs",
+        "--queue_size",
+        type=int,
+        default=10000,
+        help="Maximum number of events waiting in the upload queue",
+    )
+
+    # Add Argument to parse the quiet period used to coalesce events
+    parser.add_argument(
+        "-qp",
+        "--quiet_period",
+        type=float,
+        default=2.0,
+        help="Seconds a file has to be quiet before it is uploaded (0 to disable coalescing)",
+    )
+
+    # Add Argument to parse the upload ledger flag
+    parser.add_argument(
+        "-ul",
+        "--use_ledger",
+        action="store_true",
+        help="Record uploads in a local ledger so restarts skip files already in S3",
+    )
+
+    # Add Argument to parse the upload ledger path
+    parser.add_argument(
+        "-lp",
+        "--ledger_path",
+        default="logs/fswatcher_ledger.db",
+        help="Path of the SQLite upload ledger",
+    )
+
+    # Add Argument to parse the prune scan flag
+    parser.add_argument(
+        "-ps",
+        "--prune_scan",
+        action="store_true",
+        help="Skip re-listing directories whose modified time did not change in the fallback watcher",
+    )
+
+    # Add Argument to parse the deep scan interval
+    parser.add_argument(
+        "-dsi",
+        "--deep_scan_interval",
+        type=float,
+        default=0,
+        help="Seconds between deep scans that re-check every file when pruning (0 to disable)",
+    )
+
+    # Add Argument to parse the number of walk workers
+    parser.add_argument(
+        "-ww",
+        "--walk_workers",
+        type=int,
+        default=16,
+        help="Number of threads listing directories in parallel when backtracking",
+    )
+
+    # Add Argument to parse the backtrack window
+    parser.add_argument(
+        "-bw",
+        "--backtrack_window",
+        type=int,
+        default=1000,
+        help="Number of files checked and dispatched at a time while backtracking",
+    )
+
+    # Add Argument to parse the dead letter queue path
+    parser.add_argument(
+        "-dp",
+        "--dead_letter_queue_path",
+        default="logs/fswatcher_dlq.db",
+        help="Path of the SQLite dead letter queue of failed uploads",
+    )
+
+    # Add Argument to parse the interval of the Slack upload digest
+    parser.add_argument(
+        "-sdi",
+        "--slack_digest_interval",
+        type=float,
+        default=0,
+        help="Seconds uploaded files are rolled into a single Slack message, 0 sends a message per file",
+    )
+
+    # Add Argument to parse the maximum number of files in a Slack upload digest
+    parser.add_argument(
+        "-sds",
+        "--slack_digest_size",
+        type=int,
+        default=50,
+        help="Maximum number of files in a single Slack digest message",
+    )
+
+    # Add Argument to parse the size in MB above which files are uploaded in parts
+    parser.add_argument(
+        "-mt",
+        "--multipart_threshold",
+        type=int,
+        default=8,
+        help="Size in MB above which files are uploaded in parts",
+    )
+
+    # Add Argument to parse the size in MB of the parts of a multipart upload
+    parser.add_argument(
+        "-mc",
+        "--multipart_chunksize",
+        type=int,
+        default=8,
+        help="Size in MB of the parts of a multipart upload",
+    )
+
+    # Add Argument to parse the number of threads of the transfer manager
+    parser.add_argument(
+        "-tth",
+        "--transfer_threads",
+        type=int,
+        default=0,
+        help="Number of threads uploading parts, 0 uses the concurrency limit",
+    )
+
+    # Add Argument to parse the size of the I/O queue of the transfer manager
+    parser.add_argument(
+        "-miq",
+        "--max_io_queue",
+        type=int,
+        default=100,
+        help="Maximum number of read parts queued by the transfer manager",
+    )
+
+    # Add Argument to parse whether the transfer settings are picked by file size
+    parser.add_argument(
+        "-att",
+        "--auto_transfer_tuning",
+        action="store_true",
+        help="Pick the part size and number of threads from the size of each file",
+    )
+
+    # Add Argument to parse whether the number of concurrent uploads is adapted
+    parser.add_argument(
+        "-ac",
+        "--adaptive_concurrency",
+        action="store_true",
+        help="Raise the number of concurrent uploads while goodput improves and back off when S3 throttles",
+    )
+
+    # Add Argument to parse the minimum number of concurrent uploads
+    parser.add_argument(
+        "-mnc",
+        "--min_concurrency",
+        type=int,
+        default=1,
+        help="Minimum number of concurrent uploads with adaptive concurrency",
+    )
+
+    # Add Argument to parse the maximum number of concurrent uploads
+    parser.add_argument(
+        "-mxc",
+        "--max_concurrency",
+        type=int,
+        default=0,
+        help="Maximum number of concurrent uploads with adaptive concurrency, 0 uses the upload workers",
+    )
+
+    # Add Argument to parse whether small files are bundled
+    parser.add_argument(
+        "-bsf",
+        "--bundle_small_files",
+        action="store_true",
+        help="Pack small files into a tar object per directory with a JSON index of the member offsets",
+    )
+
+    # Add Argument to parse the size in KB below which files are bundled
+    parser.add_argument(
+        "-bst",
+        "--bundle_size_threshold",
+        type=int,
+        default=10,
+        help="Size in KB below which files are bundled",
+    )
+
+    # Add Argument to parse the seconds a bundle collects files
+    parser.add_argument(
+        "-bwi",
+        "--bundle_window",
+        type=float,
+        default=60.0,
+        help="Seconds a bundle collects the small files of a directory before it is uploaded",
+    )
+
+    # Add Argument to parse the maximum number of files in a bundle
+    parser.add_argument(
+        "-bmf",
+        "--bundle_max_files",
+        type=int,
+        default=1000,
+        help="Maximum number of files in a bundle, a full bundle is uploaded right away",
+    )
+
+    # Add Argument to parse whether uploads of unchanged content are skipped
+    parser.add_argument(
+        "-ch",
+        "--content_hash",
+        action="store_true",
+        help="Skip uploads of files whose SHA256 checksum matches the last upload and send the checksum for S3 to verify",
+    )
+
+    # Add Argument to parse whether multipart uploads stream the parts on a shared thread pool
+    parser.add_argument(
+        "-zc",
+        "--zero_copy",
+        action="store_true",
+        help="Upload the parts of large files streamed from the file on a shared thread pool",
+    )
+
+    # Add Argument to parse the port of the metrics endpoint
+    parser.add_argument(
+        "-mp",
+        "--metrics_port",
+        type=int,
+        default=0,
+        help="Port serving the metrics in the Prometheus text format at /metrics, 0 disables it",
+    )
+
+    # Add Argument to parse the S3 endpoint url
+    parser.add_argument(
+        "-eu",
+        "--endpoint_url",
+        type=str,
+        default="",
+        help="URL of an S3 compatible endpoint to upload to instead of AWS S3",
+    )
+
+    # Add Argument to parse the event triggering uploads
+    parser.add_argument(
+        "-tm",
+        "--trigger_mode",
+        type=str,
+        choices=["modify", "close"],
+        default="modify",
+        help="Upload files when they are created or modified, or once the writer closes them",
+    )
+
+    # Add Argument to parse the timeout of files that are not closed
+    parser.add_argument(
+        "-ct",
+        "--close_timeout",
+        type=float,
+        default=30.0,
+        help="Seconds without events after which a file that was not closed is uploaded once its size is stable",
+    )
+
+    # Add Argument to parse the priority lanes flag
+    parser.add_argument(
+        "-pl",
+        "--priority_lanes",
+        action="store_true",
+        help="Upload manifests and small files in an express lane and large files in a bulk lane, each with its own workers",
+    )
+
+    # Add Argument to parse the number of workers of the express lane
+    parser.add_argument(
+        "-ew",
+        "--express_workers",
+        type=int,
+        default=4,
+        help="Number of upload workers of the express lane",
+    )
+
+    # Add Argument to parse the number of workers of the bulk lane
+    parser.add_argument(
+        "-bkw",
+        "--bulk_workers",
+        type=int,
+        default=2,
+        help="Number of upload workers of the bulk lane",
+    )
+
+    # Add Argument to parse the size below which files are express
+    parser.add_argument(
+        "-ems",
+        "--express_max_size",
+        type=int,
+        default=1024,
+        help="Size in KB below which files are uploaded in the express lane",
+    )
+
+    # Add Argument to parse the size from which files are bulk
+    parser.add_argument(
+        "-bms",
+        "--bulk_min_size",
+        type=int,
+        default=256,
+        help="Size in MB from which files are uploaded in the bulk lane",
+    )
+
+    # Add Argument to parse the path patterns of the express lane
+    parser.add_argument(
+        "-ep",
+        "--express_patterns",
+        type=str,
+        default="",
+        help="Comma separated glob patterns of the relative paths uploaded in the express lane",
+    )
+
+    # Add Argument to parse the path patterns of the bulk lane
+    parser.add_argument(
+        "-bp",
+        "--bulk_patterns",
+        type=str,
+        default="",
+        help="Comma separated glob patterns of the relative paths uploaded in the bulk lane",
+    )
+
+    # Add Argument to parse the watch rules file
+    parser.add_argument(
+        "-rf",
+        "--rules_file",
+        type=str,
+        default="",
+        help="JSON file with a list of watch rules (root, bucket, include, exclude, allow_delete) replacing the directory and bucket name",
+    )
+
+    # Add Argument to parse the patterns of the files to upload
+    parser.add_argument(
+        "-ip",
+        "--include_patterns",
+        type=str,
+        default="",
+        help="Comma separated glob patterns (or regexes prefixed with re:) of the files to upload, every file by default",
+    )
+
+    # Add Argument to parse the patterns of the files and directories to skip
+    parser.add_argument(
+        "-xp",
+        "--exclude_patterns",
+        type=str,
+        default="*hermes.log*",
+        help="Comma separated glob patterns (or regexes prefixed with re:) of the files and directories to skip, names without a / match at any depth, paths with a / are relative to the watched root",
+    )
+
+    # Add Argument to parse the event journal flag
+    parser.add_argument(
+        "-uj",
+        "--use_journal",
+        action="store_true",
+        help="Journal the events in flight so the ones lost by a crash are replayed on restart",
+    )
+
+    # Add Argument to parse the event journal path
+    parser.add_argument(
+        "-jp",
+        "--journal_path",
+        default="logs/fswatcher_journal.log",
+        help="Path of the append-only event journal",
+    )
+
+    # Add Argument to parse the Timestream spill path
+    parser.add_argument(
+        "-tsp",
+        "--timestream_spill_path",
+        default="logs/fswatcher_timestream_spill.jsonl",
+        help="Path of the file Timestream records are spilled to while Timestream is unreachable",
+    )
+
+    # Add Argument to parse the group commit interval of the event journal
+    parser.add_argument(
+        "-jci",
+        "--journal_commit_interval",
+        type=int,
+        default=10,
+        help="Milliseconds between the fsyncs of the event journal, events of a crash within it are lost",
+    )
+
+    # Add Subcommand to inspect or replay the dead letter queue
+    subparsers = parser.add_subparsers(dest="command")
+    dead_letter_queue_parser = subparsers.add_parser(
+        "dead_letter_queue",
+        aliases=["dlq"],
+        help="Inspect or replay the dead letter queue of failed uploads",
+    )
+    dead_letter_queue_parser.add_argument(
+        "dead_letter_queue_action",
+        choices=["inspect", "replay"],
+        help="List the failed uploads or retry all of them now",
+    )
+
     # Return the Argument Parser
     return parser
 
@@ -211,6 +698,51 @@ def parse_args(parser: ArgumentParser) -> dict:
         "test_iam_policy": args.test_iam_policy,
         "check_s3": args.check_s3,
         "aws_region": args.aws_region,
+        "upload_workers": args.upload_workers,
+        "queue_size": args.queue_size,
+        "quiet_period": args.quiet_period,
+        "use_ledger": args.use_ledger,
+        "ledger_path": args.ledger_path,
+        "prune_scan": args.prune_scan,
+        "deep_scan_interval": args.deep_scan_interval,
+        "walk_workers": args.walk_workers,
+        "backtrack_window": args.backtrack_window,
+        "dead_letter_queue_path": args.dead_letter_queue_path,
+        "dead_letter_queue_action": getattr(args, "dead_letter_queue_action", None),
+        "slack_digest_interval": args.slack_digest_interval,
+        "slack_digest_size": args.slack_digest_size,
+        "multipart_threshold": args.multipart_threshold,
+        "multipart_chunksize": args.multipart_chunksize,
+        "transfer_threads": args.transfer_threads,
+        "max_io_queue": args.max_io_queue,
+        "auto_transfer_tuning": args.auto_transfer_tuning,
+        "adaptive_concurrency": args.adaptive_concurrency,
+        "min_concurrency": args.min_concurrency,
+        "max_concurrency": args.max_concurrency,
+        "bundle_small_files": args.bundle_small_files,
+        "bundle_size_threshold": args.bundle_size_threshold,
+        "bundle_window": args.bundle_window,
+        "bundle_max_files": args.bundle_max_files,
+        "content_hash": args.content_hash,
+        "zero_copy": args.zero_copy,
+        "metrics_port": args.metrics_port,
+        "endpoint_url": args.endpoint_url,
+        "trigger_mode": args.trigger_mode,
+        "close_timeout": args.close_timeout,
+        "priority_lanes": args.priority_lanes,
+        "express_workers": args.express_workers,
+        "bulk_workers": args.bulk_workers,
+        "express_max_size": args.express_max_size,
+        "bulk_min_size": args.bulk_min_size,
+        "express_patterns": args.express_patterns,
+        "bulk_patterns": args.bulk_patterns,
+        "rules_file": args.rules_file,
+        "include_patterns": args.include_patterns,
+        "exclude_patterns": args.exclude_patterns,
+        "use_journal": args.use_journal,
+        "journal_path": args.journal_path,
+        "timestream_spill_path": args.timestream_spill_path,
+        "journal_commit_interval": args.journal_commit_interval,
     }
 
     # Return the arguments dictionary
@@ -226,6 +758,14 @@ def validate_config(config: dict) -> bool:
     :return: True if the configuration dictionary is valid, False otherwise
     :rtype: bool
     """
+    # Inspecting the dead letter queue doesn't need a directory or bucket
+    if config.get("dead_letter_queue_action") == "inspect":
+        return True
+
+    # Watch rules replace the directory and bucket name
+    if config.get("rules_file"):
+        return True
+
     return all(config.get(key) for key in ["path", "bucket_name"])
 
 
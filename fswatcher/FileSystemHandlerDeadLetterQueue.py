@@ -0,0 +1,211 @@
+"""
+File System Handler Dead Letter Queue Module
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+# Cap of the backoff exponent, the delay is bounded by the max delay long before it
+MAX_BACKOFF_EXPONENT = 30
+
+
+class FileSystemHandlerDeadLetterQueue:
+    """
+    Class to persist failed uploads in SQLite so they survive restarts and can be
+    retried with exponential backoff and jitter. A path has at most one entry, a
+    new failure of a queued path updates it.
+    """
+
+    def __init__(
+        self,
+        dead_letter_queue_path: str = "logs/fswatcher_dlq.db",
+        base_delay: float = 5.0,
+        max_delay: float = 3600.0,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Create the directory of the queue if required
+        directory = os.path.dirname(dead_letter_queue_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Delay before the first retry and the upper bound of the backoff
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.dead_letter_queue_path = dead_letter_queue_path
+        self.lock = threading.Lock()
+
+        # The connection is shared between the upload workers behind the lock
+        self.connection = sqlite3.connect(
+            dead_letter_queue_path, check_same_thread=False
+        )
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                src_path TEXT NOT NULL,
+                bucket_name TEXT NOT NULL,
+                file_key TEXT NOT NULL,
+                tags TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                created REAL NOT NULL
+            )
+            """
+        )
+
+        # Keep the latest entry of the paths queued more than once by older versions
+        self.connection.execute(
+            """
+            DELETE FROM dead_letters WHERE id NOT IN
+            (SELECT MAX(id) FROM dead_letters GROUP BY src_path)
+            """
+        )
+        self.connection.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS dead_letters_src_path ON dead_letters (src_path)"
+        )
+        self.connection.commit()
+
+    def __len__(self) -> int:
+        """
+        Function to return the number of failed uploads in the queue
+        """
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT COUNT(*) FROM dead_letters"
+            ).fetchone()
+
+        return row[0]
+
+    def add(
+        self,
+        src_path: str,
+        bucket_name: str,
+        file_key: str,
+        tags: Optional[str],
+        error: str,
+    ) -> None:
+        """
+        Function to add a failed upload to the queue, or update the entry of its path
+        """
+
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                """
+                INSERT INTO dead_letters
+                (src_path, bucket_name, file_key, tags, attempts, next_attempt, last_error, created)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+                ON CONFLICT (src_path) DO UPDATE SET
+                bucket_name = excluded.bucket_name,
+                file_key = excluded.file_key,
+                tags = excluded.tags,
+                last_error = excluded.last_error
+                """,
+                (
+                    src_path,
+                    bucket_name,
+                    file_key,
+                    tags,
+                    now + self._get_delay(0),
+                    error,
+                    now,
+                ),
+            )
+            self.connection.commit()
+
+    def get_entries(self, due_only: bool = False, limit: int = -1) -> List[Dict]:
+        """
+        Function to return the failed uploads, optionally only the ones due for a retry
+        """
+
+        query = "SELECT * FROM dead_letters"
+        parameters = []
+        if due_only:
+            query += " WHERE next_attempt <= ?"
+            parameters.append(time.time())
+        query += " ORDER BY next_attempt LIMIT ?"
+        parameters.append(limit)
+
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def reschedule(self, entry: Dict, error: Optional[str] = None) -> None:
+        """
+        Function to schedule the next retry of a failed upload with exponential backoff,
+        the last error is kept if no error is given
+        """
+
+        attempts = entry["attempts"] + 1
+        with self.lock:
+            self.connection.execute(
+                """
+                UPDATE dead_letters SET attempts = ?, next_attempt = ?,
+                last_error = COALESCE(?, last_error) WHERE id = ?
+                """,
+                (attempts, time.time() + self._get_delay(attempts), error, entry["id"]),
+            )
+            self.connection.commit()
+
+    def remove(self, entry: Dict) -> None:
+        """
+        Function to remove a failed upload from the queue
+        """
+
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM dead_letters WHERE id = ?", (entry["id"],)
+            )
+            self.connection.commit()
+
+    def remove_path(self, src_path: str) -> None:
+        """
+        Function to remove the failed upload of a path once the path was uploaded
+        """
+
+        with self.lock:
+            cursor = self.connection.execute(
+                "DELETE FROM dead_letters WHERE src_path = ?", (src_path,)
+            )
+
+            # Most uploads have no entry, don't write a transaction for them
+            if cursor.rowcount:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+
+    def close(self) -> None:
+        """
+        Function to close the queue
+        """
+
+        with self.lock:
+            self.connection.close()
+
+    def _get_delay(self, attempts: int) -> float:
+        """
+        Function to return the backoff delay of an attempt with full jitter
+        """
+
+        # Cap the exponent so long failing uploads don't overflow the float
+        exponent = min(attempts, MAX_BACKOFF_EXPONENT)
+        return random.uniform(
+            self.base_delay / 2, min(self.max_delay, self.base_delay * 2**exponent)
+        )
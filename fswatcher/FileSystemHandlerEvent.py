@@ -2,12 +2,14 @@
 File System Handler Event Module
 """
 
+import time
 from watchdog.events import (
     FileSystemEvent,
     FileCreatedEvent,
     FileModifiedEvent,
     FileMovedEvent,
     FileDeletedEvent,
+    FileClosedEvent,
 )
 
 
@@ -23,6 +25,10 @@ class FileSystemHandlerEvent:
     dest_path: str = ""
     action_type: str = ""
     completed: bool = False
+    closed: bool = False
+    sequence: int = 0
+    replaced_delete: bool = False
+    dead_letter: bool = False
 
     def __init__(
         self, event: FileSystemEvent, bucket_name: str, watch_path: str
@@ -33,6 +39,9 @@ class FileSystemHandlerEvent:
         # Set the Watch Path
         self.watch_path = watch_path
 
+        # Set the time the event was detected
+        self.detected = time.time()
+
         # Set the Source Path
         self.src_path = event.src_path
 
@@ -58,6 +67,11 @@ class FileSystemHandlerEvent:
         elif isinstance(event, FileDeletedEvent):
             self.action_type = "DELETE"
 
+        # Handle File Close Event, the file was closed after being written
+        elif isinstance(event, FileClosedEvent):
+            self.action_type = "UPDATE"
+            self.closed = True
+
     # String Representation of the Class
     def __repr__(self) -> str:
         """
@@ -84,6 +98,14 @@ class FileSystemHandlerEvent:
             and self.action_type == other.action_type
         )
 
+    # Hash Function
+    def __hash__(self) -> int:
+        """
+        Hash Function, consistent with the Comparison Function
+        """
+
+        return hash((self.src_path, self.bucket_name, self.dest_path, self.action_type))
+
     def get_log_message(self) -> str:
         """
         Function to get the log message
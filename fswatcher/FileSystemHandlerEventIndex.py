@@ -0,0 +1,115 @@
+"""
+File System Handler Event Index Module
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+
+class FileSystemHandlerEventIndex:
+    """
+    Class to keep track of the events waiting for an upload worker.
+    Lookups, inserts and removals are O(1) and entries older than the ttl expire.
+    Only the latest queued event of a path counts as a duplicate, since an older
+    one is followed by other events of the path that change its outcome.
+    """
+
+    def __init__(self, ttl: float = 3600.0) -> None:
+        """
+        Class Constructor
+        """
+
+        # Seconds after which an entry is considered stale
+        self.ttl = ttl
+
+        # Events in insertion order mapped to the time they were last added and
+        # the number of equal events queued
+        self.events: "OrderedDict[FileSystemHandlerEvent, List]" = OrderedDict()
+
+        # Latest queued event of every path
+        self.latest: Dict[str, FileSystemHandlerEvent] = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, event: FileSystemHandlerEvent) -> bool:
+        """
+        Function to check if an event is the latest event in flight for its path
+        """
+
+        with self.lock:
+            self._expire()
+            latest = self.latest.get(event.get_path())
+            return latest is not None and latest == event
+
+    def is_queued(self, path: str) -> bool:
+        """
+        Function to check if an event of a path is waiting for an upload worker
+        """
+
+        with self.lock:
+            self._expire()
+            return path in self.latest
+
+    def __len__(self) -> int:
+        """
+        Function to return the number of events in flight
+        """
+
+        with self.lock:
+            return sum(count for _, count in self.events.values())
+
+    def add(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to add an event to the index
+        """
+
+        with self.lock:
+            self._expire()
+            entry = self.events.get(event)
+            if entry is None:
+                self.events[event] = [time.monotonic(), 1]
+            else:
+                entry[0] = time.monotonic()
+                entry[1] += 1
+                self.events.move_to_end(event)
+            self.latest[event.get_path()] = event
+
+    def discard(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to remove an event from the index if it is present
+        """
+
+        with self.lock:
+            entry = self.events.get(event)
+            if entry is None:
+                return
+
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self._remove(event)
+
+    def _remove(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to remove every queued copy of an event, called with the lock held
+        """
+
+        del self.events[event]
+        path = event.get_path()
+        latest = self.latest.get(path)
+        if latest is not None and latest == event:
+            del self.latest[path]
+
+    def _expire(self) -> None:
+        """
+        Function to drop the entries older than the ttl, the oldest are always first
+        """
+
+        cutoff = time.monotonic() - self.ttl
+        while self.events:
+            event, (added, _) = next(iter(self.events.items()))
+            if added > cutoff:
+                break
+            self._remove(event)
@@ -0,0 +1,115 @@
+"""
+File System Handler Filter Module
+"""
+
+import fnmatch
+import os
+import re
+import logging
+from typing import List, Optional, Pattern
+
+log = logging.getLogger(__name__)
+
+# Prefix of the patterns that are regular expressions instead of globs
+REGEX_PREFIX = "re:"
+
+
+def compile_patterns(patterns: List[str]) -> Optional[Pattern]:
+    """
+    Function to compile glob and regex patterns into a single regex, None if there are none
+    """
+
+    if not patterns:
+        return None
+
+    expressions = [
+        (
+            pattern[len(REGEX_PREFIX) :]
+            if pattern.startswith(REGEX_PREFIX)
+            else fnmatch.translate(pattern)
+        )
+        for pattern in patterns
+    ]
+    return re.compile("|".join(f"(?:{expression})" for expression in expressions))
+
+
+class FileSystemHandlerFilter:
+    """
+    Class to include and exclude files by glob or regex patterns (prefixed with re:),
+    compiled once into a regex per kind. Patterns without a / are matched against
+    names, so an excluded name also excludes every file in a directory with that
+    name, and patterns with a / against the path relative to the watched root.
+    Excluded directories are pruned from scans, include patterns only apply to files.
+    """
+
+    def __init__(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        include = include or []
+        exclude = exclude or []
+
+        self.include_name = compile_patterns([p for p in include if "/" not in p])
+        self.include_path = compile_patterns([p for p in include if "/" in p])
+        self.exclude_name = compile_patterns([p for p in exclude if "/" not in p])
+        self.exclude_path = compile_patterns([p for p in exclude if "/" in p])
+        self.has_include = bool(include)
+
+        if include or exclude:
+            log.info(f"Filtering files, include: {include}, exclude: {exclude}")
+
+    def is_excluded_directory(self, relative_path: str, name: str) -> bool:
+        """
+        Function to check if a directory and everything below it is excluded, by its path relative to the root
+        """
+
+        if self.exclude_name is not None and self.exclude_name.match(name):
+            return True
+
+        return self.exclude_path is not None and bool(
+            self.exclude_path.match(relative_path)
+            or self.exclude_path.match(relative_path + os.sep)
+        )
+
+    def is_included_file(self, relative_path: str, name: str) -> bool:
+        """
+        Function to check if a file in a directory that is not excluded is included, by its path relative to the root
+        """
+
+        if self.exclude_name is not None and self.exclude_name.match(name):
+            return False
+        if self.exclude_path is not None and self.exclude_path.match(relative_path):
+            return False
+        if not self.has_include:
+            return True
+
+        return bool(
+            (self.include_name is not None and self.include_name.match(name))
+            or (
+                self.include_path is not None and self.include_path.match(relative_path)
+            )
+        )
+
+    def matches(self, path: str, root: str) -> bool:
+        """
+        Function to check if a file below a root is included, checks the directories between them
+        """
+
+        relative_path = os.path.relpath(path, root)
+        *parts, name = relative_path.split(os.sep)
+        if self.exclude_name is None and self.exclude_path is None:
+            return self.is_included_file(relative_path, name)
+
+        # Skip files below an excluded directory, as a scan prunes them
+        directory = ""
+        for part in parts:
+            directory = os.path.join(directory, part)
+            if self.is_excluded_directory(directory, part):
+                return False
+
+        return self.is_included_file(relative_path, name)
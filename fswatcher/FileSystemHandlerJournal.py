@@ -0,0 +1,260 @@
+"""
+File System Handler Journal Module
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from typing import Dict, List
+
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerJournal:
+    """
+    Class to keep an append-only journal of the accepted events and their
+    completions, so the events in flight when the process dies are replayed on
+    the next start instead of needing a backtrack. Records are written by a
+    single thread that fsyncs them in groups every commit interval. A completion
+    of a path covers every event of the path accepted up to its sequence number.
+    """
+
+    def __init__(
+        self,
+        journal_path: str = "logs/fswatcher_journal.log",
+        commit_interval: float = 0.01,
+        compact_size: int = 64 * 1024**2,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Create the directory of the journal if required
+        directory = os.path.dirname(journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.journal_path = journal_path
+
+        # Seconds between group commits, the events of a crash within it are lost
+        self.commit_interval = commit_interval
+
+        # The journal is rewritten with the incomplete events once it grew by this many bytes
+        self.compact_size = compact_size
+
+        # Incomplete events keyed by path, then by sequence number with their record
+        self.pending: Dict[str, Dict[int, str]] = {}
+        self.sequence = 0
+
+        # Records waiting for the next group commit
+        self.buffer: List[str] = []
+        self.condition = threading.Condition()
+        self.stopped = False
+
+        # Load the events left incomplete by the last run and drop everything else
+        self.recovered = self._load()
+        self.file = None
+        self._compact(self._get_records())
+
+        log.info(
+            f"Event journal opened at {journal_path} ({len(self.recovered)} incomplete events)"
+        )
+
+        self.thread = threading.Thread(
+            target=self._commit_loop, name="fswatcher-journal", daemon=True
+        )
+        self.thread.start()
+
+    def __len__(self) -> int:
+        """
+        Function to return the number of incomplete events
+        """
+
+        with self.condition:
+            return sum(len(events) for events in self.pending.values())
+
+    def accept(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to journal an accepted event and set its sequence number
+        """
+
+        with self.condition:
+            self.sequence += 1
+            event.sequence = self.sequence
+
+            record = json.dumps(
+                {
+                    "sequence": self.sequence,
+                    "action_type": event.action_type,
+                    "src_path": event.src_path,
+                    "dest_path": event.dest_path,
+                    "closed": event.closed,
+                }
+            )
+            self.pending.setdefault(event.get_path(), {})[self.sequence] = record
+            self.buffer.append(record)
+            self.condition.notify_all()
+
+    def complete(self, path: str, sequence: int) -> None:
+        """
+        Function to journal that the events of a path up to a sequence number are handled
+        """
+
+        with self.condition:
+            events = self.pending.get(path)
+            if events is None:
+                return
+
+            for event_sequence in [s for s in events if s <= sequence]:
+                del events[event_sequence]
+            if not events:
+                del self.pending[path]
+
+            self.buffer.append(json.dumps({"completed": sequence, "path": path}))
+            self.condition.notify_all()
+
+    def close(self) -> None:
+        """
+        Function to commit the buffered records and close the journal
+        """
+
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join()
+
+        self.file.close()
+
+    def _load(self) -> List[Dict]:
+        """
+        Function to read the journal and return the incomplete events in the order they were accepted
+        """
+
+        accepted: Dict[int, Dict] = {}
+        completed: Dict[str, int] = {}
+
+        if not os.path.exists(self.journal_path):
+            return []
+
+        with open(self.journal_path) as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last record of a crash may have been written partially
+                    log.warning(f"Skipping a damaged record in {self.journal_path}")
+                    continue
+
+                if "completed" in record:
+                    completed[record["path"]] = max(
+                        completed.get(record["path"], 0), record["completed"]
+                    )
+                else:
+                    accepted[record["sequence"]] = record
+
+        if accepted:
+            self.sequence = max(accepted)
+
+        recovered = []
+        for sequence, record in sorted(accepted.items()):
+            path = record["dest_path"] or record["src_path"]
+            if sequence > completed.get(path, 0):
+                self.pending.setdefault(path, {})[sequence] = json.dumps(record)
+                recovered.append(record)
+
+        return recovered
+
+    def _get_records(self) -> List[str]:
+        """
+        Function to return the records of the incomplete events, called with the lock held
+        """
+
+        return [
+            record
+            for events in self.pending.values()
+            for _, record in sorted(events.items())
+        ]
+
+    def _compact(self, records: List[str]) -> None:
+        """
+        Function to replace the journal with the records of the incomplete events
+        """
+
+        # Write a new journal next to the old one and swap them atomically
+        compacted_path = f"{self.journal_path}.compact"
+        with open(compacted_path, "w") as compacted_file:
+            compacted_file.writelines(f"{record}\n" for record in records)
+            compacted_file.flush()
+            os.fsync(compacted_file.fileno())
+
+        if self.file is not None:
+            self.file.close()
+        os.replace(compacted_path, self.journal_path)
+
+        # Persist the rename before appending to the new journal
+        directory = os.open(os.path.dirname(self.journal_path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        self.file = open(self.journal_path, "a")
+        self.size = sum(len(record) + 1 for record in records)
+        self.compacted_size = self.size
+
+    def _write(self, records: List[str]) -> None:
+        """
+        Function to append records to the journal with a single fsync
+        """
+
+        data = "".join(f"{record}\n" for record in records)
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.size += len(data)
+
+    def _commit_loop(self) -> None:
+        """
+        Group commit thread loop, one fsync covers every record of the interval
+        """
+
+        while True:
+            with self.condition:
+                while not self.buffer and not self.stopped:
+                    self.condition.wait()
+
+                stopped = self.stopped
+                records = self.buffer
+                self.buffer = []
+
+                # The incomplete events replace everything written so far
+                compacted = (
+                    self._get_records()
+                    if self.size - self.compacted_size >= self.compact_size
+                    else None
+                )
+
+            # Write outside of the lock so accepting events never waits for a fsync
+            try:
+                if compacted is not None:
+                    log.debug(f"Compacting the event journal ({self.size} bytes)")
+                    self._compact(compacted)
+                elif records:
+                    self._write(records)
+            except OSError as e:
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Error writing the event journal: {e}",
+                    }
+                )
+
+            if stopped:
+                return
+
+            # Let the records of the next group pile up
+            time.sleep(self.commit_interval)
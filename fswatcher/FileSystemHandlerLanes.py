@@ -0,0 +1,174 @@
+"""
+File System Handler Lanes Module
+"""
+
+import fnmatch
+import functools
+import os
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+from fswatcher import is_file_manifest
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+from fswatcher.FileSystemHandlerPipeline import FileSystemHandlerPipeline
+
+log = logging.getLogger(__name__)
+
+# Lanes in the order they are picked, from the most latency-sensitive
+LANES = ("express", "normal", "bulk")
+
+
+class FileSystemHandlerLanes:
+    """
+    Class to split the uploads into express, normal and bulk lanes, each a pipeline
+    with its own workers, so manifests and small files never wait behind large
+    files. Events of a path stay in the lane of its first event until they are
+    handled, so a delete never overtakes the upload of the same file.
+    """
+
+    def __init__(
+        self,
+        handle_event: Callable[[FileSystemHandlerEvent], None],
+        workers: Dict[str, int],
+        queue_size: int = 10000,
+        express_max_size: int = 1024**2,
+        bulk_min_size: int = 256 * 1024**2,
+        express_patterns: Optional[List[str]] = None,
+        bulk_patterns: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Function called by the workers for every event
+        self.handle_event = handle_event
+
+        # Files below this size in bytes are express, files from this size are bulk
+        self.express_max_size = express_max_size
+        self.bulk_min_size = bulk_min_size
+
+        # Path patterns picking a lane regardless of the size of the file
+        self.express_patterns = express_patterns or []
+        self.bulk_patterns = bulk_patterns or []
+
+        # One pipeline per lane, the queue size is split by their number of workers
+        total_workers = sum(max(1, workers[lane]) for lane in LANES)
+        self.pipelines: Dict[str, FileSystemHandlerPipeline] = {
+            lane: FileSystemHandlerPipeline(
+                handle_event=functools.partial(self._handle_event, lane),
+                workers=workers[lane],
+                queue_size=max(1, queue_size * max(1, workers[lane]) // total_workers),
+            )
+            for lane in LANES
+        }
+
+        # Lane and number of queued events of the paths in flight
+        self.in_flight: Dict[str, List] = {}
+        self.lock = threading.Lock()
+
+        # Lane of the event handled by the current worker thread
+        self.current = threading.local()
+
+    def start(self) -> None:
+        """
+        Function to start the workers of every lane
+        """
+
+        for lane, pipeline in self.pipelines.items():
+            log.info(f"Starting the {lane} lane")
+            pipeline.start()
+
+    def submit(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to enqueue an event in its lane, blocks while the lane is full
+        """
+
+        path = event.get_path()
+        lane = self.get_lane(event)
+
+        with self.lock:
+            # Keep the lane of the events of the path that are still queued
+            entry = self.in_flight.get(path)
+            if entry is None:
+                entry = [lane, 0]
+                self.in_flight[path] = entry
+            entry[1] += 1
+            lane = entry[0]
+
+        self.pipelines[lane].submit(event)
+
+    def get_lane(self, event: FileSystemHandlerEvent) -> str:
+        """
+        Function to pick the lane of an event by manifest, path pattern and size
+        """
+
+        path = event.get_path()
+
+        # Deletes and manifests are cheap and consumers wait on manifests
+        if event.action_type == "DELETE" or is_file_manifest(path):
+            return "express"
+
+        relative_path = event.get_parsed_path()
+        if any(fnmatch.fnmatch(relative_path, p) for p in self.express_patterns):
+            return "express"
+        if any(fnmatch.fnmatch(relative_path, p) for p in self.bulk_patterns):
+            return "bulk"
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return "normal"
+
+        if size < self.express_max_size:
+            return "express"
+        if size >= self.bulk_min_size:
+            return "bulk"
+        return "normal"
+
+    def get_current_lane(self) -> Optional[str]:
+        """
+        Function to return the lane handled by the calling thread, None outside of the workers
+        """
+
+        return getattr(self.current, "lane", None)
+
+    def qsize(self) -> int:
+        """
+        Function to return the number of queued events
+        """
+
+        return sum(pipeline.qsize() for pipeline in self.pipelines.values())
+
+    def join(self) -> None:
+        """
+        Function to wait until every queued event has been handled
+        """
+
+        for pipeline in self.pipelines.values():
+            pipeline.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Function to drain the lanes and stop their workers
+        """
+
+        for pipeline in self.pipelines.values():
+            pipeline.stop(timeout)
+
+    def _handle_event(self, lane: str, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to handle an event and release its path once nothing is queued for it
+        """
+
+        self.current.lane = lane
+        try:
+            self.handle_event(event)
+        finally:
+            path = event.get_path()
+            with self.lock:
+                entry = self.in_flight.get(path)
+                if entry is not None:
+                    entry[1] -= 1
+                    if entry[1] <= 0:
+                        del self.in_flight[path]
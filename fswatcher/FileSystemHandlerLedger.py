@@ -0,0 +1,186 @@
+"""
+File System Handler Ledger Module
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Callable, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerLedger:
+    """
+    Class to keep a local SQLite record of every successful upload, so restarts
+    can skip files that are already in S3 without re-listing the bucket.
+    """
+
+    def __init__(self, ledger_path: str = "logs/fswatcher_ledger.db") -> None:
+        """
+        Class Constructor
+        """
+
+        # Create the directory of the ledger if required
+        directory = os.path.dirname(ledger_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.ledger_path = ledger_path
+        self.lock = threading.Lock()
+
+        # The connection is shared between the upload workers behind the lock
+        self.connection = sqlite3.connect(ledger_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS uploads (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                etag TEXT,
+                key TEXT NOT NULL,
+                uploaded REAL NOT NULL,
+                checksum TEXT,
+                bucket TEXT
+            )
+            """
+        )
+
+        # Ledgers created before content hashing or watch rules don't have the
+        # checksum and bucket columns
+        columns = [
+            row[1] for row in self.connection.execute("PRAGMA table_info(uploads)")
+        ]
+        for column in ("checksum", "bucket"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE uploads ADD COLUMN {column} TEXT")
+        self.connection.commit()
+
+        log.info(f"Upload ledger opened at {ledger_path} ({len(self)} entries)")
+
+    def __len__(self) -> int:
+        """
+        Function to return the number of entries in the ledger
+        """
+
+        with self.lock:
+            row = self.connection.execute("SELECT COUNT(*) FROM uploads").fetchone()
+
+        return row[0]
+
+    def record(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        key: str,
+        etag: Optional[str] = None,
+        checksum: Optional[str] = None,
+        bucket: Optional[str] = None,
+    ) -> None:
+        """
+        Function to record a successful upload of a file to the key of a bucket
+        """
+
+        with self.lock:
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO uploads
+                (path, size, mtime_ns, etag, key, uploaded, checksum, bucket)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (path, size, mtime_ns, etag, key, time.time(), checksum, bucket),
+            )
+            self.connection.commit()
+
+    def remove(self, path: str) -> None:
+        """
+        Function to remove a file from the ledger
+        """
+
+        with self.lock:
+            self.connection.execute("DELETE FROM uploads WHERE path = ?", (path,))
+            self.connection.commit()
+
+    def lookup(
+        self, path: str
+    ) -> Optional[Tuple[int, int, Optional[str], str, Optional[str], Optional[str]]]:
+        """
+        Function to return the size, mtime in ns, etag, key, checksum and bucket recorded for a file
+        """
+
+        with self.lock:
+            return self.connection.execute(
+                """
+                SELECT size, mtime_ns, etag, key, checksum, bucket
+                FROM uploads WHERE path = ?
+                """,
+                (path,),
+            ).fetchone()
+
+    @staticmethod
+    def is_target(
+        entry: Tuple, bucket: Optional[str] = None, key: Optional[str] = None
+    ) -> bool:
+        """
+        Function to check if an entry was uploaded to the key of the bucket, a file
+        uploaded elsewhere has to be uploaded again after its watch rule changed.
+        Entries recorded before the bucket was kept are only checked by key.
+        """
+
+        return (bucket is None or entry[5] is None or entry[5] == bucket) and (
+            key is None or entry[3] == key
+        )
+
+    def is_uploaded(
+        self,
+        path: str,
+        stat: Optional[os.stat_result] = None,
+        bucket: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> bool:
+        """
+        Function to check if the current version of a file has already been uploaded,
+        to the key of the bucket if given
+        """
+
+        entry = self.lookup(path)
+        if entry is None or not self.is_target(entry, bucket, key):
+            return False
+
+        try:
+            stat = stat or os.stat(path)
+        except FileNotFoundError:
+            return False
+
+        return entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+    def get_unresolved(
+        self,
+        paths: Iterable[str],
+        get_target: Optional[Callable[[str], Tuple[str, str]]] = None,
+    ) -> List[str]:
+        """
+        Function to return the files whose current version is not in the ledger,
+        get_target returns the bucket and key a file has to be uploaded to
+        """
+
+        unresolved = []
+        for path in paths:
+            bucket, key = get_target(path) if get_target is not None else (None, None)
+            if not self.is_uploaded(path, bucket=bucket, key=key):
+                unresolved.append(path)
+
+        return unresolved
+
+    def close(self) -> None:
+        """
+        Function to close the ledger
+        """
+
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,290 @@
+"""
+File System Handler Metrics Module
+"""
+
+import bisect
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Default histogram buckets in seconds, from a small file to a multi-GB upload
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+
+class FileSystemHandlerMetric:
+    """
+    Class holding the samples of a metric, keyed by the value of its label
+    """
+
+    def __init__(self, name: str, help: str, metric_type: str, label: str = "") -> None:
+        """
+        Class Constructor
+        """
+
+        self.name = name
+        self.help = help
+        self.metric_type = metric_type
+        self.label = label
+        self.values: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, label: str = "") -> None:
+        """
+        Function to increment the metric
+        """
+
+        with self.lock:
+            self.values[label] = self.values.get(label, 0) + amount
+
+    def dec(self, amount: float = 1, label: str = "") -> None:
+        """
+        Function to decrement the metric
+        """
+
+        self.inc(-amount, label)
+
+    def render(self) -> List[str]:
+        """
+        Function to return the metric in the Prometheus text format
+        """
+
+        with self.lock:
+            values = dict(self.values)
+
+        # Metrics without labels are reported before their first update
+        if not values and not self.label:
+            values = {"": 0}
+
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for label, value in sorted(values.items()):
+            labels = f'{{{self.label}="{label}"}}' if self.label else ""
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class FileSystemHandlerCallbackMetric(FileSystemHandlerMetric):
+    """
+    Class for a metric whose value is read from a callback when scraped
+    """
+
+    def __init__(
+        self, name: str, help: str, metric_type: str, callback: Callable[[], float]
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        super().__init__(name, help, metric_type)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        """
+        Function to return the current value of the callback
+        """
+
+        try:
+            value = self.callback()
+        except Exception as e:
+            log.debug(f"Error reading metric {self.name}: {e}")
+            return []
+
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {value}",
+        ]
+
+
+class FileSystemHandlerHistogram(FileSystemHandlerMetric):
+    """
+    Class for a histogram of durations in seconds
+    """
+
+    def __init__(
+        self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        super().__init__(name, help, "histogram")
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Function to record an observation
+        """
+
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def render(self) -> List[str]:
+        """
+        Function to return the cumulative buckets, sum and count of the histogram
+        """
+
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class FileSystemHandlerMetrics:
+    """
+    Class to collect the metrics of the watcher and uploader, and serve them in the
+    Prometheus text format on a local HTTP endpoint. Updates only take a lock and
+    an addition, values like queue depths are read when the endpoint is scraped.
+    """
+
+    def __init__(self, port: int = 0, host: str = "") -> None:
+        """
+        Class Constructor
+        """
+
+        # Port of the metrics endpoint, 0 disables it
+        self.port = port
+        self.host = host
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.metrics: List[FileSystemHandlerMetric] = []
+
+        self.events = self.counter(
+            "fswatcher_events_total", "File system events accepted", "action"
+        )
+        self.uploads = self.counter(
+            "fswatcher_uploads_total", "Uploads by result", "result"
+        )
+        self.uploaded_bytes = self.counter(
+            "fswatcher_uploaded_bytes_total", "Bytes uploaded to S3"
+        )
+        self.uploads_in_flight = self.gauge(
+            "fswatcher_uploads_in_flight", "Uploads currently transferring"
+        )
+        self.upload_duration = self.histogram(
+            "fswatcher_upload_duration_seconds", "Duration of the S3 uploads"
+        )
+        self.detection_latency = self.histogram(
+            "fswatcher_detection_to_upload_seconds",
+            "Time from the detection of a file to the end of its upload",
+        )
+        self.scan_duration = self.histogram(
+            "fswatcher_scan_duration_seconds", "Duration of the fallback scans"
+        )
+        self.files_scanned = self.counter(
+            "fswatcher_files_scanned_total", "Files checked by the fallback scans"
+        )
+
+    def counter(self, name: str, help: str, label: str = "") -> FileSystemHandlerMetric:
+        """
+        Function to register a counter
+        """
+
+        return self._register(FileSystemHandlerMetric(name, help, "counter", label))
+
+    def gauge(self, name: str, help: str, label: str = "") -> FileSystemHandlerMetric:
+        """
+        Function to register a gauge
+        """
+
+        return self._register(FileSystemHandlerMetric(name, help, "gauge", label))
+
+    def histogram(self, name: str, help: str) -> FileSystemHandlerHistogram:
+        """
+        Function to register a histogram
+        """
+
+        return self._register(FileSystemHandlerHistogram(name, help))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], float],
+        metric_type: str = "gauge",
+    ) -> FileSystemHandlerMetric:
+        """
+        Function to register a metric read from a callback when scraped
+        """
+
+        return self._register(
+            FileSystemHandlerCallbackMetric(name, help, metric_type, callback)
+        )
+
+    def render(self) -> str:
+        """
+        Function to return every metric in the Prometheus text format
+        """
+
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def start(self) -> None:
+        """
+        Function to start the metrics endpoint in a background thread
+        """
+
+        if not self.port:
+            return
+
+        metrics = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                log.debug(format % args)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, name="fswatcher-metrics", daemon=True
+        ).start()
+
+        log.info(f"Serving metrics on port {self.port} at /metrics")
+
+    def stop(self) -> None:
+        """
+        Function to stop the metrics endpoint
+        """
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def _register(self, metric: FileSystemHandlerMetric) -> FileSystemHandlerMetric:
+        """
+        Function to add a metric to the rendered metrics
+        """
+
+        self.metrics.append(metric)
+        return metric
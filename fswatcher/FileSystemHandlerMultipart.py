@@ -0,0 +1,217 @@
+"""
+File System Handler Multipart Module
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerPartReader:
+    """
+    Class to stream a part of a file straight from the file with positional reads,
+    so a part is never held in memory as a whole and a file truncated during the
+    upload raises an OSError instead of sending a short part.
+    """
+
+    def __init__(self, fd: int, offset: int, length: int) -> None:
+        """
+        Class Constructor
+        """
+
+        # File descriptor shared by the readers of the parts of a file
+        self.fd = fd
+        self.offset = offset
+        self.length = length
+        self.position = 0
+
+    def __len__(self) -> int:
+        """
+        Function to return the number of bytes left to read
+        """
+
+        return self.length - self.position
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Function to read up to size bytes of the part, the rest of the part by default
+        """
+
+        remaining = self.length - self.position
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        if size <= 0:
+            return b""
+
+        chunks = []
+        while size > 0:
+            chunk = os.pread(self.fd, size, self.offset + self.position)
+            if not chunk:
+                raise OSError(
+                    f"File was truncated while uploading the part at offset {self.offset}"
+                )
+            chunks.append(chunk)
+            self.position += len(chunk)
+            size -= len(chunk)
+
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """
+        Function to move the read position, used by botocore to retry a part
+        """
+
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.length
+
+        self.position = min(max(0, offset), self.length)
+        return self.position
+
+    def tell(self) -> int:
+        """
+        Function to return the read position
+        """
+
+        return self.position
+
+
+class FileSystemHandlerMultipart:
+    """
+    Class to upload large files with a manual multipart upload. The parts of every
+    file are uploaded by one thread pool shared by all uploads and stream from the
+    file as they are sent, so memory and connections stay bounded by the pool size
+    whatever the part size and the number of files uploaded at once.
+    """
+
+    def __init__(self, workers: int = 8) -> None:
+        """
+        Class Constructor
+        """
+
+        # Number of parts uploaded at once across every file
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="fswatcher-part"
+        )
+
+    def upload(
+        self,
+        s3_client,
+        src_path: str,
+        bucket_name: str,
+        file_key: str,
+        part_size: int = 64 * 1024**2,
+        extra_args: Optional[Dict] = None,
+    ) -> None:
+        """
+        Function to upload a file in parts, the upload is aborted if a part fails
+        """
+
+        extra_args = extra_args or {}
+        checksum_algorithm = extra_args.get("ChecksumAlgorithm")
+
+        fd = os.open(src_path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+
+            # S3 allows at most 10000 parts
+            part_size = max(part_size, -(-size // 10000))
+
+            upload_id = s3_client.create_multipart_upload(
+                Bucket=bucket_name, Key=file_key, **extra_args
+            )["UploadId"]
+
+            try:
+                parts = self._upload_parts(
+                    s3_client,
+                    fd,
+                    size,
+                    part_size,
+                    bucket_name,
+                    file_key,
+                    upload_id,
+                    checksum_algorithm,
+                )
+                s3_client.complete_multipart_upload(
+                    Bucket=bucket_name,
+                    Key=file_key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+
+            except Exception:
+                # Don't leave the uploaded parts behind to be billed
+                s3_client.abort_multipart_upload(
+                    Bucket=bucket_name, Key=file_key, UploadId=upload_id
+                )
+                raise
+
+        finally:
+            os.close(fd)
+
+        log.debug(
+            f"Object ({file_key}) - Uploaded {size} bytes in {-(-size // part_size)} parts"
+        )
+
+    def close(self) -> None:
+        """
+        Function to wait for the parts being uploaded and stop the thread pool
+        """
+
+        self.executor.shutdown(wait=True)
+
+    def _upload_parts(
+        self,
+        s3_client,
+        fd: int,
+        size: int,
+        part_size: int,
+        bucket_name: str,
+        file_key: str,
+        upload_id: str,
+        checksum_algorithm: Optional[str],
+    ) -> List[Dict]:
+        """
+        Function to upload the parts of a file in parallel and return them in order
+        """
+
+        def upload_part(part_number: int) -> Dict:
+            start = (part_number - 1) * part_size
+            body = FileSystemHandlerPartReader(fd, start, min(part_size, size - start))
+
+            part_args = (
+                {"ChecksumAlgorithm": checksum_algorithm} if checksum_algorithm else {}
+            )
+            response = s3_client.upload_part(
+                Bucket=bucket_name,
+                Key=file_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                **part_args,
+            )
+
+            part = {"PartNumber": part_number, "ETag": response["ETag"]}
+            if checksum_algorithm:
+                checksum_key = f"Checksum{checksum_algorithm}"
+                part[checksum_key] = response[checksum_key]
+            return part
+
+        part_count = max(1, -(-size // part_size))
+        futures = [
+            self.executor.submit(upload_part, part_number)
+            for part_number in range(1, part_count + 1)
+        ]
+
+        try:
+            return [future.result() for future in futures]
+        finally:
+            # Don't upload the remaining parts of a failed file, and wait for the
+            # running ones before the file is closed
+            for future in futures:
+                future.cancel()
+            wait(futures)
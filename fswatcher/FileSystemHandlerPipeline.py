@@ -0,0 +1,128 @@
+"""
+File System Handler Pipeline Module
+"""
+
+import threading
+import zlib
+import logging
+from queue import Queue
+from typing import Callable, List, Optional
+
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerPipeline:
+    """
+    Class to hand events off the observer thread to a pool of upload workers.
+    Every worker drains its own bounded queue and events are sharded by path,
+    so events for the same path are always handled in order by the same worker.
+    """
+
+    def __init__(
+        self,
+        handle_event: Callable[[FileSystemHandlerEvent], None],
+        workers: int = 10,
+        queue_size: int = 10000,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Function called by the workers for every event
+        self.handle_event = handle_event
+
+        # Number of upload workers
+        self.workers = max(1, workers)
+
+        # One bounded queue per worker, the total size is split between them
+        shard_size = max(1, queue_size // self.workers)
+        self.queues: List[Queue] = [
+            Queue(maxsize=shard_size) for _ in range(self.workers)
+        ]
+
+        # Worker threads
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """
+        Function to start the worker threads
+        """
+
+        for index, queue in enumerate(self.queues):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(queue,),
+                name=f"fswatcher-upload-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+        log.info(f"Started {self.workers} upload workers")
+
+    def submit(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to enqueue an event, blocks while the worker's queue is full
+        """
+
+        self.queues[self._get_shard(event.get_path())].put(event)
+
+    def qsize(self) -> int:
+        """
+        Function to return the number of queued events
+        """
+
+        return sum(queue.qsize() for queue in self.queues)
+
+    def join(self) -> None:
+        """
+        Function to wait until every queued event has been handled
+        """
+
+        for queue in self.queues:
+            queue.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Function to drain the queues and stop the worker threads
+        """
+
+        for queue in self.queues:
+            queue.put(None)
+
+        for thread in self.threads:
+            thread.join(timeout)
+
+        self.threads = []
+
+    def _get_shard(self, path: str) -> int:
+        """
+        Function to get the worker index for a path
+        """
+
+        return zlib.crc32(path.encode("utf-8", "surrogateescape")) % self.workers
+
+    def _worker(self, queue: Queue) -> None:
+        """
+        Worker loop, handles events from its queue until it receives None
+        """
+
+        while True:
+            event = queue.get()
+            try:
+                if event is None:
+                    return
+
+                self.handle_event(event)
+
+            except Exception as e:
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Error in upload worker skipping to next: {e}",
+                    }
+                )
+            finally:
+                queue.task_done()
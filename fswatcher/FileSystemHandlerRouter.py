@@ -0,0 +1,184 @@
+"""
+File System Handler Router Module
+"""
+
+import json
+import os
+import logging
+from typing import List, Optional
+
+from fswatcher.FileSystemHandlerFilter import FileSystemHandlerFilter
+
+log = logging.getLogger(__name__)
+
+
+class FileSystemHandlerRoute:
+    """
+    Class holding a watch rule: the files below a root matching its patterns are
+    uploaded to its bucket, with its own options
+    """
+
+    def __init__(
+        self,
+        root: str,
+        bucket_name: str,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        allow_delete: bool = False,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Directory watched by the rule, and the prefix of the paths below it
+        self.root = os.path.normpath(root)
+        self.prefix = os.path.join(self.root, "")
+
+        # Bucket name, may include the directories the files are uploaded below
+        self.bucket_name = bucket_name
+
+        # Patterns of the paths relative to the root, every file is included by default.
+        # Compiled like the global patterns, so scans prune the excluded directories
+        self.include = include or []
+        self.exclude = exclude or []
+        self.path_filter = FileSystemHandlerFilter(self.include, self.exclude)
+
+        # Delete objects when their files are deleted
+        self.allow_delete = allow_delete
+
+    def __repr__(self) -> str:
+        """
+        String Representation of the Class
+        """
+
+        return f"FileSystemHandlerRoute(root={self.root}, bucket_name={self.bucket_name}, include={self.include}, exclude={self.exclude})"
+
+    def matches(self, path: str) -> bool:
+        """
+        Function to check if a path is below the root and matches the patterns
+        """
+
+        return path.startswith(self.prefix) and self.path_filter.matches(
+            path, self.root
+        )
+
+
+class FileSystemHandlerRouter:
+    """
+    Class to pick the watch rule of a path. Rules of nested roots are checked before
+    the rules of their parents, rules of the same root in the order they are given.
+    The global patterns apply to every rule, relative to the root of the rule like
+    its own patterns, whether a path comes from an event or a scan.
+    """
+
+    def __init__(
+        self,
+        routes: List[FileSystemHandlerRoute],
+        path_filter: Optional[FileSystemHandlerFilter] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        self.routes = routes
+
+        # Global include and exclude patterns, None to only apply the patterns of the rules
+        self.path_filter = path_filter
+
+        # Deepest roots first, sorted() keeps the given order of rules of the same root
+        self.ordered_routes = sorted(
+            routes, key=lambda route: route.root.count(os.sep), reverse=True
+        )
+
+    @classmethod
+    def from_rules_file(
+        cls,
+        rules_path: str,
+        allow_delete: bool = False,
+        path_filter: Optional[FileSystemHandlerFilter] = None,
+    ) -> "FileSystemHandlerRouter":
+        """
+        Function to load the watch rules from a JSON file holding a list of rules, e.g.
+        [{"root": "/watch/a", "bucket": "bucket/a", "include": ["*.fits"], "allow_delete": true}]
+        """
+
+        with open(rules_path) as rules_file:
+            rules = json.load(rules_file)
+
+        routes = [
+            FileSystemHandlerRoute(
+                root=rule["root"],
+                bucket_name=rule["bucket"],
+                include=rule.get("include"),
+                exclude=rule.get("exclude"),
+                allow_delete=rule.get("allow_delete", allow_delete),
+            )
+            for rule in rules
+        ]
+        if not routes:
+            raise ValueError(f"No watch rules in {rules_path}")
+
+        for route in routes:
+            log.info(f"Watch rule: {route.root} -> {route.bucket_name}")
+
+        return cls(routes, path_filter=path_filter)
+
+    def get_route(self, path: str) -> Optional[FileSystemHandlerRoute]:
+        """
+        Function to return the rule of a path, None if no rule matches it
+        """
+
+        for route in self.ordered_routes:
+            if route.matches(path):
+                # The global patterns exclude the file from the rule that matched it
+                if self.path_filter is not None and not self.path_filter.matches(
+                    path, route.root
+                ):
+                    return None
+                return route
+
+        return None
+
+    def is_excluded_directory(self, path: str, name: str) -> bool:
+        """
+        Function to check if no rule uploads a file below a directory, so scans can prune it
+        """
+
+        # The root of a rule below the directory has to be reached
+        prefix = os.path.join(path, "")
+        if any(route.prefix.startswith(prefix) for route in self.routes):
+            return False
+
+        # Deepest rules first, files fall through to the rules of the parent roots
+        # only if the patterns of their rule don't match them
+        for route in self.ordered_routes:
+            if not path.startswith(route.prefix):
+                continue
+            relative_path = path[len(route.prefix) :]
+            if route.path_filter.is_excluded_directory(relative_path, name):
+                continue
+
+            # A rule of a root above the directory uploads below it unless the
+            # global patterns exclude it
+            if self.path_filter is None or not self.path_filter.is_excluded_directory(
+                relative_path, name
+            ):
+                return False
+
+            # Every file below is matched by a rule without patterns and excluded
+            if not route.include and not route.exclude:
+                return True
+
+        return True
+
+    def get_roots(self) -> List[str]:
+        """
+        Function to return the roots to watch, roots below another root are already watched
+        """
+
+        roots = []
+        for route in sorted(self.routes, key=lambda route: route.root):
+            if not any(route.prefix.startswith(parent) for parent in roots):
+                roots.append(route.prefix)
+
+        return [os.path.normpath(root) for root in roots]
@@ -0,0 +1,228 @@
+"""
+File System Handler Scanner Module
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from fswatcher.FileSystemHandlerFilter import FileSystemHandlerFilter
+from fswatcher.FileSystemHandlerRouter import FileSystemHandlerRouter
+
+log = logging.getLogger(__name__)
+
+# Directories modified this recently are rescanned on the next pass, since a
+# change within the mtime granularity of the filesystem would go unnoticed
+RACY_DIRECTORY_SECONDS = 2.0
+
+
+class FileSystemHandlerScanner:
+    """
+    Class to poll a directory tree with os.scandir. It keeps (size, mtime, inode)
+    for every file per directory and diffs it against the previous scan. With
+    pruning enabled, directories whose mtime did not change reuse their cached
+    entries and only a periodic deep scan re-checks the files inside them.
+    Excluded directories are never listed and excluded files never stat'ed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        prune: bool = False,
+        deep_scan_interval: float = 0,
+        path_filter: Optional[FileSystemHandlerFilter] = None,
+        router: Optional[FileSystemHandlerRouter] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Root of the scanned tree, the patterns match the paths relative to it
+        self.path = path
+        self.prefix = os.path.join(path, "")
+
+        # Reuse the entries of directories whose mtime did not change
+        self.prune = prune
+
+        # Seconds between deep scans when pruning, 0 to never re-check unchanged directories
+        self.deep_scan_interval = deep_scan_interval
+        self.last_deep_scan = time.monotonic()
+
+        # Include and exclude patterns of the files and directories, None to scan everything
+        self.path_filter = path_filter
+
+        # Watch rules, the files no rule uploads are skipped and their directories pruned
+        self.router = router
+
+        # Cache of the last scan, directory -> (mtime in ns, files, subdirectories)
+        # where files maps path -> (size, mtime in ns, inode)
+        self.directories: Dict[
+            str, Tuple[Optional[int], Dict[str, Tuple[int, int, int]], List[str]]
+        ] = {}
+
+        # Number of files stat'ed and directories listed by the last scan
+        self.files_scanned = 0
+        self.directories_scanned = 0
+
+    @property
+    def files_total(self) -> int:
+        """
+        Number of files seen in the tree
+        """
+
+        return sum(len(files) for _, files, _ in self.directories.values())
+
+    def get_signature(self, file_path: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Function to return the (size, mtime in ns, inode) of a file from the last scan
+        """
+
+        cached = self.directories.get(os.path.dirname(file_path))
+        return cached[1].get(file_path) if cached is not None else None
+
+    def scan(self) -> Tuple[Set[str], Set[str], Set[str]]:
+        """
+        Function to walk the tree once and return the created, modified and deleted files
+        """
+
+        created: Set[str] = set()
+        modified: Set[str] = set()
+        deleted: Set[str] = set()
+        visited: Set[str] = set()
+
+        deep = not self.prune
+        if (
+            self.prune
+            and self.deep_scan_interval > 0
+            and time.monotonic() - self.last_deep_scan >= self.deep_scan_interval
+        ):
+            deep = True
+            self.last_deep_scan = time.monotonic()
+            log.debug("Running deep scan")
+
+        self.files_scanned = 0
+        self.directories_scanned = 0
+
+        directories = [self.path]
+
+        while directories:
+            directory = directories.pop()
+
+            cached = self.directories.get(directory)
+
+            try:
+                directory_mtime = os.stat(directory).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            except PermissionError:
+                # Keep the cached entries of a directory that can't be accessed
+                if cached is not None:
+                    visited.add(directory)
+                    directories.extend(cached[2])
+                continue
+
+            visited.add(directory)
+
+            # Unchanged directory, only its subdirectories need to be checked
+            if not deep and cached is not None and cached[0] == directory_mtime:
+                directories.extend(cached[2])
+                continue
+
+            listing = self._list(directory)
+
+            # Keep the cached entries of a directory that could not be listed
+            if listing is None:
+                if cached is not None:
+                    directories.extend(cached[2])
+                continue
+
+            files, subdirectories = listing
+            directories.extend(subdirectories)
+
+            # Compare against the files the directory had on the last scan
+            old_files = cached[1] if cached is not None else {}
+            for file_path, signature in files.items():
+                old_signature = old_files.get(file_path)
+                if old_signature is None:
+                    created.add(file_path)
+                elif old_signature != signature:
+                    modified.add(file_path)
+            deleted.update(old_files.keys() - files.keys())
+
+            # Don't trust an mtime that could still change within its granularity
+            if time.time_ns() - directory_mtime < RACY_DIRECTORY_SECONDS * 1e9:
+                directory_mtime = None
+
+            self.directories[directory] = (directory_mtime, files, subdirectories)
+
+        # Every file of a directory that disappeared has been deleted
+        for directory in self.directories.keys() - visited:
+            deleted.update(self.directories.pop(directory)[1].keys())
+
+        return created, modified, deleted
+
+    def _list(
+        self, directory: str
+    ) -> Optional[Tuple[Dict[str, Tuple[int, int, int]], List[str]]]:
+        """
+        Function to list the regular files and subdirectories of a directory, None if it can't be listed
+        """
+
+        files: Dict[str, Tuple[int, int, int]] = {}
+        subdirectories: List[str] = []
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self._is_excluded_directory(entry):
+                                continue
+                            subdirectories.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            if not self._is_included_file(entry):
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            files[entry.path] = (
+                                stat.st_size,
+                                stat.st_mtime_ns,
+                                stat.st_ino,
+                            )
+                    except FileNotFoundError:
+                        # Removed between listing and stat, the next scan reports it
+                        continue
+        except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
+            log.debug(f"Skipping directory {directory}: {e}")
+            return None
+
+        self.files_scanned += len(files)
+        self.directories_scanned += 1
+
+        return files, subdirectories
+
+    def _is_excluded_directory(self, entry: os.DirEntry) -> bool:
+        """
+        Function to check if a directory is pruned by the patterns or the watch rules
+        """
+
+        if self.path_filter is not None and self.path_filter.is_excluded_directory(
+            entry.path[len(self.prefix) :], entry.name
+        ):
+            return True
+
+        return self.router is not None and self.router.is_excluded_directory(
+            entry.path, entry.name
+        )
+
+    def _is_included_file(self, entry: os.DirEntry) -> bool:
+        """
+        Function to check if a file is included by the patterns and a watch rule
+        """
+
+        if self.path_filter is not None and not self.path_filter.is_included_file(
+            entry.path[len(self.prefix) :], entry.name
+        ):
+            return False
+
+        return self.router is None or self.router.get_route(entry.path) is not None
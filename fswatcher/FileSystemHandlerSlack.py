@@ -0,0 +1,226 @@
+"""
+File System Handler Slack Module
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from queue import Empty, Full, Queue
+from typing import List, Optional
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from fswatcher import (
+    is_file_manifest,
+    generate_file_pipeline_message,
+    send_slack_notification,
+)
+
+log = logging.getLogger(__name__)
+
+# Maximum length of the text of a Slack section block
+SLACK_SECTION_LIMIT = 3000
+
+
+class FileSystemHandlerSlack:
+    """
+    Class to send the Slack notifications from a background thread so the upload
+    workers never wait on Slack. In digest mode the uploaded files are rolled into
+    a single message per interval instead of a message and a reply per file.
+    """
+
+    def __init__(
+        self,
+        slack_client: WebClient,
+        slack_channel: str,
+        digest_interval: float = 0,
+        digest_size: int = 50,
+        max_queue: int = 10000,
+        max_threads: int = 10000,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        self.slack_client = slack_client
+        self.slack_channel = slack_channel
+
+        # Number of notifications that could not be sent
+        self.failures = 0
+
+        # Seconds the uploaded files are collected for before a digest is sent, 0 disables digests
+        self.digest_interval = digest_interval
+
+        # Maximum number of files in a single digest
+        self.digest_size = max(1, digest_size)
+        self.digest: List[str] = []
+        self.digest_deadline = None
+
+        # ts of the file messages waiting for their upload reply, keyed by path
+        self.threads: OrderedDict = OrderedDict()
+        self.max_threads = max_threads
+
+        self.notifications: Queue = Queue(maxsize=max_queue)
+        self.thread = threading.Thread(
+            target=self._run, name="fswatcher-slack", daemon=True
+        )
+        self.thread.start()
+
+    def file_detected(self, path: str) -> None:
+        """
+        Function to notify that a file was detected
+        """
+
+        self._put(("detected", path))
+
+    def file_uploaded(self, path: str, relative_path: Optional[str] = None) -> None:
+        """
+        Function to notify that a file was uploaded, in the thread of its detected message,
+        the digest lists it by its path relative to its watched root
+        """
+
+        self._put(("uploaded", path, relative_path or path))
+
+    def upload_failed(self, message: str) -> None:
+        """
+        Function to notify that an upload failed
+        """
+
+        self._put(("error", message))
+
+    def stop(self) -> None:
+        """
+        Function to send the queued notifications and stop the background thread
+        """
+
+        self.notifications.put(None)
+        self.thread.join()
+
+    def _put(self, notification: tuple) -> None:
+        """
+        Function to queue a notification, never blocks the caller
+        """
+
+        try:
+            self.notifications.put_nowait(notification)
+        except Full:
+            self.failures += 1
+            log.warning(f"Slack notification queue is full, dropping {notification}")
+
+    def _run(self) -> None:
+        """
+        Background loop, sends the notifications in order and the digest when it is due
+        """
+
+        while True:
+            timeout = None
+            if self.digest_deadline is not None:
+                timeout = max(0, self.digest_deadline - time.monotonic())
+
+            try:
+                notification = self.notifications.get(timeout=timeout)
+            except Empty:
+                self._send_digest()
+                continue
+
+            if notification is None:
+                self._send_digest()
+                return
+
+            try:
+                self._handle(*notification)
+            except Exception as e:
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Error sending Slack Notification: {e}",
+                    }
+                )
+
+            if len(self.digest) >= self.digest_size:
+                self._send_digest()
+
+    def _handle(
+        self, notification_type: str, value: str, relative_path: Optional[str] = None
+    ) -> None:
+        """
+        Function to send a single notification
+        """
+
+        if notification_type == "error":
+            self._send(value, alert_type="error")
+            return
+
+        manifest = is_file_manifest(value)
+
+        if notification_type == "detected":
+            # The digest replaces the message of every regular file
+            if self.digest_interval > 0 and not manifest:
+                return
+
+            ts = self._send(generate_file_pipeline_message(value))
+
+            # Keep the ts returned by Slack to reply to the message once uploaded
+            if ts is not None and not manifest:
+                self.threads[value] = ts
+                while len(self.threads) > self.max_threads:
+                    self.threads.popitem(last=False)
+
+        elif notification_type == "uploaded" and not manifest:
+            if self.digest_interval > 0:
+                if not self.digest:
+                    self.digest_deadline = time.monotonic() + self.digest_interval
+                self.digest.append(relative_path or value)
+                return
+
+            self._send(
+                generate_file_pipeline_message(value, alert_type="upload"),
+                alert_type="upload",
+                thread_ts=self.threads.pop(value, None),
+            )
+
+    def _send_digest(self) -> None:
+        """
+        Function to send a single message listing the files uploaded since the last digest
+        """
+
+        files, self.digest = self.digest, []
+        self.digest_deadline = None
+        if not files:
+            return
+
+        message = f"{len(files)} Files Uploaded to S3"
+        for index, path in enumerate(files):
+            line = f"\n• _{path}_"
+            if len(message) + len(line) > SLACK_SECTION_LIMIT - 50:
+                message += f"\n...and {len(files) - index} more"
+                break
+            message += line
+
+        self._send(message, alert_type="upload")
+
+    def _send(
+        self,
+        slack_message,
+        alert_type: Optional[str] = None,
+        thread_ts: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Function to send a message and return its ts, None if it could not be sent
+        """
+
+        try:
+            return send_slack_notification(
+                slack_client=self.slack_client,
+                slack_channel=self.slack_channel,
+                slack_message=slack_message,
+                alert_type=alert_type,
+                thread_ts=thread_ts,
+            )
+        except SlackApiError as e:
+            self.failures += 1
+            log.error(
+                {"status": "ERROR", "message": f"Error sending Slack Notification: {e}"}
+            )
+            return None
@@ -0,0 +1,212 @@
+"""
+File System Handler Timestream Module
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from queue import Empty, Full, Queue
+from typing import List
+
+import botocore
+
+log = logging.getLogger(__name__)
+
+# Maximum number of records accepted by a single WriteRecords request
+TIMESTREAM_BATCH_SIZE = 100
+
+
+class FileSystemHandlerTimestream:
+    """
+    Class to write Timestream records from a background thread. Records are
+    buffered and written in batches with a single client, and spilled to a local
+    file while Timestream is unreachable so they can be written later.
+    """
+
+    def __init__(
+        self,
+        boto3_session,
+        timestream_db: str,
+        timestream_table: str,
+        flush_interval: float = 5.0,
+        spill_path: str = "logs/fswatcher_timestream_spill.jsonl",
+        max_buffer: int = 10000,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # One client for the lifetime of the sink
+        self.client = boto3_session.client("timestream-write")
+        self.timestream_db = timestream_db
+        self.timestream_table = timestream_table
+
+        # Number of batches that could not be written
+        self.failures = 0
+
+        # Seconds a record may wait before its batch is written
+        self.flush_interval = flush_interval
+
+        # File the records are spilled to while Timestream is unreachable
+        self.spill_path = spill_path
+        self.spill_lock = threading.Lock()
+
+        self.records: Queue = Queue(maxsize=max_buffer)
+        self.thread = threading.Thread(
+            target=self._run, name="fswatcher-timestream", daemon=True
+        )
+        self.thread.start()
+
+    def log(self, record: dict) -> None:
+        """
+        Function to buffer a record, never blocks the caller
+        """
+
+        try:
+            self.records.put_nowait(record)
+        except Full:
+            self._spill([record])
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Function to write the buffered records and stop the background thread
+        """
+
+        try:
+            self.records.put(None, timeout=timeout)
+        except Full:
+            log.warning("Timestream record queue is still full, stopping without it")
+        self.thread.join(timeout)
+
+        # Spill the records the thread could not write so they are written on the next start
+        if not self.thread.is_alive():
+            records = []
+            while True:
+                try:
+                    record = self.records.get_nowait()
+                except Empty:
+                    break
+                if record is not None:
+                    records.append(record)
+            self._spill(records)
+
+    def _run(self) -> None:
+        """
+        Background loop, writes a batch once it is full or the flush interval passed
+        """
+
+        stopped = False
+        while not stopped:
+            batch: List[dict] = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < TIMESTREAM_BATCH_SIZE:
+                try:
+                    record = self.records.get(
+                        timeout=max(0, deadline - time.monotonic())
+                    )
+                except Empty:
+                    break
+
+                if record is None:
+                    stopped = True
+                    break
+
+                batch.append(record)
+
+            # Keep the thread alive whatever fails, the queue would fill up without it
+            try:
+                if batch and self._write(batch):
+                    self._replay_spill()
+            except Exception as e:
+                self.failures += 1
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Error writing Timestream records: {e}",
+                    }
+                )
+
+    def _write(self, records: List[dict]) -> bool:
+        """
+        Function to write a batch of records, returns False if it had to be spilled
+        """
+
+        try:
+            self.client.write_records(
+                DatabaseName=self.timestream_db,
+                TableName=self.timestream_table,
+                Records=records,
+            )
+            log.debug(f"Logged {len(records)} events to Timestream")
+            return True
+
+        except botocore.exceptions.ClientError as e:
+            # Rejected records will never be accepted, don't keep them around
+            if e.response["Error"]["Code"] == "RejectedRecordsException":
+                log.error(
+                    {
+                        "status": "ERROR",
+                        "message": f"Timestream rejected records: {e.response.get('RejectedRecords')}",
+                    }
+                )
+                return True
+
+            log.error(
+                {"status": "ERROR", "message": f"Error logging to Timestream: {e}"}
+            )
+
+        except botocore.exceptions.BotoCoreError as e:
+            log.error(
+                {"status": "ERROR", "message": f"Error logging to Timestream: {e}"}
+            )
+
+        self.failures += 1
+        self._spill(records)
+        return False
+
+    def _spill(self, records: List[dict]) -> None:
+        """
+        Function to append records to the spill file
+        """
+
+        if not records:
+            return
+
+        directory = os.path.dirname(self.spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.spill_lock:
+            with open(self.spill_path, "a") as spill_file:
+                for record in records:
+                    spill_file.write(json.dumps(record) + "\n")
+
+        log.warning(f"Spilled {len(records)} Timestream records to {self.spill_path}")
+
+    def _replay_spill(self) -> None:
+        """
+        Function to write the spilled records once Timestream is reachable again
+        """
+
+        if not os.path.exists(self.spill_path):
+            return
+
+        # Move the spill file aside so records spilled while replaying aren't lost
+        with self.spill_lock:
+            replay_path = f"{self.spill_path}.replay"
+            os.replace(self.spill_path, replay_path)
+
+        with open(replay_path) as replay_file:
+            records = [json.loads(line) for line in replay_file if line.strip()]
+        os.remove(replay_path)
+
+        log.info(f"Writing {len(records)} spilled Timestream records")
+
+        for index in range(0, len(records), TIMESTREAM_BATCH_SIZE):
+            # Spill whatever is left if Timestream fails again
+            if not self._write(records[index : index + TIMESTREAM_BATCH_SIZE]):
+                self._spill(records[index + TIMESTREAM_BATCH_SIZE :])
+                return
@@ -0,0 +1,161 @@
+"""
+File System Handler Walker Module
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
+from typing import Iterator, Optional, Tuple
+
+from fswatcher.FileSystemHandlerFilter import FileSystemHandlerFilter
+from fswatcher.FileSystemHandlerRouter import FileSystemHandlerRouter
+
+log = logging.getLogger(__name__)
+
+# Marks the end of the walk in the output queue
+_DONE = object()
+
+
+class FileSystemHandlerWalker:
+    """
+    Class to walk a directory tree in parallel. Every directory is listed by a
+    thread pool worker and the files are yielded with the stat result of their
+    DirEntry as soon as they are found, so stat latency overlaps across directories.
+    Excluded directories are never listed and excluded files never stat'ed.
+    """
+
+    def __init__(
+        self,
+        workers: int = 16,
+        min_mtime: Optional[float] = None,
+        queue_size: int = 10000,
+        path_filter: Optional[FileSystemHandlerFilter] = None,
+        router: Optional[FileSystemHandlerRouter] = None,
+    ) -> None:
+        """
+        Class Constructor
+        """
+
+        # Number of threads listing directories
+        self.workers = max(1, workers)
+
+        # Only yield files modified after this timestamp
+        self.min_mtime = min_mtime
+
+        # Maximum number of found files waiting to be consumed
+        self.queue_size = queue_size
+
+        # Include and exclude patterns of the files and directories, None to walk everything
+        self.path_filter = path_filter
+
+        # Watch rules, the files no rule uploads are skipped and their directories pruned
+        self.router = router
+
+    def walk(self, path: str) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Function to yield every regular file below a path with its stat result
+        """
+
+        # The patterns match the paths relative to the walked path
+        prefix = os.path.join(path, "")
+
+        output: Queue = Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+        lock = threading.Lock()
+        pending = [1]
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="fswatcher-walk"
+        )
+
+        def put(item) -> None:
+            # Give up if the consumer went away
+            while not stopped.is_set():
+                try:
+                    output.put(item, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def scan_directory(directory: str) -> None:
+            try:
+                if stopped.is_set():
+                    return
+
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self._is_excluded_directory(entry, prefix):
+                                    continue
+                                with lock:
+                                    pending[0] += 1
+                                executor.submit(scan_directory, entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                if not self._is_included_file(entry, prefix):
+                                    continue
+                                stat = entry.stat(follow_symlinks=False)
+                                if (
+                                    self.min_mtime is None
+                                    or stat.st_mtime > self.min_mtime
+                                ):
+                                    put((entry.path, stat))
+                        except FileNotFoundError:
+                            continue
+
+            except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
+                log.debug(f"Skipping directory {directory}: {e}")
+
+            except RuntimeError:
+                # The executor was shut down because the consumer stopped
+                pass
+
+            finally:
+                with lock:
+                    pending[0] -= 1
+                    done = pending[0] == 0
+                if done:
+                    put(_DONE)
+
+        executor.submit(scan_directory, path)
+
+        try:
+            while True:
+                item = output.get()
+
+                if item is _DONE:
+                    return
+
+                yield item
+
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False)
+
+    def _is_excluded_directory(self, entry: os.DirEntry, prefix: str) -> bool:
+        """
+        Function to check if a directory is pruned by the patterns or the watch rules
+        """
+
+        if self.path_filter is not None and self.path_filter.is_excluded_directory(
+            entry.path[len(prefix) :], entry.name
+        ):
+            return True
+
+        return self.router is not None and self.router.is_excluded_directory(
+            entry.path, entry.name
+        )
+
+    def _is_included_file(self, entry: os.DirEntry, prefix: str) -> bool:
+        """
+        Function to check if a file is included by the patterns and a watch rule
+        """
+
+        if self.path_filter is not None and not self.path_filter.is_included_file(
+            entry.path[len(prefix) :], entry.name
+        ):
+            return False
+
+        return self.router is None or self.router.get_route(entry.path) is not None
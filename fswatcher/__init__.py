@@ -1,8 +1,11 @@
 import os
+import base64
+import hashlib
 import logging
 import time
 from datetime import datetime
 from typing import Optional
+import botocore
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from fswatcher.FileSystemHandlerConfig import get_config
@@ -56,6 +59,52 @@ def is_file_manifest(file_name: str) -> bool:
     return base_name.startswith("file_manifest")
 
 
+def get_file_checksum(file_path: str, chunk_size: int = 1024**2) -> str:
+    """
+    Function to compute the base64 encoded SHA256 checksum of a file in a streaming pass
+    """
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    # S3 checksums are the base64 encoded digest
+    return base64.b64encode(digest.digest()).decode()
+
+
+def get_file_etag(
+    file_path: str, part_size: Optional[int] = None, chunk_size: int = 1024**2
+) -> str:
+    """
+    Function to compute the S3 ETag of a file uploaded in a single request, or in parts of part_size bytes
+    """
+
+    size = os.path.getsize(file_path)
+
+    digests = []
+    with open(file_path, "rb") as file:
+        for offset in range(0, max(size, 1), part_size or max(size, 1)):
+            digest = hashlib.md5()
+            remaining = (
+                size - offset if part_size is None else min(part_size, size - offset)
+            )
+            while remaining > 0:
+                chunk = file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+            digests.append(digest)
+
+    if part_size is None:
+        return digests[0].hexdigest()
+
+    # Multipart ETags are the MD5 of the part MD5s and the number of parts
+    combined = hashlib.md5(b"".join(digest.digest() for digest in digests))
+    return f"{combined.hexdigest()}-{len(digests)}"
+
+
 def generate_file_pipeline_message(
     file_path: str, alert_type: Optional[str] = None
 ) -> str:
@@ -115,6 +164,19 @@ def get_slack_client(slack_token: str) -> WebClient:
     return slack_client
 
 
+def get_retry_after(response) -> int:
+    """
+    Function to get the seconds to wait from the Retry-After header of a rate limited Slack response
+    """
+
+    for header, value in response.headers.items():
+        if header.lower() == "retry-after":
+            value = value[0] if isinstance(value, list) else value
+            return int(value)
+
+    return 1
+
+
 def send_slack_notification(
     slack_client: WebClient,
     slack_channel: str,
@@ -123,7 +185,11 @@ def send_slack_notification(
     slack_max_retries: int = 5,
     slack_retry_delay: int = 5,
     thread_ts: Optional[str] = None,
-) -> bool:
+) -> Optional[str]:
+    """
+    Function to send a Slack notification and return the ts of the message,
+    rate limited requests are retried after the Retry-After delay given by Slack
+    """
     log.debug(f"Sending Slack Notification to {slack_channel}")
     color = {
         "success": "#2ecc71",
@@ -181,7 +247,7 @@ def send_slack_notification(
 
     for i in range(slack_max_retries):
         try:
-            slack_client.chat_postMessage(
+            response = slack_client.chat_postMessage(
                 channel=slack_channel,
                 text=text,
                 pretext=pretext,
@@ -191,17 +257,22 @@ def send_slack_notification(
 
             log.debug(f"Slack Notification Successfully Sent to {slack_channel}")
 
-            return True
+            return response.get("ts")
 
         except SlackApiError as e:
             if (
                 i < slack_max_retries - 1
             ):  # If it's not the last attempt, wait and try again
+                # Wait as long as Slack asks to when rate limited
+                retry_delay = slack_retry_delay
+                if e.response.status_code == 429:
+                    retry_delay = get_retry_after(e.response)
+
                 log.warning(
                     f"Error sending Slack Notification (attempt {i + 1}): {e}."
-                    f"Retrying in {slack_retry_delay} seconds..."
+                    f"Retrying in {retry_delay} seconds..."
                 )
-                time.sleep(slack_retry_delay)
+                time.sleep(retry_delay)
             else:  # If it's the last attempt, log the error and exit the loop
                 log.error(
                     {
@@ -230,6 +301,47 @@ def get_message_ts(
         return None
 
 
+def generate_timestream_record(
+    action_type,
+    file_key,
+    new_file_key=None,
+    source_bucket=None,
+    destination_bucket=None,
+) -> dict:
+    """
+    Function to generate a Timestream record for a file event
+    """
+    if not source_bucket and not destination_bucket:
+        raise ValueError("A Source or Destination Buckets is required")
+
+    return {
+        "Time": str(int(time.time() * 1000)),
+        "Dimensions": [
+            {"Name": "action_type", "Value": action_type},
+            {
+                "Name": "source_bucket",
+                "Value": source_bucket or "N/A",
+            },
+            {
+                "Name": "destination_bucket",
+                "Value": destination_bucket or "N/A",
+            },
+            {"Name": "file_key", "Value": file_key},
+            {
+                "Name": "new_file_key",
+                "Value": new_file_key or "N/A",
+            },
+            {
+                "Name": "current file count",
+                "Value": "N/A",
+            },
+        ],
+        "MeasureName": "timestamp",
+        "MeasureValue": str(datetime.utcnow().timestamp()),
+        "MeasureValueType": "DOUBLE",
+    }
+
+
 def timestream_log(
     boto3_session,
     action_type,
@@ -244,14 +356,10 @@ def timestream_log(
     Function to Log to Timestream
     """
     log.debug(f"Object ({new_file_key}) - Logging Event to Timestream")
-    CURRENT_TIME = str(int(time.time() * 1000))
     try:
         # Initialize Timestream Client
         timestream = boto3_session.client("timestream-write")
 
-        if not source_bucket and not destination_bucket:
-            raise ValueError("A Source or Destination Buckets is required")
-
         # Write to Timestream
         timestream.write_records(
             DatabaseName=timestream_db if timestream_db else "sdc_aws_logs",
@@ -259,32 +367,13 @@ def timestream_log(
             if timestream_table
             else "sdc_aws_s3_bucket_log_table",
             Records=[
-                {
-                    "Time": CURRENT_TIME,
-                    "Dimensions": [
-                        {"Name": "action_type", "Value": action_type},
-                        {
-                            "Name": "source_bucket",
-                            "Value": source_bucket or "N/A",
-                        },
-                        {
-                            "Name": "destination_bucket",
-                            "Value": destination_bucket or "N/A",
-                        },
-                        {"Name": "file_key", "Value": file_key},
-                        {
-                            "Name": "new_file_key",
-                            "Value": new_file_key or "N/A",
-                        },
-                        {
-                            "Name": "current file count",
-                            "Value": "N/A",
-                        },
-                    ],
-                    "MeasureName": "timestamp",
-                    "MeasureValue": str(datetime.utcnow().timestamp()),
-                    "MeasureValueType": "DOUBLE",
-                },
+                generate_timestream_record(
+                    action_type=action_type,
+                    file_key=file_key,
+                    new_file_key=new_file_key,
+                    source_bucket=source_bucket,
+                    destination_bucket=destination_bucket,
+                ),
             ],
         )
 
@@ -6,6 +6,32 @@ import time
 from watchdog.observers import Observer
 from fswatcher import config, log
 from fswatcher.FileSystemHandler import FileSystemHandler
+from fswatcher.FileSystemHandlerDeadLetterQueue import FileSystemHandlerDeadLetterQueue
+
+
+# Dead Letter Queue Command
+def dead_letter_queue_command() -> None:
+    """
+    Dead Letter Queue Command, lists or replays the failed uploads
+    """
+
+    if config.dead_letter_queue_action == "inspect":
+        dead_letter_queue = FileSystemHandlerDeadLetterQueue(
+            dead_letter_queue_path=config.dead_letter_queue_path
+        )
+        entries = dead_letter_queue.get_entries()
+        for entry in entries:
+            log.info(
+                f"Object ({entry['file_key']}) - Bucket: {entry['bucket_name']}, Path: {entry['src_path']}, "
+                f"Attempts: {entry['attempts']}, Next Attempt: {time.ctime(entry['next_attempt'])}, Error: {entry['last_error']}"
+            )
+        log.info(f"{len(entries)} failed uploads in the dead letter queue")
+        dead_letter_queue.close()
+
+    elif config.dead_letter_queue_action == "replay":
+        event_handler = FileSystemHandler(config=config)
+        event_handler.replay_dead_letter_queue()
+        event_handler.stop()
 
 
 # Main Function
@@ -14,8 +40,14 @@ def main() -> None:
     Main Function
     """
 
-    # Initialize the FileSystemHandler
+    # Run the dead letter queue command instead of watching if one was given
+    if config.dead_letter_queue_action:
+        dead_letter_queue_command()
+        sys.exit(0)
+
+    # Initialize the FileSystemHandler and retry the failed uploads in the background
     event_handler = FileSystemHandler(config=config)
+    event_handler.start_dead_letter_retrier()
 
     if config.use_fallback == True:
         event_handler.fallback_directory_watcher()
@@ -25,8 +57,11 @@ def main() -> None:
     try:
         # Initialize the Observer and start watching
         log.info("Starting observer")
+        # A single observer watches the roots of every watch rule
         observer = Observer()
-        observer.schedule(event_handler, config.path, recursive=True)
+        roots = event_handler.router.get_roots()
+        for root in roots:
+            observer.schedule(event_handler, root, recursive=True)
 
         observer.start()
         # If backtrack is enabled, run the initial scan
@@ -34,12 +69,15 @@ def main() -> None:
             log.info(
                 "Backtracking enabled, backtracking (This might take awhile if a large amount of directories and files)..."
             )
-            event_handler.backtrack(
-                config.path, event_handler.parse_datetime(config.backtrack_date)
-            )
+            for root in roots:
+                event_handler.backtrack(
+                    root, event_handler.parse_datetime(config.backtrack_date)
+                )
             log.info("Backtracking complete")
             config.backtrack = False
-        log.info(f"Watching for file events with INotify Observer in: {config.path}")
+        log.info(
+            f"Watching for file events with INotify Observer in: {', '.join(roots)}"
+        )
 
     except OSError:
         # If inotify fails, use the polling observer
@@ -55,6 +93,7 @@ def main() -> None:
     finally:
         observer.stop()
         observer.join()
+        event_handler.stop()
 
 
 # Main Function
@@ -76,6 +76,46 @@ unset SDC_AWS_BACKTRACK_DATE
 unset SDC_AWS_USE_FALLBACK
 unset SDC_AWS_CHECK_S3
 unset SDC_AWS_PROFILE
+unset SDC_AWS_UPLOAD_WORKERS
+unset SDC_AWS_QUEUE_SIZE
+unset SDC_AWS_QUIET_PERIOD
+unset SDC_AWS_USE_LEDGER
+unset SDC_AWS_PRUNE_SCAN
+unset SDC_AWS_DEEP_SCAN_INTERVAL
+unset SDC_AWS_WALK_WORKERS
+unset SDC_AWS_BACKTRACK_WINDOW
+unset SDC_AWS_SLACK_DIGEST_INTERVAL
+unset SDC_AWS_SLACK_DIGEST_SIZE
+unset SDC_AWS_MULTIPART_THRESHOLD
+unset SDC_AWS_MULTIPART_CHUNKSIZE
+unset SDC_AWS_TRANSFER_THREADS
+unset SDC_AWS_MAX_IO_QUEUE
+unset SDC_AWS_AUTO_TRANSFER_TUNING
+unset SDC_AWS_ADAPTIVE_CONCURRENCY
+unset SDC_AWS_MIN_CONCURRENCY
+unset SDC_AWS_MAX_CONCURRENCY
+unset SDC_AWS_BUNDLE_SMALL_FILES
+unset SDC_AWS_BUNDLE_SIZE_THRESHOLD
+unset SDC_AWS_BUNDLE_WINDOW
+unset SDC_AWS_BUNDLE_MAX_FILES
+unset SDC_AWS_CONTENT_HASH
+unset SDC_AWS_ZERO_COPY
+unset SDC_AWS_METRICS_PORT
+unset SDC_AWS_ENDPOINT_URL
+unset SDC_AWS_TRIGGER_MODE
+unset SDC_AWS_CLOSE_TIMEOUT
+unset SDC_AWS_PRIORITY_LANES
+unset SDC_AWS_EXPRESS_WORKERS
+unset SDC_AWS_BULK_WORKERS
+unset SDC_AWS_EXPRESS_MAX_SIZE
+unset SDC_AWS_BULK_MIN_SIZE
+unset SDC_AWS_EXPRESS_PATTERNS
+unset SDC_AWS_BULK_PATTERNS
+unset SDC_AWS_RULES_FILE
+unset SDC_AWS_INCLUDE_PATTERNS
+unset SDC_AWS_EXCLUDE_PATTERNS
+unset SDC_AWS_USE_JOURNAL
+unset SDC_AWS_JOURNAL_COMMIT_INTERVAL
 
 # Docker environment variables
 SDC_AWS_S3_BUCKET="-b $S3_BUCKET_NAME"
@@ -182,6 +222,286 @@ else
     SDC_AWS_PROFILE=""
 fi
 
+# If UPLOAD_WORKERS is not "", then add it to the environment variables else make it empty
+if [ "$UPLOAD_WORKERS" != "" ]; then
+    SDC_AWS_UPLOAD_WORKERS="-uw $UPLOAD_WORKERS"
+else
+    SDC_AWS_UPLOAD_WORKERS=""
+fi
+
+# If QUEUE_SIZE is not "", then add it to the environment variables else make it empty
+if [ "$QUEUE_SIZE" != "" ]; then
+    SDC_AWS_QUEUE_SIZE="-qs $QUEUE_SIZE"
+else
+    SDC_AWS_QUEUE_SIZE=""
+fi
+
+# If QUIET_PERIOD is not "", then add it to the environment variables else make it empty
+if [ "$QUIET_PERIOD" != "" ]; then
+    SDC_AWS_QUIET_PERIOD="-qp $QUIET_PERIOD"
+else
+    SDC_AWS_QUIET_PERIOD=""
+fi
+
+# If USE_LEDGER is true, then add it to the environment variables else make it empty
+if [ "$USE_LEDGER" = true ]; then
+    SDC_AWS_USE_LEDGER="-ul"
+else
+    SDC_AWS_USE_LEDGER=""
+fi
+
+# If PRUNE_SCAN is true, then add it to the environment variables else make it empty
+if [ "$PRUNE_SCAN" = true ]; then
+    SDC_AWS_PRUNE_SCAN="-ps"
+else
+    SDC_AWS_PRUNE_SCAN=""
+fi
+
+# If DEEP_SCAN_INTERVAL is not "", then add it to the environment variables else make it empty
+if [ "$DEEP_SCAN_INTERVAL" != "" ]; then
+    SDC_AWS_DEEP_SCAN_INTERVAL="-dsi $DEEP_SCAN_INTERVAL"
+else
+    SDC_AWS_DEEP_SCAN_INTERVAL=""
+fi
+
+# If WALK_WORKERS is not "", then add it to the environment variables else make it empty
+if [ "$WALK_WORKERS" != "" ]; then
+    SDC_AWS_WALK_WORKERS="-ww $WALK_WORKERS"
+else
+    SDC_AWS_WALK_WORKERS=""
+fi
+
+# If BACKTRACK_WINDOW is not "", then add it to the environment variables else make it empty
+if [ "$BACKTRACK_WINDOW" != "" ]; then
+    SDC_AWS_BACKTRACK_WINDOW="-bw $BACKTRACK_WINDOW"
+else
+    SDC_AWS_BACKTRACK_WINDOW=""
+fi
+
+# If SLACK_DIGEST_INTERVAL is not "", then add it to the environment variables else make it empty
+if [ "$SLACK_DIGEST_INTERVAL" != "" ]; then
+    SDC_AWS_SLACK_DIGEST_INTERVAL="-sdi $SLACK_DIGEST_INTERVAL"
+else
+    SDC_AWS_SLACK_DIGEST_INTERVAL=""
+fi
+
+# If SLACK_DIGEST_SIZE is not "", then add it to the environment variables else make it empty
+if [ "$SLACK_DIGEST_SIZE" != "" ]; then
+    SDC_AWS_SLACK_DIGEST_SIZE="-sds $SLACK_DIGEST_SIZE"
+else
+    SDC_AWS_SLACK_DIGEST_SIZE=""
+fi
+
+# If MULTIPART_THRESHOLD is not "", then add it to the environment variables else make it empty
+if [ "$MULTIPART_THRESHOLD" != "" ]; then
+    SDC_AWS_MULTIPART_THRESHOLD="-mt $MULTIPART_THRESHOLD"
+else
+    SDC_AWS_MULTIPART_THRESHOLD=""
+fi
+
+# If MULTIPART_CHUNKSIZE is not "", then add it to the environment variables else make it empty
+if [ "$MULTIPART_CHUNKSIZE" != "" ]; then
+    SDC_AWS_MULTIPART_CHUNKSIZE="-mc $MULTIPART_CHUNKSIZE"
+else
+    SDC_AWS_MULTIPART_CHUNKSIZE=""
+fi
+
+# If TRANSFER_THREADS is not "", then add it to the environment variables else make it empty
+if [ "$TRANSFER_THREADS" != "" ]; then
+    SDC_AWS_TRANSFER_THREADS="-tth $TRANSFER_THREADS"
+else
+    SDC_AWS_TRANSFER_THREADS=""
+fi
+
+# If MAX_IO_QUEUE is not "", then add it to the environment variables else make it empty
+if [ "$MAX_IO_QUEUE" != "" ]; then
+    SDC_AWS_MAX_IO_QUEUE="-miq $MAX_IO_QUEUE"
+else
+    SDC_AWS_MAX_IO_QUEUE=""
+fi
+
+# If AUTO_TRANSFER_TUNING is true, then add it to the environment variables else make it empty
+if [ "$AUTO_TRANSFER_TUNING" = true ]; then
+    SDC_AWS_AUTO_TRANSFER_TUNING="-att"
+else
+    SDC_AWS_AUTO_TRANSFER_TUNING=""
+fi
+
+# If ADAPTIVE_CONCURRENCY is true, then add it to the environment variables else make it empty
+if [ "$ADAPTIVE_CONCURRENCY" = true ]; then
+    SDC_AWS_ADAPTIVE_CONCURRENCY="-ac"
+else
+    SDC_AWS_ADAPTIVE_CONCURRENCY=""
+fi
+
+# If MIN_CONCURRENCY is not "", then add it to the environment variables else make it empty
+if [ "$MIN_CONCURRENCY" != "" ]; then
+    SDC_AWS_MIN_CONCURRENCY="-mnc $MIN_CONCURRENCY"
+else
+    SDC_AWS_MIN_CONCURRENCY=""
+fi
+
+# If MAX_CONCURRENCY is not "", then add it to the environment variables else make it empty
+if [ "$MAX_CONCURRENCY" != "" ]; then
+    SDC_AWS_MAX_CONCURRENCY="-mxc $MAX_CONCURRENCY"
+else
+    SDC_AWS_MAX_CONCURRENCY=""
+fi
+
+# If BUNDLE_SMALL_FILES is true, then add it to the environment variables else make it empty
+if [ "$BUNDLE_SMALL_FILES" = true ]; then
+    SDC_AWS_BUNDLE_SMALL_FILES="-bsf"
+else
+    SDC_AWS_BUNDLE_SMALL_FILES=""
+fi
+
+# If BUNDLE_SIZE_THRESHOLD is not "", then add it to the environment variables else make it empty
+if [ "$BUNDLE_SIZE_THRESHOLD" != "" ]; then
+    SDC_AWS_BUNDLE_SIZE_THRESHOLD="-bst $BUNDLE_SIZE_THRESHOLD"
+else
+    SDC_AWS_BUNDLE_SIZE_THRESHOLD=""
+fi
+
+# If BUNDLE_WINDOW is not "", then add it to the environment variables else make it empty
+if [ "$BUNDLE_WINDOW" != "" ]; then
+    SDC_AWS_BUNDLE_WINDOW="-bwi $BUNDLE_WINDOW"
+else
+    SDC_AWS_BUNDLE_WINDOW=""
+fi
+
+# If BUNDLE_MAX_FILES is not "", then add it to the environment variables else make it empty
+if [ "$BUNDLE_MAX_FILES" != "" ]; then
+    SDC_AWS_BUNDLE_MAX_FILES="-bmf $BUNDLE_MAX_FILES"
+else
+    SDC_AWS_BUNDLE_MAX_FILES=""
+fi
+
+# If CONTENT_HASH is true, then add it to the environment variables else make it empty
+if [ "$CONTENT_HASH" = true ]; then
+    SDC_AWS_CONTENT_HASH="-ch"
+else
+    SDC_AWS_CONTENT_HASH=""
+fi
+
+# If ZERO_COPY is true, then add it to the environment variables else make it empty
+if [ "$ZERO_COPY" = true ]; then
+    SDC_AWS_ZERO_COPY="-zc"
+else
+    SDC_AWS_ZERO_COPY=""
+fi
+
+# If METRICS_PORT is not "", then add it to the environment variables else make it empty
+if [ "$METRICS_PORT" != "" ]; then
+    SDC_AWS_METRICS_PORT="-mp $METRICS_PORT"
+else
+    SDC_AWS_METRICS_PORT=""
+fi
+
+# If ENDPOINT_URL is not "", then add it to the environment variables else make it empty
+if [ "$ENDPOINT_URL" != "" ]; then
+    SDC_AWS_ENDPOINT_URL="-eu $ENDPOINT_URL"
+else
+    SDC_AWS_ENDPOINT_URL=""
+fi
+
+# If TRIGGER_MODE is not "", then add it to the environment variables else make it empty
+if [ "$TRIGGER_MODE" != "" ]; then
+    SDC_AWS_TRIGGER_MODE="-tm $TRIGGER_MODE"
+else
+    SDC_AWS_TRIGGER_MODE=""
+fi
+
+# If CLOSE_TIMEOUT is not "", then add it to the environment variables else make it empty
+if [ "$CLOSE_TIMEOUT" != "" ]; then
+    SDC_AWS_CLOSE_TIMEOUT="-ct $CLOSE_TIMEOUT"
+else
+    SDC_AWS_CLOSE_TIMEOUT=""
+fi
+
+# If PRIORITY_LANES is true, then add it to the environment variables else make it empty
+if [ "$PRIORITY_LANES" = true ]; then
+    SDC_AWS_PRIORITY_LANES="-pl"
+else
+    SDC_AWS_PRIORITY_LANES=""
+fi
+
+# If EXPRESS_WORKERS is not "", then add it to the environment variables else make it empty
+if [ "$EXPRESS_WORKERS" != "" ]; then
+    SDC_AWS_EXPRESS_WORKERS="-ew $EXPRESS_WORKERS"
+else
+    SDC_AWS_EXPRESS_WORKERS=""
+fi
+
+# If BULK_WORKERS is not "", then add it to the environment variables else make it empty
+if [ "$BULK_WORKERS" != "" ]; then
+    SDC_AWS_BULK_WORKERS="-bkw $BULK_WORKERS"
+else
+    SDC_AWS_BULK_WORKERS=""
+fi
+
+# If EXPRESS_MAX_SIZE is not "", then add it to the environment variables else make it empty
+if [ "$EXPRESS_MAX_SIZE" != "" ]; then
+    SDC_AWS_EXPRESS_MAX_SIZE="-ems $EXPRESS_MAX_SIZE"
+else
+    SDC_AWS_EXPRESS_MAX_SIZE=""
+fi
+
+# If BULK_MIN_SIZE is not "", then add it to the environment variables else make it empty
+if [ "$BULK_MIN_SIZE" != "" ]; then
+    SDC_AWS_BULK_MIN_SIZE="-bms $BULK_MIN_SIZE"
+else
+    SDC_AWS_BULK_MIN_SIZE=""
+fi
+
+# If EXPRESS_PATTERNS is not "", then add it to the environment variables else make it empty
+if [ "$EXPRESS_PATTERNS" != "" ]; then
+    SDC_AWS_EXPRESS_PATTERNS="-ep $EXPRESS_PATTERNS"
+else
+    SDC_AWS_EXPRESS_PATTERNS=""
+fi
+
+# If BULK_PATTERNS is not "", then add it to the environment variables else make it empty
+if [ "$BULK_PATTERNS" != "" ]; then
+    SDC_AWS_BULK_PATTERNS="-bp $BULK_PATTERNS"
+else
+    SDC_AWS_BULK_PATTERNS=""
+fi
+
+# If RULES_FILE is not "", then add it to the environment variables else make it empty
+if [ "$RULES_FILE" != "" ]; then
+    SDC_AWS_RULES_FILE="-rf $RULES_FILE"
+else
+    SDC_AWS_RULES_FILE=""
+fi
+
+# If INCLUDE_PATTERNS is not "", then add it to the environment variables else make it empty
+if [ "$INCLUDE_PATTERNS" != "" ]; then
+    SDC_AWS_INCLUDE_PATTERNS="-ip $INCLUDE_PATTERNS"
+else
+    SDC_AWS_INCLUDE_PATTERNS=""
+fi
+
+# If EXCLUDE_PATTERNS is not "", then add it to the environment variables else make it empty
+if [ "$EXCLUDE_PATTERNS" != "" ]; then
+    SDC_AWS_EXCLUDE_PATTERNS="-xp $EXCLUDE_PATTERNS"
+else
+    SDC_AWS_EXCLUDE_PATTERNS=""
+fi
+
+# If USE_JOURNAL is true, then add it to the environment variables else make it empty
+if [ "$USE_JOURNAL" = true ]; then
+    SDC_AWS_USE_JOURNAL="-uj"
+else
+    SDC_AWS_USE_JOURNAL=""
+fi
+
+# If JOURNAL_COMMIT_INTERVAL is not "", then add it to the environment variables else make it empty
+if [ "$JOURNAL_COMMIT_INTERVAL" != "" ]; then
+    SDC_AWS_JOURNAL_COMMIT_INTERVAL="-jci $JOURNAL_COMMIT_INTERVAL"
+else
+    SDC_AWS_JOURNAL_COMMIT_INTERVAL=""
+fi
+
 # Print all the environment variables
 echo "Passed Arguments:"
 echo "SDC_AWS_S3_BUCKET: $SDC_AWS_S3_BUCKET"
@@ -200,6 +520,46 @@ echo "SDC_AWS_BACKTRACK_DATE: $SDC_AWS_BACKTRACK_DATE"
 echo "SDC_AWS_USE_FALLBACK: $SDC_AWS_USE_FALLBACK"
 echo "SDC_AWS_CHECK_S3: $SDC_AWS_CHECK_S3"
 echo "SDC_AWS_PROFILE: $SDC_AWS_PROFILE"
+echo "SDC_AWS_UPLOAD_WORKERS: $SDC_AWS_UPLOAD_WORKERS"
+echo "SDC_AWS_QUEUE_SIZE: $SDC_AWS_QUEUE_SIZE"
+echo "SDC_AWS_QUIET_PERIOD: $SDC_AWS_QUIET_PERIOD"
+echo "SDC_AWS_USE_LEDGER: $SDC_AWS_USE_LEDGER"
+echo "SDC_AWS_PRUNE_SCAN: $SDC_AWS_PRUNE_SCAN"
+echo "SDC_AWS_DEEP_SCAN_INTERVAL: $SDC_AWS_DEEP_SCAN_INTERVAL"
+echo "SDC_AWS_WALK_WORKERS: $SDC_AWS_WALK_WORKERS"
+echo "SDC_AWS_BACKTRACK_WINDOW: $SDC_AWS_BACKTRACK_WINDOW"
+echo "SDC_AWS_SLACK_DIGEST_INTERVAL: $SDC_AWS_SLACK_DIGEST_INTERVAL"
+echo "SDC_AWS_SLACK_DIGEST_SIZE: $SDC_AWS_SLACK_DIGEST_SIZE"
+echo "SDC_AWS_MULTIPART_THRESHOLD: $SDC_AWS_MULTIPART_THRESHOLD"
+echo "SDC_AWS_MULTIPART_CHUNKSIZE: $SDC_AWS_MULTIPART_CHUNKSIZE"
+echo "SDC_AWS_TRANSFER_THREADS: $SDC_AWS_TRANSFER_THREADS"
+echo "SDC_AWS_MAX_IO_QUEUE: $SDC_AWS_MAX_IO_QUEUE"
+echo "SDC_AWS_AUTO_TRANSFER_TUNING: $SDC_AWS_AUTO_TRANSFER_TUNING"
+echo "SDC_AWS_ADAPTIVE_CONCURRENCY: $SDC_AWS_ADAPTIVE_CONCURRENCY"
+echo "SDC_AWS_MIN_CONCURRENCY: $SDC_AWS_MIN_CONCURRENCY"
+echo "SDC_AWS_MAX_CONCURRENCY: $SDC_AWS_MAX_CONCURRENCY"
+echo "SDC_AWS_BUNDLE_SMALL_FILES: $SDC_AWS_BUNDLE_SMALL_FILES"
+echo "SDC_AWS_BUNDLE_SIZE_THRESHOLD: $SDC_AWS_BUNDLE_SIZE_THRESHOLD"
+echo "SDC_AWS_BUNDLE_WINDOW: $SDC_AWS_BUNDLE_WINDOW"
+echo "SDC_AWS_BUNDLE_MAX_FILES: $SDC_AWS_BUNDLE_MAX_FILES"
+echo "SDC_AWS_CONTENT_HASH: $SDC_AWS_CONTENT_HASH"
+echo "SDC_AWS_ZERO_COPY: $SDC_AWS_ZERO_COPY"
+echo "SDC_AWS_METRICS_PORT: $SDC_AWS_METRICS_PORT"
+echo "SDC_AWS_ENDPOINT_URL: $SDC_AWS_ENDPOINT_URL"
+echo "SDC_AWS_TRIGGER_MODE: $SDC_AWS_TRIGGER_MODE"
+echo "SDC_AWS_CLOSE_TIMEOUT: $SDC_AWS_CLOSE_TIMEOUT"
+echo "SDC_AWS_PRIORITY_LANES: $SDC_AWS_PRIORITY_LANES"
+echo "SDC_AWS_EXPRESS_WORKERS: $SDC_AWS_EXPRESS_WORKERS"
+echo "SDC_AWS_BULK_WORKERS: $SDC_AWS_BULK_WORKERS"
+echo "SDC_AWS_EXPRESS_MAX_SIZE: $SDC_AWS_EXPRESS_MAX_SIZE"
+echo "SDC_AWS_BULK_MIN_SIZE: $SDC_AWS_BULK_MIN_SIZE"
+echo "SDC_AWS_EXPRESS_PATTERNS: $SDC_AWS_EXPRESS_PATTERNS"
+echo "SDC_AWS_BULK_PATTERNS: $SDC_AWS_BULK_PATTERNS"
+echo "SDC_AWS_RULES_FILE: $SDC_AWS_RULES_FILE"
+echo "SDC_AWS_INCLUDE_PATTERNS: $SDC_AWS_INCLUDE_PATTERNS"
+echo "SDC_AWS_EXCLUDE_PATTERNS: $SDC_AWS_EXCLUDE_PATTERNS"
+echo "SDC_AWS_USE_JOURNAL: $SDC_AWS_USE_JOURNAL"
+echo "SDC_AWS_JOURNAL_COMMIT_INTERVAL: $SDC_AWS_JOURNAL_COMMIT_INTERVAL"
 
 # Run the docker container in detached mode
 docker run -d \
@@ -221,6 +581,46 @@ docker run -d \
     -e SDC_AWS_TEST_IAM_POLICY="$SDC_AWS_TEST_IAM_POLICY" \
     -e SDC_AWS_USE_FALLBACK="$SDC_AWS_USE_FALLBACK" \
     -e SDC_AWS_PROFILE="$SDC_AWS_PROFILE" \
+    -e SDC_AWS_UPLOAD_WORKERS="$SDC_AWS_UPLOAD_WORKERS" \
+    -e SDC_AWS_QUEUE_SIZE="$SDC_AWS_QUEUE_SIZE" \
+    -e SDC_AWS_QUIET_PERIOD="$SDC_AWS_QUIET_PERIOD" \
+    -e SDC_AWS_USE_LEDGER="$SDC_AWS_USE_LEDGER" \
+    -e SDC_AWS_PRUNE_SCAN="$SDC_AWS_PRUNE_SCAN" \
+    -e SDC_AWS_DEEP_SCAN_INTERVAL="$SDC_AWS_DEEP_SCAN_INTERVAL" \
+    -e SDC_AWS_WALK_WORKERS="$SDC_AWS_WALK_WORKERS" \
+    -e SDC_AWS_BACKTRACK_WINDOW="$SDC_AWS_BACKTRACK_WINDOW" \
+    -e SDC_AWS_SLACK_DIGEST_INTERVAL="$SDC_AWS_SLACK_DIGEST_INTERVAL" \
+    -e SDC_AWS_SLACK_DIGEST_SIZE="$SDC_AWS_SLACK_DIGEST_SIZE" \
+    -e SDC_AWS_MULTIPART_THRESHOLD="$SDC_AWS_MULTIPART_THRESHOLD" \
+    -e SDC_AWS_MULTIPART_CHUNKSIZE="$SDC_AWS_MULTIPART_CHUNKSIZE" \
+    -e SDC_AWS_TRANSFER_THREADS="$SDC_AWS_TRANSFER_THREADS" \
+    -e SDC_AWS_MAX_IO_QUEUE="$SDC_AWS_MAX_IO_QUEUE" \
+    -e SDC_AWS_AUTO_TRANSFER_TUNING="$SDC_AWS_AUTO_TRANSFER_TUNING" \
+    -e SDC_AWS_ADAPTIVE_CONCURRENCY="$SDC_AWS_ADAPTIVE_CONCURRENCY" \
+    -e SDC_AWS_MIN_CONCURRENCY="$SDC_AWS_MIN_CONCURRENCY" \
+    -e SDC_AWS_MAX_CONCURRENCY="$SDC_AWS_MAX_CONCURRENCY" \
+    -e SDC_AWS_BUNDLE_SMALL_FILES="$SDC_AWS_BUNDLE_SMALL_FILES" \
+    -e SDC_AWS_BUNDLE_SIZE_THRESHOLD="$SDC_AWS_BUNDLE_SIZE_THRESHOLD" \
+    -e SDC_AWS_BUNDLE_WINDOW="$SDC_AWS_BUNDLE_WINDOW" \
+    -e SDC_AWS_BUNDLE_MAX_FILES="$SDC_AWS_BUNDLE_MAX_FILES" \
+    -e SDC_AWS_CONTENT_HASH="$SDC_AWS_CONTENT_HASH" \
+    -e SDC_AWS_ZERO_COPY="$SDC_AWS_ZERO_COPY" \
+    -e SDC_AWS_METRICS_PORT="$SDC_AWS_METRICS_PORT" \
+    -e SDC_AWS_ENDPOINT_URL="$SDC_AWS_ENDPOINT_URL" \
+    -e SDC_AWS_TRIGGER_MODE="$SDC_AWS_TRIGGER_MODE" \
+    -e SDC_AWS_CLOSE_TIMEOUT="$SDC_AWS_CLOSE_TIMEOUT" \
+    -e SDC_AWS_PRIORITY_LANES="$SDC_AWS_PRIORITY_LANES" \
+    -e SDC_AWS_EXPRESS_WORKERS="$SDC_AWS_EXPRESS_WORKERS" \
+    -e SDC_AWS_BULK_WORKERS="$SDC_AWS_BULK_WORKERS" \
+    -e SDC_AWS_EXPRESS_MAX_SIZE="$SDC_AWS_EXPRESS_MAX_SIZE" \
+    -e SDC_AWS_BULK_MIN_SIZE="$SDC_AWS_BULK_MIN_SIZE" \
+    -e SDC_AWS_EXPRESS_PATTERNS="$SDC_AWS_EXPRESS_PATTERNS" \
+    -e SDC_AWS_BULK_PATTERNS="$SDC_AWS_BULK_PATTERNS" \
+    -e SDC_AWS_RULES_FILE="$SDC_AWS_RULES_FILE" \
+    -e SDC_AWS_INCLUDE_PATTERNS="$SDC_AWS_INCLUDE_PATTERNS" \
+    -e SDC_AWS_EXCLUDE_PATTERNS="$SDC_AWS_EXCLUDE_PATTERNS" \
+    -e SDC_AWS_USE_JOURNAL="$SDC_AWS_USE_JOURNAL" \
+    -e SDC_AWS_JOURNAL_COMMIT_INTERVAL="$SDC_AWS_JOURNAL_COMMIT_INTERVAL" \
     -e AWS_SESSION_TOKEN="$AWS_SESSION_TOKEN" \
     -v /etc/passwd:/etc/passwd \
     -v $WATCH_DIR:/watch \
@@ -0,0 +1,121 @@
+"""
+Shared fixtures of the fswatcher tests
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# The fswatcher package parses the command line when it is imported
+sys.argv = ["fswatcher", "-d", os.getcwd(), "-b", "test-bucket"]
+
+# moto needs credentials to sign the requests it intercepts
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+from moto import mock_aws
+from watchdog.events import FileCreatedEvent, FileSystemEvent
+
+from fswatcher.FileSystemHandler import FileSystemHandler
+from fswatcher.FileSystemHandlerConfig import FileSystemHandlerConfig
+from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
+
+BUCKET = "test-bucket"
+
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    """
+    Function to poll a condition until it holds or the timeout passes
+    """
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+
+    return condition()
+
+
+@pytest.fixture
+def s3():
+    """
+    Mocked S3 with the test bucket
+    """
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def watch_dir(tmp_path):
+    """
+    Directory watched by the handler
+    """
+
+    path = tmp_path / "watch"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def make_handler(tmp_path, watch_dir, s3):
+    """
+    Factory of handlers uploading the watch directory to the mocked bucket
+    """
+
+    handlers = []
+
+    def make(**options) -> FileSystemHandler:
+        settings = {
+            "path": watch_dir,
+            "bucket_name": BUCKET,
+            "concurrency_limit": 5,
+            "upload_workers": 2,
+            "quiet_period": 0,
+            "ledger_path": str(tmp_path / "ledger.db"),
+            "dead_letter_queue_path": str(tmp_path / "dlq.db"),
+            "journal_path": str(tmp_path / "journal.log"),
+            "timestream_spill_path": str(tmp_path / "timestream_spill.jsonl"),
+        }
+        settings.update(options)
+        handler = FileSystemHandler(config=FileSystemHandlerConfig(**settings))
+        handlers.append(handler)
+        return handler
+
+    yield make
+
+    for handler in handlers:
+        handler.stop()
+
+
+def list_keys(s3) -> list:
+    """
+    Function to return the keys of the test bucket
+    """
+
+    response = s3.list_objects_v2(Bucket=BUCKET)
+    return sorted(item["Key"] for item in response.get("Contents", []))
+
+
+def make_event(
+    event, watch_path: str = "/watch", sequence: int = 0
+) -> FileSystemHandlerEvent:
+    """
+    Function to build a handler event of a watchdog event, or of the creation of a path
+    """
+
+    if not isinstance(event, FileSystemEvent):
+        event = FileCreatedEvent(event)
+
+    handler_event = FileSystemHandlerEvent(
+        event=event, bucket_name=BUCKET, watch_path=watch_path
+    )
+    handler_event.sequence = sequence
+    return handler_event
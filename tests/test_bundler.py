@@ -0,0 +1,63 @@
+"""
+Tests of the bundles of small files and their offset index
+"""
+
+import json
+import os
+
+from fswatcher.FileSystemHandlerBundler import FileSystemHandlerBundler
+
+
+def make_bundler(objects: dict, uploaded: list, **options) -> FileSystemHandlerBundler:
+    """
+    Function to build a bundler keeping the uploaded objects in memory
+    """
+
+    def upload(src_path, bucket_name, file_key, tags, dead_letter=True):
+        with open(src_path, "rb") as file:
+            objects[(bucket_name, file_key)] = file.read()
+        return True
+
+    return FileSystemHandlerBundler(
+        upload=upload,
+        uploaded=lambda *args: uploaded.append(args),
+        window=3600,
+        **options,
+    )
+
+
+def test_members_are_readable_at_their_indexed_offsets(tmp_path):
+    objects, uploaded = {}, []
+    bundler = make_bundler(objects, uploaded)
+
+    contents = {f"raw/{index}.txt": os.urandom(index * 100 + 1) for index in range(5)}
+    os.makedirs(tmp_path / "raw")
+    for file_key, data in contents.items():
+        path = tmp_path / file_key
+        path.write_bytes(data)
+        assert bundler.add(str(path), "bucket", file_key)
+    bundler.stop()
+
+    (index_key,) = [key for _, key in objects if key.endswith(".json")]
+    index = json.loads(objects[("bucket", index_key)])
+    bundle = objects[("bucket", os.path.join("raw", "_bundles", index["bundle"]))]
+
+    # A ranged GET of the offset and size returns the file
+    assert set(index["members"]) == set(contents)
+    for file_key, member in index["members"].items():
+        offset, size = member["offset"], member["size"]
+        assert bundle[offset : offset + size] == contents[file_key]
+
+    assert len(uploaded) == len(contents)
+
+
+def test_large_files_are_not_bundled(tmp_path):
+    objects, uploaded = {}, []
+    bundler = make_bundler(objects, uploaded, size_threshold=10)
+
+    path = tmp_path / "large.bin"
+    path.write_bytes(b"x" * 10)
+    assert not bundler.add(str(path), "bucket", "large.bin")
+    bundler.stop()
+
+    assert objects == {}
@@ -0,0 +1,83 @@
+"""
+Tests of the uploads triggered when a written file is closed
+"""
+
+import os
+import time
+
+from watchdog.events import (
+    FileClosedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from fswatcher.FileSystemHandlerCloseWrite import FileSystemHandlerCloseWrite
+from tests.conftest import list_keys, make_event, wait_for
+
+
+def test_events_are_held_until_the_file_is_closed():
+    submitted = []
+    close_write = FileSystemHandlerCloseWrite(submit=submitted.append)
+
+    close_write.add(make_event(FileCreatedEvent("/watch/a.txt")))
+    for _ in range(3):
+        close_write.add(make_event(FileModifiedEvent("/watch/a.txt")))
+    assert submitted == []
+
+    close_write.add(make_event(FileClosedEvent("/watch/a.txt")))
+    assert [event.get_path() for event in submitted] == ["/watch/a.txt"]
+    assert close_write.pending == {}
+
+
+def test_files_renamed_into_place_are_complete():
+    submitted, discarded = [], []
+    close_write = FileSystemHandlerCloseWrite(
+        submit=submitted.append,
+        discard=lambda path, sequence: discarded.append(path),
+    )
+
+    close_write.add(make_event(FileCreatedEvent("/watch/a.tmp")))
+    close_write.add(make_event(FileMovedEvent("/watch/a.tmp", "/watch/a.txt")))
+
+    assert [event.get_path() for event in submitted] == ["/watch/a.txt"]
+    assert discarded == ["/watch/a.tmp"]
+
+
+def test_unclosed_files_are_submitted_once_stable(tmp_path):
+    path = str(tmp_path / "a.txt")
+    with open(path, "w") as file:
+        file.write("content")
+
+    submitted = []
+    close_write = FileSystemHandlerCloseWrite(submit=submitted.append, timeout=0.05)
+    close_write.start()
+    close_write.add(make_event(FileModifiedEvent(path), str(tmp_path)))
+
+    assert wait_for(lambda: len(submitted) == 1)
+    close_write.stop()
+
+
+def test_handler_uploads_once_on_close(make_handler, watch_dir, s3):
+    handler = make_handler(trigger_mode="close", close_timeout=60)
+    uploads = []
+    upload = handler._upload_to_s3_bucket
+    handler._upload_to_s3_bucket = lambda *args, **kwargs: uploads.append(
+        args
+    ) or upload(*args, **kwargs)
+
+    path = os.path.join(watch_dir, "a.txt")
+    handler.on_any_event(FileCreatedEvent(path))
+    with open(path, "w") as file:
+        for _ in range(3):
+            file.write("content")
+            file.flush()
+            handler.on_any_event(FileModifiedEvent(path))
+
+    # Nothing is uploaded while the file is open
+    time.sleep(0.2)
+    assert uploads == []
+
+    handler.on_any_event(FileClosedEvent(path))
+    assert wait_for(lambda: list_keys(s3) == ["a.txt"])
+    assert len(uploads) == 1
@@ -0,0 +1,92 @@
+"""
+Tests of the coalescer merging the events of a path within the quiet period
+"""
+
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from fswatcher.FileSystemHandlerCoalescer import FileSystemHandlerCoalescer
+from tests.conftest import make_event, wait_for
+
+
+def test_create_then_delete_cancels_out():
+    created = make_event(FileCreatedEvent("/watch/a.txt"))
+    deleted = make_event(FileDeletedEvent("/watch/a.txt"))
+
+    assert FileSystemHandlerCoalescer._merge(created, deleted) is None
+
+
+def test_delete_of_an_uploaded_file_is_kept():
+    modified = make_event(FileModifiedEvent("/watch/a.txt"))
+    deleted = make_event(FileDeletedEvent("/watch/a.txt"))
+
+    assert FileSystemHandlerCoalescer._merge(modified, deleted) is deleted
+
+
+def test_recreated_file_replaces_the_delete():
+    deleted = make_event(FileDeletedEvent("/watch/a.txt"))
+    created = make_event(FileCreatedEvent("/watch/a.txt"))
+
+    assert FileSystemHandlerCoalescer._merge(deleted, created) is created
+
+
+def test_delete_of_a_recreated_file_keeps_the_delete():
+    deleted = make_event(FileDeletedEvent("/watch/a.txt"), sequence=1)
+    created = make_event(FileCreatedEvent("/watch/a.txt"), sequence=2)
+    deleted_again = make_event(FileDeletedEvent("/watch/a.txt"), sequence=3)
+
+    merged = FileSystemHandlerCoalescer._merge(deleted, created)
+    merged = FileSystemHandlerCoalescer._merge(merged, deleted_again)
+
+    assert merged is deleted_again
+
+
+def test_writes_collapse_into_the_first_event_with_the_latest_sequence():
+    created = make_event(FileCreatedEvent("/watch/a.txt"), sequence=1)
+    modified = make_event(FileModifiedEvent("/watch/a.txt"), sequence=2)
+
+    merged = FileSystemHandlerCoalescer._merge(created, modified)
+
+    assert merged is created
+    assert merged.sequence == 2
+
+
+def test_events_of_a_path_are_submitted_once_quiet():
+    submitted = []
+    discarded = []
+    coalescer = FileSystemHandlerCoalescer(
+        submit=submitted.append,
+        quiet_period=0.2,
+        discard=lambda path, sequence: discarded.append((path, sequence)),
+    )
+    coalescer.start()
+
+    coalescer.add(make_event(FileCreatedEvent("/watch/a.txt"), sequence=1))
+    coalescer.add(make_event(FileModifiedEvent("/watch/a.txt"), sequence=2))
+    coalescer.add(make_event(FileCreatedEvent("/watch/b.txt"), sequence=3))
+    coalescer.add(make_event(FileDeletedEvent("/watch/b.txt"), sequence=4))
+    coalescer.add(make_event(FileMovedEvent("/watch/c.tmp", "/watch/c.txt")))
+
+    assert wait_for(lambda: len(submitted) == 2)
+    coalescer.stop()
+
+    assert sorted(event.get_path() for event in submitted) == [
+        "/watch/a.txt",
+        "/watch/c.txt",
+    ]
+    assert discarded == [("/watch/b.txt", 4)]
+
+
+def test_zero_quiet_period_submits_directly():
+    submitted = []
+    coalescer = FileSystemHandlerCoalescer(submit=submitted.append, quiet_period=0)
+    coalescer.start()
+
+    event = make_event(FileCreatedEvent("/watch/a.txt"))
+    coalescer.add(event)
+
+    assert submitted == [event]
@@ -0,0 +1,78 @@
+"""
+Tests of the adaptive concurrency of the uploads
+"""
+
+import os
+
+import pytest
+
+from fswatcher.FileSystemHandlerConcurrency import FileSystemHandlerConcurrency
+from tests.conftest import BUCKET
+
+
+def test_limit_is_raised_while_saturated():
+    concurrency = FileSystemHandlerConcurrency(min_limit=1, max_limit=4, interval=0)
+    assert concurrency.limit == 2
+
+    for expected in (3, 4, 4):
+        for _ in range(concurrency.limit):
+            concurrency.acquire("bucket/a")
+        for _ in range(concurrency.limit):
+            concurrency.release("bucket/a", size=1024)
+        assert concurrency.limit == expected
+
+
+def test_limit_is_not_raised_without_saturation():
+    concurrency = FileSystemHandlerConcurrency(min_limit=1, max_limit=4, interval=0)
+
+    concurrency.acquire("bucket/a")
+    concurrency.release("bucket/a", size=1024)
+    concurrency.acquire("bucket/a")
+    concurrency.release("bucket/a", size=1024)
+
+    assert concurrency.limit == 2
+
+
+def test_limit_is_halved_once_per_interval_when_throttled():
+    concurrency = FileSystemHandlerConcurrency(min_limit=1, max_limit=8, interval=60)
+    assert concurrency.limit == 4
+
+    for _ in range(3):
+        concurrency.acquire("bucket/hot")
+    for _ in range(3):
+        concurrency.release("bucket/hot", throttled=True)
+
+    # Uploads throttled together back off the total limit once
+    assert concurrency.limit == 2
+
+    # The throttled prefix gets its own limit, others keep the total one
+    assert concurrency._is_full("bucket/hot") is False
+    assert concurrency.prefix_limits["bucket/hot"] == 1
+    concurrency.acquire("bucket/hot")
+    assert concurrency._is_full("bucket/hot")
+    assert not concurrency._is_full("bucket/cold")
+    concurrency.release("bucket/hot", size=1024)
+
+    # Successful uploads raise the limit of the prefix until it is dropped
+    assert concurrency.prefix_limits["bucket/hot"] == 2
+    for _ in range(6):
+        concurrency.acquire("bucket/hot")
+        concurrency.release("bucket/hot", size=1024)
+    assert "bucket/hot" not in concurrency.prefix_limits
+
+
+def test_failed_session_refresh_does_not_leak_the_upload_slot(make_handler, watch_dir):
+    handler = make_handler(adaptive_concurrency=True)
+    path = os.path.join(watch_dir, "a.txt")
+    with open(path, "w") as file:
+        file.write("content")
+
+    def refresh(generation):
+        raise RuntimeError("refresh failed")
+
+    handler.last_refresh_time = 0
+    handler._refresh_boto_session = refresh
+    with pytest.raises(RuntimeError):
+        handler._upload_to_s3_bucket(path, BUCKET, "a.txt", None)
+
+    assert handler._get_concurrency().in_flight == 0
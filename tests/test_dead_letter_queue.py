@@ -0,0 +1,141 @@
+"""
+Tests of the dead letter queue of failed uploads
+"""
+
+import os
+import sqlite3
+
+from watchdog.events import FileDeletedEvent
+
+from fswatcher.FileSystemHandlerDeadLetterQueue import FileSystemHandlerDeadLetterQueue
+from tests.conftest import BUCKET, list_keys, make_event
+
+
+def test_delay_of_many_attempts_is_capped(tmp_path):
+    queue = FileSystemHandlerDeadLetterQueue(str(tmp_path / "dlq.db"))
+
+    for attempts in (0, 10, 1100, 10**6):
+        assert queue.base_delay / 2 <= queue._get_delay(attempts) <= queue.max_delay
+
+    queue.close()
+
+
+def test_failures_of_a_path_update_its_entry(tmp_path):
+    queue = FileSystemHandlerDeadLetterQueue(str(tmp_path / "dlq.db"))
+    queue.add("/watch/a.txt", "bucket", "a.txt", None, "first")
+    entry = queue.get_entries()[0]
+    queue.reschedule(entry, "retry")
+
+    queue.add("/watch/a.txt", "other", "b/a.txt", None, "second")
+    queue.add("/watch/b.txt", "bucket", "b.txt", None, "first")
+
+    entries = {entry["src_path"]: entry for entry in queue.get_entries()}
+    assert len(queue) == 2
+    assert entries["/watch/a.txt"]["bucket_name"] == "other"
+    assert entries["/watch/a.txt"]["file_key"] == "b/a.txt"
+    assert entries["/watch/a.txt"]["last_error"] == "second"
+    assert entries["/watch/a.txt"]["attempts"] == 1
+
+    queue.close()
+
+
+def test_duplicates_of_older_queues_are_collapsed(tmp_path):
+    path = str(tmp_path / "dlq.db")
+    queue = FileSystemHandlerDeadLetterQueue(path)
+    queue.close()
+
+    # Queues written before the unique index may hold a path more than once
+    connection = sqlite3.connect(path)
+    connection.execute("DROP INDEX dead_letters_src_path")
+    for error in ("first", "second"):
+        connection.execute(
+            """
+            INSERT INTO dead_letters
+            (src_path, bucket_name, file_key, attempts, next_attempt, last_error, created)
+            VALUES ('/watch/a.txt', 'bucket', 'a.txt', 0, 0, ?, 0)
+            """,
+            (error,),
+        )
+    connection.commit()
+    connection.close()
+
+    queue = FileSystemHandlerDeadLetterQueue(path)
+    entries = queue.get_entries()
+    assert [entry["last_error"] for entry in entries] == ["second"]
+
+    queue.close()
+
+
+def test_removing_a_path_resolves_its_entry(tmp_path):
+    queue = FileSystemHandlerDeadLetterQueue(str(tmp_path / "dlq.db"))
+    queue.add("/watch/a.txt", "bucket", "a.txt", None, "failed")
+    entry = queue.get_entries()[0]
+
+    # Rescheduling without an error keeps the error of the failed upload
+    queue.reschedule(entry)
+    assert queue.get_entries()[0]["last_error"] == "failed"
+
+    queue.remove_path("/watch/b.txt")
+    assert len(queue) == 1
+    queue.remove_path("/watch/a.txt")
+    assert len(queue) == 0
+
+    queue.close()
+
+
+def test_retries_are_uploaded_by_the_upload_workers(make_handler, watch_dir, s3):
+    handler = make_handler(content_hash=True)
+    path = os.path.join(watch_dir, "a.txt")
+    with open(path, "w") as file:
+        file.write("content")
+    handler.dead_letter_queue.add(path, BUCKET, "a.txt", None, "failed")
+
+    submitted = []
+    submit_event = handler._submit_event
+    handler._submit_event = lambda event: submitted.append(event) or submit_event(event)
+
+    handler.replay_dead_letter_queue()
+
+    assert [event.dead_letter for event in submitted] == [True]
+    assert list_keys(s3) == ["a.txt"]
+    assert len(handler.dead_letter_queue) == 0
+
+    # The checksum of the retried upload is recorded with it
+    assert handler.ledger.lookup(path)[4] is not None
+
+
+def test_retries_of_removed_files_are_dropped(make_handler, watch_dir, s3):
+    handler = make_handler()
+    path = os.path.join(watch_dir, "a.txt")
+    handler.dead_letter_queue.add(path, BUCKET, "a.txt", None, "failed")
+
+    handler.replay_dead_letter_queue()
+
+    assert len(handler.dead_letter_queue) == 0
+    assert list_keys(s3) == []
+
+
+def test_retries_do_not_overtake_queued_events_of_the_path(make_handler, watch_dir):
+    handler = make_handler()
+    path = os.path.join(watch_dir, "a.txt")
+    with open(path, "w") as file:
+        file.write("content")
+    handler.dead_letter_queue.add(path, BUCKET, "a.txt", None, "failed")
+
+    # A delete of the path is still waiting for an upload worker
+    handler.events.add(make_event(FileDeletedEvent(path), watch_dir))
+
+    submitted = []
+    handler._submit_event = submitted.append
+    handler._retry_dead_letter(handler.dead_letter_queue.get_entries()[0])
+
+    assert submitted == []
+    assert handler.dead_letter_queue.get_entries()[0]["attempts"] == 0
+
+
+def test_retrier_is_only_started_when_watching(make_handler):
+    handler = make_handler()
+    assert handler.retrier is None
+
+    handler.start_dead_letter_retrier()
+    assert handler.retrier.is_alive()
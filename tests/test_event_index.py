@@ -0,0 +1,87 @@
+"""
+Tests of the index of the events in flight and the duplicate check using it
+"""
+
+import os
+import threading
+
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileModifiedEvent
+
+from fswatcher.FileSystemHandlerEventIndex import FileSystemHandlerEventIndex
+from tests.conftest import list_keys, make_event, wait_for
+
+
+def test_latest_event_of_a_path_is_a_duplicate():
+    index = FileSystemHandlerEventIndex()
+    index.add(make_event(FileModifiedEvent("/watch/a.txt")))
+
+    assert make_event(FileModifiedEvent("/watch/a.txt")) in index
+    assert make_event(FileModifiedEvent("/watch/b.txt")) not in index
+
+
+def test_event_followed_by_another_event_of_the_path_is_not_a_duplicate():
+    index = FileSystemHandlerEventIndex()
+    index.add(make_event(FileCreatedEvent("/watch/a.txt")))
+    index.add(make_event(FileDeletedEvent("/watch/a.txt")))
+
+    assert make_event(FileCreatedEvent("/watch/a.txt")) not in index
+    assert make_event(FileDeletedEvent("/watch/a.txt")) in index
+
+
+def test_discard_keeps_equal_events_still_queued():
+    index = FileSystemHandlerEventIndex()
+    event = make_event(FileModifiedEvent("/watch/a.txt"))
+    index.add(event)
+    index.add(make_event(FileModifiedEvent("/watch/a.txt")))
+
+    index.discard(event)
+    assert event in index
+    assert len(index) == 1
+
+    index.discard(event)
+    assert event not in index
+    assert len(index) == 0
+
+
+def test_expired_events_are_dropped():
+    index = FileSystemHandlerEventIndex(ttl=0)
+    event = make_event(FileModifiedEvent("/watch/a.txt"))
+    index.add(event)
+
+    assert event not in index
+    assert index.latest == {}
+
+
+def test_create_delete_create_behind_a_slow_upload_keeps_the_object(
+    make_handler, watch_dir, s3
+):
+    handler = make_handler(upload_workers=1, allow_delete=True)
+
+    # Hold the worker so every event below is queued behind the first one
+    gate = threading.Event()
+    handle_event = handler.pipeline.handle_event
+
+    def slow_handle_event(event):
+        gate.wait(10)
+        handle_event(event)
+
+    handler.pipeline.handle_event = slow_handle_event
+
+    path = os.path.join(watch_dir, "x.txt")
+    with open(path, "w") as file:
+        file.write("first")
+    handler.dispatch(FileCreatedEvent(path))
+
+    os.remove(path)
+    handler.dispatch(FileDeletedEvent(path))
+
+    with open(path, "w") as file:
+        file.write("second")
+    handler.dispatch(FileCreatedEvent(path))
+
+    gate.set()
+    handler.pipeline.join()
+
+    assert wait_for(lambda: list_keys(s3) == ["x.txt"])
+    body = s3.get_object(Bucket="test-bucket", Key="x.txt")["Body"].read()
+    assert body == b"second"
@@ -0,0 +1,147 @@
+"""
+Tests of the include and exclude patterns and the watch rules
+"""
+
+import os
+
+from fswatcher.FileSystemHandlerFilter import FileSystemHandlerFilter
+from fswatcher.FileSystemHandlerRouter import (
+    FileSystemHandlerRoute,
+    FileSystemHandlerRouter,
+)
+from fswatcher.FileSystemHandlerScanner import FileSystemHandlerScanner
+from fswatcher.FileSystemHandlerWalker import FileSystemHandlerWalker
+
+
+def make_tree(root: str, paths: list) -> None:
+    for path in paths:
+        path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write("content")
+
+
+def relative(root: str, files) -> list:
+    return sorted(os.path.relpath(path, root) for path in files)
+
+
+def test_name_patterns_match_at_any_depth():
+    path_filter = FileSystemHandlerFilter(include=["*.fits"], exclude=["tmp"])
+    root = "/data/watch"
+
+    assert path_filter.matches("/data/watch/a.fits", root)
+    assert path_filter.matches("/data/watch/raw/night/a.fits", root)
+    assert not path_filter.matches("/data/watch/a.txt", root)
+    assert not path_filter.matches("/data/watch/raw/tmp/a.fits", root)
+
+
+def test_path_patterns_match_relative_to_the_root():
+    path_filter = FileSystemHandlerFilter(include=["raw/*"], exclude=["raw/tmp/*"])
+    root = "/data/watch"
+
+    assert path_filter.matches("/data/watch/raw/a.fits", root)
+    assert path_filter.matches("/data/watch/raw/night/a.fits", root)
+    assert not path_filter.matches("/data/watch/a.fits", root)
+    assert not path_filter.matches("/data/watch/raw/tmp/a.fits", root)
+    assert not path_filter.matches("/data/watch/raw/a.fits", "/data")
+    assert path_filter.is_excluded_directory("raw/tmp", "tmp")
+    assert not path_filter.is_excluded_directory("data/watch/raw/tmp", "tmp")
+
+
+def test_regex_patterns():
+    path_filter = FileSystemHandlerFilter(exclude=[r"re:.*\.tmp\d*$", "re:cache/.*"])
+    root = "/data/watch"
+
+    assert path_filter.matches("/data/watch/a.fits", root)
+    assert not path_filter.matches("/data/watch/a.tmp12", root)
+    assert not path_filter.matches("/data/watch/cache/a.fits", root)
+
+
+def test_scans_prune_relative_path_patterns(tmp_path):
+    root = str(tmp_path)
+    make_tree(root, ["raw/a.fits", "raw/tmp/b.fits", "raw/c.txt", "d.fits"])
+    path_filter = FileSystemHandlerFilter(include=["*.fits"], exclude=["raw/tmp"])
+
+    scanner = FileSystemHandlerScanner(root, path_filter=path_filter)
+    created, _, _ = scanner.scan()
+    assert relative(root, created) == ["d.fits", os.path.join("raw", "a.fits")]
+    assert os.path.join(root, "raw", "tmp") not in scanner.directories
+
+    walker = FileSystemHandlerWalker(workers=2, path_filter=path_filter)
+    walked = [path for path, _ in walker.walk(root)]
+    assert relative(root, walked) == ["d.fits", os.path.join("raw", "a.fits")]
+
+
+def test_route_patterns_match_relative_to_their_root():
+    route = FileSystemHandlerRoute(
+        "/data/watch", "bucket", include=["*.fits", "logs/*.json"], exclude=["tmp/*"]
+    )
+
+    assert route.matches("/data/watch/a.fits")
+    assert route.matches("/data/watch/night/a.fits")
+    assert route.matches("/data/watch/logs/a.json")
+    assert not route.matches("/data/watch/a.json")
+    assert not route.matches("/data/watch/tmp/a.fits")
+    assert not route.matches("/data/other/a.fits")
+
+
+def test_scans_prune_the_directories_no_rule_uploads_from(tmp_path):
+    root = str(tmp_path)
+    make_tree(
+        root,
+        ["a/x.fits", "a/tmp/y.fits", "b.fits", "nested/tmp/z.fits", "other/w.fits"],
+    )
+    router = FileSystemHandlerRouter(
+        [
+            FileSystemHandlerRoute(root, "bucket", exclude=["tmp", "other/*"]),
+            FileSystemHandlerRoute(os.path.join(root, "nested"), "nested"),
+        ]
+    )
+
+    scanner = FileSystemHandlerScanner(root, router=router)
+    created, _, _ = scanner.scan()
+    expected = [
+        os.path.join("a", "x.fits"),
+        "b.fits",
+        os.path.join("nested", "tmp", "z.fits"),
+    ]
+    assert relative(root, created) == expected
+    assert os.path.join(root, "a", "tmp") not in scanner.directories
+    assert os.path.join(root, "other") not in scanner.directories
+
+    walker = FileSystemHandlerWalker(workers=2, router=router)
+    assert relative(root, [path for path, _ in walker.walk(root)]) == expected
+
+
+def test_global_patterns_match_relative_to_the_rule_root_everywhere(tmp_path):
+    root = str(tmp_path)
+    make_tree(
+        root,
+        ["a.fits", "cache/b.fits", "nested/c.fits", "nested/cache/d.fits", "e.txt"],
+    )
+    path_filter = FileSystemHandlerFilter(include=["*.fits"], exclude=["cache/*"])
+    router = FileSystemHandlerRouter(
+        [
+            FileSystemHandlerRoute(root, "bucket"),
+            FileSystemHandlerRoute(os.path.join(root, "nested"), "nested"),
+        ],
+        path_filter=path_filter,
+    )
+    expected = ["a.fits", os.path.join("nested", "c.fits")]
+
+    # Live events
+    paths = [
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+    ]
+    assert relative(root, filter(router.get_route, paths)) == expected
+
+    # Scans and walks of the outer root reach the files of the nested rule
+    scanner = FileSystemHandlerScanner(root, router=router)
+    created, _, _ = scanner.scan()
+    assert relative(root, created) == expected
+    assert os.path.join(root, "nested", "cache") not in scanner.directories
+
+    walker = FileSystemHandlerWalker(workers=2, router=router)
+    assert relative(root, [path for path, _ in walker.walk(root)]) == expected
@@ -0,0 +1,77 @@
+"""
+Tests of the journal of the events in flight and its replay
+"""
+
+import os
+
+from watchdog.events import FileClosedEvent, FileCreatedEvent
+
+from fswatcher.FileSystemHandlerJournal import FileSystemHandlerJournal
+from tests.conftest import list_keys, make_event, wait_for
+
+
+def crash_with(journal_path: str, events: list) -> None:
+    """
+    Function to journal events that a run accepted and never completed
+    """
+
+    journal = FileSystemHandlerJournal(journal_path, commit_interval=0)
+    for event in events:
+        journal.accept(event)
+    journal.close()
+
+
+def test_completed_events_are_not_recovered(tmp_path):
+    journal_path = str(tmp_path / "journal.log")
+    journal = FileSystemHandlerJournal(journal_path, commit_interval=0)
+    first = make_event(FileCreatedEvent("/watch/a.txt"), "/watch")
+    second = make_event(FileCreatedEvent("/watch/b.txt"), "/watch")
+    third = make_event(FileCreatedEvent("/watch/a.txt"), "/watch")
+    for event in (first, second, third):
+        journal.accept(event)
+
+    # A completion covers the earlier events of the path only
+    journal.complete("/watch/a.txt", first.sequence)
+    journal.close()
+
+    journal = FileSystemHandlerJournal(journal_path, commit_interval=0)
+    assert [record["sequence"] for record in journal.recovered] == [
+        second.sequence,
+        third.sequence,
+    ]
+    assert len(journal) == 2
+    journal.close()
+
+
+def test_closed_events_are_replayed_without_close_mode(
+    make_handler, tmp_path, watch_dir, s3
+):
+    path = os.path.join(watch_dir, "file.txt")
+    with open(path, "w") as file:
+        file.write("content")
+    journal_path = str(tmp_path / "journal.log")
+    crash_with(journal_path, [make_event(FileClosedEvent(path), watch_dir)])
+
+    handler = make_handler(use_journal=True, journal_path=journal_path)
+
+    assert wait_for(lambda: list_keys(s3) == ["file.txt"])
+    assert wait_for(lambda: len(handler.journal) == 0)
+
+
+def test_events_that_raised_stay_in_the_journal(make_handler, tmp_path, watch_dir):
+    path = os.path.join(watch_dir, "file.txt")
+    with open(path, "w") as file:
+        file.write("content")
+    journal_path = str(tmp_path / "journal.log")
+
+    handler = make_handler(use_journal=True, journal_path=journal_path)
+
+    def fail(event):
+        raise RuntimeError("upload failed")
+
+    handler._upload_event = fail
+    event = make_event(FileCreatedEvent(path), watch_dir)
+    handler.journal.accept(event)
+    handler._handle_event(event)
+
+    assert len(handler.journal) == 1
@@ -0,0 +1,100 @@
+"""
+Tests of the express, normal and bulk upload lanes
+"""
+
+import os
+import threading
+
+from watchdog.events import FileDeletedEvent
+
+from fswatcher.FileSystemHandlerLanes import FileSystemHandlerLanes
+from tests.conftest import make_event, wait_for
+
+WORKERS = {"express": 1, "normal": 1, "bulk": 1}
+
+
+def write(path: str, size: int) -> str:
+    with open(path, "wb") as file:
+        file.truncate(size)
+    return path
+
+
+def test_lanes_are_picked_by_manifest_pattern_and_size(tmp_path):
+    root = str(tmp_path)
+    lanes = FileSystemHandlerLanes(
+        handle_event=lambda event: None,
+        workers=WORKERS,
+        express_max_size=100,
+        bulk_min_size=1000,
+        express_patterns=["alerts/*"],
+        bulk_patterns=["*.tar"],
+    )
+    os.makedirs(os.path.join(root, "alerts"))
+
+    def lane(name: str, size: int = 0, deleted: bool = False) -> str:
+        path = os.path.join(root, name)
+        if not deleted:
+            write(path, size)
+        return lanes.get_lane(
+            make_event(FileDeletedEvent(path) if deleted else path, root)
+        )
+
+    assert lane("file_manifest_1.txt", 5000) == "express"
+    assert lane("gone.bin", deleted=True) == "express"
+    assert lane("alerts/large.bin", 5000) == "express"
+    assert lane("small.tar", 10) == "bulk"
+    assert lane("small.bin", 10) == "express"
+    assert lane("medium.bin", 500) == "normal"
+    assert lane("large.bin", 1000) == "bulk"
+
+
+def test_events_of_a_path_stay_in_its_lane(tmp_path):
+    handled = []
+    release = threading.Event()
+
+    def handle_event(event):
+        release.wait(5)
+        handled.append((lanes.get_current_lane(), event.action_type))
+
+    lanes = FileSystemHandlerLanes(
+        handle_event=handle_event, workers=WORKERS, express_max_size=100
+    )
+    lanes.start()
+    path = write(str(tmp_path / "file.bin"), 500)
+
+    # The delete of a file uploaded in the normal lane is not sent ahead of it
+    lanes.submit(make_event(path, str(tmp_path)))
+    lanes.submit(make_event(FileDeletedEvent(path), str(tmp_path)))
+    release.set()
+    lanes.stop()
+
+    assert handled == [("normal", "CREATE"), ("normal", "DELETE")]
+    assert lanes.in_flight == {}
+
+
+def test_every_lane_has_its_own_concurrency_limit(make_handler, watch_dir):
+    handler = make_handler(
+        adaptive_concurrency=True,
+        priority_lanes=True,
+        express_workers=3,
+        upload_workers=4,
+        bulk_workers=1,
+    )
+
+    assert {lane: c.max_limit for lane, c in handler.concurrency.items()} == {
+        "express": 3,
+        "normal": 4,
+        "bulk": 1,
+    }
+
+    # Uploads pick the controller of the lane of their worker
+    controllers = []
+    handler.pipeline.handle_event = lambda event: controllers.append(
+        handler._get_concurrency()
+    )
+    path = write(os.path.join(watch_dir, "small.txt"), 10)
+    handler.pipeline.submit(make_event(path, watch_dir))
+
+    assert wait_for(lambda: controllers)
+    assert controllers == [handler.concurrency["express"]]
+    assert handler._get_concurrency() is handler.concurrency["normal"]
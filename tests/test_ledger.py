@@ -0,0 +1,71 @@
+"""
+Tests of the ledger of the uploaded files
+"""
+
+import os
+import sqlite3
+
+from fswatcher.FileSystemHandlerLedger import FileSystemHandlerLedger
+
+
+def test_uploads_to_another_bucket_or_key_are_not_resolved(tmp_path):
+    ledger = FileSystemHandlerLedger(str(tmp_path / "ledger.db"))
+    path = tmp_path / "a.txt"
+    path.write_text("content")
+    stats = os.stat(path)
+    ledger.record(str(path), stats.st_size, stats.st_mtime_ns, "a.txt", bucket="one")
+
+    assert ledger.is_uploaded(str(path), bucket="one", key="a.txt")
+    assert not ledger.is_uploaded(str(path), bucket="two", key="a.txt")
+    assert not ledger.is_uploaded(str(path), bucket="one", key="b/a.txt")
+
+    targets = {str(path): ("two", "a.txt")}
+    assert ledger.get_unresolved([str(path)], targets.get) == [str(path)]
+    assert ledger.get_unresolved([str(path)]) == []
+
+    ledger.close()
+
+
+def test_changed_files_are_not_resolved(tmp_path):
+    ledger = FileSystemHandlerLedger(str(tmp_path / "ledger.db"))
+    path = tmp_path / "a.txt"
+    path.write_text("content")
+    stats = os.stat(path)
+    ledger.record(str(path), stats.st_size, stats.st_mtime_ns, "a.txt", bucket="one")
+
+    path.write_text("changed content")
+    assert not ledger.is_uploaded(str(path), bucket="one", key="a.txt")
+
+    ledger.close()
+
+
+def test_entries_of_older_ledgers_are_checked_by_key(tmp_path):
+    ledger_path = str(tmp_path / "ledger.db")
+    path = tmp_path / "a.txt"
+    path.write_text("content")
+    stats = os.stat(path)
+
+    # Ledgers written before the bucket was kept have no bucket column
+    connection = sqlite3.connect(ledger_path)
+    connection.execute("""
+        CREATE TABLE uploads (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            etag TEXT,
+            key TEXT NOT NULL,
+            uploaded REAL NOT NULL
+        )
+        """)
+    connection.execute(
+        "INSERT INTO uploads VALUES (?, ?, ?, NULL, 'a.txt', 0)",
+        (str(path), stats.st_size, stats.st_mtime_ns),
+    )
+    connection.commit()
+    connection.close()
+
+    ledger = FileSystemHandlerLedger(ledger_path)
+    assert ledger.is_uploaded(str(path), bucket="one", key="a.txt")
+    assert not ledger.is_uploaded(str(path), bucket="one", key="b/a.txt")
+
+    ledger.close()
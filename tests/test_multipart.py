@@ -0,0 +1,104 @@
+"""
+Tests of the multipart uploads streaming the parts from the file
+"""
+
+import os
+
+import pytest
+
+from fswatcher.FileSystemHandlerMultipart import FileSystemHandlerMultipart
+from tests.conftest import BUCKET
+
+MB = 1024**2
+
+
+@pytest.fixture
+def multipart():
+    """
+    Multipart uploader with a small thread pool
+    """
+
+    multipart = FileSystemHandlerMultipart(workers=2)
+    yield multipart
+    multipart.close()
+
+
+def test_parts_are_uploaded_in_order(s3, tmp_path, multipart):
+    path = tmp_path / "file.bin"
+    data = os.urandom(12 * MB)
+    path.write_bytes(data)
+
+    multipart.upload(s3, str(path), BUCKET, "file.bin", part_size=5 * MB)
+
+    response = s3.get_object(Bucket=BUCKET, Key="file.bin")
+    assert response["Body"].read() == data
+    assert response["ETag"].strip('"').endswith("-3")
+
+
+def test_thread_pool_is_shared_by_the_files(s3, tmp_path, multipart):
+    for name in ("a.bin", "b.bin"):
+        (tmp_path / name).write_bytes(os.urandom(11 * MB))
+        multipart.upload(s3, str(tmp_path / name), BUCKET, name, part_size=5 * MB)
+
+    assert len(multipart.executor._threads) <= multipart.workers
+    assert sorted(o["Key"] for o in s3.list_objects_v2(Bucket=BUCKET)["Contents"]) == [
+        "a.bin",
+        "b.bin",
+    ]
+
+
+def test_truncated_file_fails_the_upload(s3, tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(os.urandom(12 * MB))
+
+    # Truncate the file once the first part is uploaded
+    upload_part = s3.upload_part
+
+    def truncate_after_part(**kwargs):
+        response = upload_part(**kwargs)
+        os.truncate(path, 6 * MB)
+        return response
+
+    s3.upload_part = truncate_after_part
+
+    multipart = FileSystemHandlerMultipart(workers=1)
+    with pytest.raises(OSError, match="truncated"):
+        multipart.upload(s3, str(path), BUCKET, "file.bin", part_size=5 * MB)
+    multipart.close()
+
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert "Contents" not in s3.list_objects_v2(Bucket=BUCKET)
+
+
+def test_large_file_is_uploaded_in_parts_by_the_handler(make_handler, watch_dir, s3):
+    handler = make_handler(zero_copy=True, multipart_threshold=5, multipart_chunksize=5)
+    path = os.path.join(watch_dir, "large.bin")
+    data = os.urandom(12 * MB)
+    with open(path, "wb") as file:
+        file.write(data)
+
+    uploads = []
+    upload = handler.multipart.upload
+    handler.multipart.upload = lambda *args, **kwargs: uploads.append(
+        upload(*args, **kwargs)
+    )
+
+    assert handler._upload_to_s3_bucket(path, BUCKET, "large.bin", None)
+    assert len(uploads) == 1
+
+    response = s3.get_object(Bucket=BUCKET, Key="large.bin")
+    assert response["Body"].read() == data
+    assert response["ETag"].strip('"').endswith("-3")
+
+
+def test_unreadable_file_is_dead_lettered(make_handler, watch_dir):
+    handler = make_handler()
+    path = os.path.join(watch_dir, "missing.bin")
+
+    assert not handler._upload_to_s3_bucket(path, BUCKET, "missing.bin", None)
+
+    # Reading the file failed, not S3
+    assert handler.circuit_breaker.failures == 0
+    assert [entry["src_path"] for entry in handler.dead_letter_queue.get_entries()] == [
+        path
+    ]
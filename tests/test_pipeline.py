@@ -0,0 +1,73 @@
+"""
+Tests of the upload pipeline and the handler uploading through it
+"""
+
+import os
+import threading
+import time
+
+from watchdog.events import FileCreatedEvent
+
+from fswatcher.FileSystemHandlerPipeline import FileSystemHandlerPipeline
+from tests.conftest import list_keys, make_event, wait_for
+
+
+def test_events_of_a_path_are_handled_in_order():
+    handled = []
+    pipeline = FileSystemHandlerPipeline(
+        handle_event=lambda event: handled.append(event.sequence), workers=4
+    )
+    pipeline.start()
+
+    # Number the events, their detection times can be equal
+    for sequence in range(50):
+        pipeline.submit(make_event("/watch/a.txt", sequence=sequence))
+    pipeline.stop()
+
+    assert handled == list(range(50))
+
+
+def test_stop_drains_the_queues():
+    handled = []
+    lock = threading.Lock()
+
+    def handle_event(event):
+        time.sleep(0.001)
+        with lock:
+            handled.append(event.get_path())
+
+    pipeline = FileSystemHandlerPipeline(handle_event=handle_event, workers=3)
+    pipeline.start()
+    for index in range(30):
+        pipeline.submit(make_event(f"/watch/{index}.txt"))
+    pipeline.stop()
+
+    assert len(handled) == 30
+
+
+def test_worker_survives_a_failing_event():
+    handled = []
+
+    def handle_event(event):
+        if event.get_path().endswith("bad.txt"):
+            raise RuntimeError("boom")
+        handled.append(event.get_path())
+
+    pipeline = FileSystemHandlerPipeline(handle_event=handle_event, workers=1)
+    pipeline.start()
+    pipeline.submit(make_event("/watch/bad.txt"))
+    pipeline.submit(make_event("/watch/good.txt"))
+    pipeline.stop()
+
+    assert handled == ["/watch/good.txt"]
+
+
+def test_created_file_is_uploaded(make_handler, watch_dir, s3):
+    handler = make_handler()
+    path = os.path.join(watch_dir, "a.txt")
+    with open(path, "w") as file:
+        file.write("data")
+
+    handler.dispatch(FileCreatedEvent(path))
+
+    assert wait_for(lambda: list_keys(s3) == ["a.txt"])
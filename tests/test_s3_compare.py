@@ -0,0 +1,116 @@
+"""
+Tests of the comparison of local files with their S3 objects
+"""
+
+import os
+from collections import OrderedDict
+
+from fswatcher import get_file_etag
+from tests.conftest import BUCKET
+
+MB = 1024**2
+
+
+def upload(s3, path: str, key: str, part_size: int = None) -> str:
+    """
+    Function to upload a file in one request or in parts and return its ETag
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if part_size is None:
+        return s3.put_object(Bucket=BUCKET, Key=key, Body=data)["ETag"].strip('"')
+
+    upload_id = s3.create_multipart_upload(Bucket=BUCKET, Key=key)["UploadId"]
+    parts = []
+    for number, offset in enumerate(range(0, len(data), part_size), start=1):
+        response = s3.upload_part(
+            Bucket=BUCKET,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=data[offset : offset + part_size],
+        )
+        parts.append({"PartNumber": number, "ETag": response["ETag"]})
+    response = s3.complete_multipart_upload(
+        Bucket=BUCKET, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+    )
+    return response["ETag"].strip('"')
+
+
+def test_etag_of_a_single_request_upload(s3, tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"content")
+
+    assert get_file_etag(str(path)) == upload(s3, str(path), "file.txt")
+
+
+def test_etag_of_a_multipart_upload(s3, tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(os.urandom(5 * MB) + os.urandom(MB // 2))
+
+    etag = upload(s3, str(path), "file.bin", 5 * MB)
+    assert etag.endswith("-2")
+    assert get_file_etag(str(path), 5 * MB) == etag
+
+
+def test_rewrite_with_an_older_mtime_is_stale_with_content_hash(make_handler, s3):
+    handler = make_handler(content_hash=True)
+    path = os.path.join(handler.config.path, "file.txt")
+    with open(path, "wb") as file:
+        file.write(b"content")
+    etag = upload(s3, path, "file.txt")
+
+    # Same size and an mtime older than the upload, only the content tells them apart
+    with open(path, "wb") as file:
+        file.write(b"CONTENT")
+    os.utime(path, (0, 0))
+    s3_entry = (7, 1e9, etag)
+
+    assert handler._compare_with_s3(7, 0, s3_entry, path) == "stale"
+
+    with open(path, "wb") as file:
+        file.write(b"content")
+    assert handler._compare_with_s3(7, 0, s3_entry, path) == "identical"
+
+
+def test_mtime_decides_without_content_hash(make_handler, s3):
+    handler = make_handler()
+    path = os.path.join(handler.config.path, "file.txt")
+    with open(path, "wb") as file:
+        file.write(b"CONTENT")
+    s3_entry = (7, 1e9, get_file_etag(path) + "x")
+
+    assert handler._compare_with_s3(7, 0, s3_entry, path) == "identical"
+    assert handler._compare_with_s3(7, 2e9, s3_entry, path) == "stale"
+    assert handler._compare_with_s3(8, 0, s3_entry, path) == "stale"
+    assert handler._compare_with_s3(7, 0, None, path) == "missing"
+
+
+def test_interleaved_directories_are_listed_once_per_window(make_handler, s3):
+    handler = make_handler()
+    files = []
+    for name in ("a", "b", "c"):
+        os.makedirs(os.path.join(handler.config.path, name))
+    for index in range(4):
+        for name in ("a", "b", "c"):
+            path = os.path.join(handler.config.path, name, f"{index}.txt")
+            with open(path, "wb") as file:
+                file.write(b"content")
+            files.append((path, os.stat(path)))
+    upload(s3, files[0][0], "a/0.txt")
+
+    listed = []
+    get_index = handler._get_s3_directory_index
+    handler._get_s3_directory_index = lambda *directory: listed.append(
+        directory
+    ) or get_index(*directory)
+
+    directory_indexes = OrderedDict()
+    changed = handler._filter_s3_window(files[:6], directory_indexes)
+    changed += handler._filter_s3_window(files[6:], directory_indexes)
+
+    # The walk order is kept, the uploaded file is identical
+    assert changed == [path for path, _ in files[1:]]
+    assert sorted(listed) == [(BUCKET, "a/"), (BUCKET, "b/"), (BUCKET, "c/")]
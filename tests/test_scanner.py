@@ -0,0 +1,123 @@
+"""
+Tests of the scans of the fallback watcher pruning unchanged directories
+"""
+
+import os
+import shutil
+import time
+
+from fswatcher.FileSystemHandlerScanner import FileSystemHandlerScanner
+
+# Fixed mtime of the aged directories, so aging twice doesn't change a directory
+PAST = 1_000_000_000
+
+
+def write(path: str, data: bytes = b"content") -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+    return path
+
+
+def age(root: str) -> None:
+    """
+    Function to move the mtimes of the directories out of the racy window
+    """
+
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (PAST, PAST))
+
+
+def make_tree(root: str) -> FileSystemHandlerScanner:
+    for name in ("a/1.txt", "a/2.txt", "b/1.txt", "b/deep/1.txt", "c/1.txt"):
+        write(os.path.join(root, name))
+    age(root)
+
+    scanner = FileSystemHandlerScanner(root, prune=True, deep_scan_interval=0)
+    created, _, _ = scanner.scan()
+    assert len(created) == 5
+    return scanner
+
+
+def test_unchanged_directories_are_not_listed(tmp_path):
+    root = str(tmp_path)
+    scanner = make_tree(root)
+
+    assert scanner.scan() == (set(), set(), set())
+    assert scanner.files_scanned == 0
+    assert scanner.directories_scanned == 0
+
+
+def test_created_and_deleted_files_are_detected(tmp_path):
+    root = str(tmp_path)
+    scanner = make_tree(root)
+
+    created = write(os.path.join(root, "a", "3.txt"))
+    deleted = os.path.join(root, "b", "deep", "1.txt")
+    os.remove(deleted)
+
+    assert scanner.scan() == ({created}, set(), {deleted})
+
+    # Only the changed directories were listed
+    assert scanner.directories_scanned == 2
+
+
+def test_replaced_files_are_detected_as_modified(tmp_path):
+    root = str(tmp_path)
+    scanner = make_tree(root)
+
+    # Editors and writers that rename over the file change the directory
+    path = os.path.join(root, "c", "1.txt")
+    os.replace(write(os.path.join(root, "c", "1.tmp"), b"changed content"), path)
+
+    assert scanner.scan() == (set(), {path}, set())
+
+
+def test_files_modified_in_place_are_detected_by_deep_scans(tmp_path):
+    root = str(tmp_path)
+    scanner = make_tree(root)
+    path = os.path.join(root, "a", "1.txt")
+    write(path, b"changed content")
+    age(root)
+
+    # The directory did not change, a pruning scan can't see it
+    assert scanner.scan() == (set(), set(), set())
+
+    scanner.deep_scan_interval = 0.01
+    time.sleep(0.02)
+    assert scanner.scan() == (set(), {path}, set())
+
+
+def test_files_of_removed_trees_are_deleted(tmp_path):
+    root = str(tmp_path)
+    scanner = make_tree(root)
+
+    shutil.rmtree(os.path.join(root, "b"))
+
+    _, _, deleted = scanner.scan()
+    assert deleted == {
+        os.path.join(root, "b", "1.txt"),
+        os.path.join(root, "b", "deep", "1.txt"),
+    }
+    assert not any(
+        path.startswith(os.path.join(root, "b")) for path in scanner.directories
+    )
+
+
+def test_full_scans_detect_every_change(tmp_path):
+    root = str(tmp_path)
+    kept = write(os.path.join(root, "a", "1.txt"))
+    changed = write(os.path.join(root, "a", "2.txt"))
+    removed = write(os.path.join(root, "b", "1.txt"))
+    os.symlink(kept, os.path.join(root, "link.txt"))
+
+    scanner = FileSystemHandlerScanner(root, prune=False)
+    created, _, _ = scanner.scan()
+    assert created == {kept, changed, removed}
+
+    write(changed, b"changed content")
+    os.remove(removed)
+    added = write(os.path.join(root, "c", "1.txt"))
+
+    assert scanner.scan() == ({added}, {changed}, {removed})
+    assert scanner.files_total == 3
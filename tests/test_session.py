@@ -0,0 +1,40 @@
+"""
+Tests of the refresh of the boto3 session shared by the upload workers
+"""
+
+import threading
+
+
+def test_concurrent_refreshes_of_a_generation_refresh_once(make_handler):
+    handler = make_handler()
+    generation = handler.session_generation
+    barrier = threading.Barrier(8)
+
+    def refresh():
+        barrier.wait()
+        handler._refresh_boto_session(generation)
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.session_generation == generation + 1
+
+
+def test_transfers_in_use_are_shut_down_once_released(make_handler):
+    handler = make_handler()
+    generation, _, transfers = handler._acquire_s3_transfers()
+    shut_down = []
+    for transfer in transfers.values():
+        transfer.__exit__ = lambda *args, t=transfer: shut_down.append(t)
+
+    handler._refresh_boto_session()
+    assert handler.retired_transfers[generation] is transfers
+    assert handler.s3_transfers is not transfers
+
+    handler._release_s3_transfers(generation)
+    assert generation not in handler.retired_transfers
+    assert generation not in handler.session_users
+    assert len(shut_down) == len(transfers)
@@ -0,0 +1,47 @@
+"""
+Tests of the Slack notifications
+"""
+
+import os
+
+from fswatcher.FileSystemHandlerSlack import FileSystemHandlerSlack
+
+
+class RecordingSlack:
+    """
+    Slack notifier recording the uploaded files
+    """
+
+    def __init__(self) -> None:
+        self.uploaded = []
+
+    def file_uploaded(self, path, relative_path=None) -> None:
+        self.uploaded.append((path, relative_path))
+
+    def stop(self) -> None:
+        pass
+
+
+def test_digest_lists_the_paths_relative_to_their_roots():
+    slack = FileSystemHandlerSlack(None, "channel", digest_interval=3600)
+    messages = []
+    slack._send = lambda message, **kwargs: messages.append(message)
+
+    slack.file_uploaded("/data/a/watch/x.txt", "watch/x.txt")
+    slack.file_uploaded("/data/b/y.txt", "y.txt")
+    slack.stop()
+
+    assert messages == ["2 Files Uploaded to S3\n• _watch/x.txt_\n• _y.txt_"]
+
+
+def test_uploads_are_notified_relative_to_the_root(make_handler, watch_dir):
+    handler = make_handler()
+    handler.slack = RecordingSlack()
+    os.makedirs(os.path.join(watch_dir, "watch"))
+    path = os.path.join(watch_dir, "watch", "file.txt")
+    with open(path, "w") as file:
+        file.write("content")
+
+    handler._record_upload(path, handler.bucket_name, "watch/file.txt", os.stat(path))
+
+    assert handler.slack.uploaded == [(path, os.path.join("watch", "file.txt"))]
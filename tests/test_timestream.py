@@ -0,0 +1,121 @@
+"""
+Tests of the buffered Timestream sink
+"""
+
+import json
+import os
+import threading
+
+import botocore.exceptions
+
+from fswatcher.FileSystemHandlerTimestream import FileSystemHandlerTimestream
+from tests.conftest import wait_for
+
+
+class FakeTimestream:
+    """
+    Timestream client recording the written batches, failing while errors are queued
+    """
+
+    def __init__(self) -> None:
+        self.batches = []
+        self.errors = []
+
+    def write_records(self, DatabaseName, TableName, Records):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.batches.append(Records)
+
+
+class FakeSession:
+    """
+    boto3 session returning the fake client
+    """
+
+    def __init__(self, client) -> None:
+        self.fake_client = client
+
+    def client(self, name):
+        return self.fake_client
+
+
+def unreachable() -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        {"Error": {"Code": "InternalServerException"}}, "WriteRecords"
+    )
+
+
+def make_sink(client, tmp_path, **options) -> FileSystemHandlerTimestream:
+    return FileSystemHandlerTimestream(
+        FakeSession(client),
+        "database",
+        "table",
+        spill_path=str(tmp_path / "spill.jsonl"),
+        **options,
+    )
+
+
+def test_records_are_written_in_batches(tmp_path):
+    client = FakeTimestream()
+    sink = make_sink(client, tmp_path, flush_interval=10)
+
+    for index in range(250):
+        sink.log({"index": index})
+    sink.stop()
+
+    assert [len(batch) for batch in client.batches] == [100, 100, 50]
+    assert [record["index"] for batch in client.batches for record in batch] == list(
+        range(250)
+    )
+
+
+def test_spilled_records_are_written_once_reachable(tmp_path):
+    client = FakeTimestream()
+    client.errors.append(unreachable())
+    sink = make_sink(client, tmp_path, flush_interval=0.05)
+
+    sink.log({"index": 0})
+    assert wait_for(lambda: sink.failures == 1)
+    with open(sink.spill_path) as spill_file:
+        assert [json.loads(line) for line in spill_file] == [{"index": 0}]
+
+    # The next successful batch writes the spilled records too
+    sink.log({"index": 1})
+    assert wait_for(lambda: len(client.batches) == 2)
+    sink.stop()
+
+    assert client.batches == [[{"index": 1}], [{"index": 0}]]
+    assert not os.path.exists(sink.spill_path)
+
+
+def test_unexpected_errors_keep_the_thread_alive(tmp_path):
+    client = FakeTimestream()
+    client.errors.append(RuntimeError("boom"))
+    sink = make_sink(client, tmp_path, flush_interval=0.05)
+
+    sink.log({"index": 0})
+    assert wait_for(lambda: sink.failures == 1)
+    sink.log({"index": 1})
+    assert wait_for(lambda: client.batches == [[{"index": 1}]])
+    sink.stop()
+
+
+def test_stop_does_not_block_on_a_stuck_thread(tmp_path):
+    client = FakeTimestream()
+    writing = threading.Event()
+    release = threading.Event()
+    client.write_records = lambda **kwargs: writing.set() or release.wait()
+    sink = make_sink(client, tmp_path, flush_interval=0, max_buffer=2)
+
+    # The thread is stuck writing the first record while the queue fills up and spills
+    sink.log({"index": 0})
+    assert writing.wait(10)
+    for index in range(1, 4):
+        sink.log({"index": index})
+
+    sink.stop(timeout=0.1)
+
+    # Read the spill file before the thread is released and replays it
+    with open(sink.spill_path) as spill_file:
+        assert [json.loads(line)["index"] for line in spill_file] == [3]
+    release.set()
@@ -0,0 +1,66 @@
+"""
+Tests of the parallel walk of the backtrack
+"""
+
+import os
+
+from fswatcher.FileSystemHandlerWalker import FileSystemHandlerWalker
+
+
+def make_tree(root: str, width: int = 4, depth: int = 3) -> set:
+    """
+    Function to create a tree of directories with a few files each, returns the files
+    """
+
+    files = set()
+    directories = [root]
+    for level in range(depth):
+        children = []
+        for directory in directories:
+            for index in range(width):
+                path = os.path.join(directory, f"{level}-{index}.txt")
+                with open(path, "w") as file:
+                    file.write("content")
+                files.add(path)
+
+                child = os.path.join(directory, f"dir-{index}")
+                os.mkdir(child)
+                children.append(child)
+        directories = children
+
+    return files
+
+
+def test_every_file_is_walked_once(tmp_path):
+    files = make_tree(str(tmp_path))
+    os.symlink(str(tmp_path), str(tmp_path / "loop"))
+
+    # A queue smaller than the tree makes the workers wait for the consumer
+    walker = FileSystemHandlerWalker(workers=8, queue_size=4)
+    walked = [path for path, _ in walker.walk(str(tmp_path))]
+
+    assert len(walked) == len(files)
+    assert set(walked) == files
+
+
+def test_stats_are_returned_and_old_files_skipped(tmp_path):
+    files = make_tree(str(tmp_path), width=2, depth=2)
+    old = sorted(files)[0]
+    os.utime(old, (1_000_000_000, 1_000_000_000))
+
+    # Files modified at the minimum mtime are not newer than it
+    walker = FileSystemHandlerWalker(workers=2, min_mtime=1_000_000_000)
+    walked = dict(walker.walk(str(tmp_path)))
+
+    assert set(walked) == files - {old}
+    for path, stats in walked.items():
+        assert stats.st_size == os.path.getsize(path)
+
+
+def test_walk_stops_with_the_consumer(tmp_path):
+    make_tree(str(tmp_path))
+
+    walker = FileSystemHandlerWalker(workers=4, queue_size=1)
+    walk = walker.walk(str(tmp_path))
+    assert next(walk) is not None
+    walk.close()